@@ -0,0 +1,107 @@
+"""
+Synthetic workload generators for the pycgs benchmarks.
+"""
+
+import random
+
+# Syllables used to build pinyin-like synthetic terms such as "Qing-hao-duan"
+SYLLABLES = [
+    "qing",
+    "hao",
+    "cao",
+    "ma",
+    "huang",
+    "duan",
+    "gan",
+    "shen",
+    "fu",
+    "ling",
+    "bai",
+    "zhu",
+    "dang",
+    "gui",
+    "chuan",
+    "xiong",
+]
+# Common CJK characters used to build Chinese synthetic terms
+CJK_CHARACTERS = "青蒿草麻黄段甘草人参茯苓白术当归川芎地上部质茎根叶花果实种子皮"
+
+
+def deep_chain(length: int) -> list[tuple[str, str]]:
+    """
+    Returns a single coreference chain t0 -> t1 -> ... -> t{length}.
+    """
+    return [(f"t{i}", f"t{i + 1}") for i in range(length)]
+
+
+def wide_fan_in(width: int, primary_terms: int = 1) -> list[tuple[str, str]]:
+    """
+    Returns width aliases that all point directly to a few Primary Terms.
+    """
+    return [(f"alias{i}", f"primary{i % primary_terms}") for i in range(width)]
+
+
+def random_dag(
+    nodes: int, edges_per_node: int = 2, seed: int = 0
+) -> list[tuple[str, str]]:
+    """
+    Returns a random Directed Acyclic Graph in which edges only point to higher-numbered nodes.
+    """
+    rng = random.Random(seed)
+    relationships = []
+    for i in range(nodes - 1):
+        for _ in range(rng.randint(0, edges_per_node)):
+            relationships.append((f"t{i}", f"t{rng.randint(i + 1, min(nodes - 1, i + 100))}"))
+    return relationships
+
+
+def with_weights(
+    relationships: list[tuple[str, str]], seed: int = 0
+) -> list[tuple[str, str, float]]:
+    """
+    Returns the relationships with random weights.
+    """
+    rng = random.Random(seed)
+    return [(src, tgt, rng.random()) for src, tgt in relationships]
+
+
+def random_term(rng: random.Random) -> str:
+    """
+    Returns a random pinyin-like or Chinese term.
+    """
+    if rng.random() < 0.5:
+        syllables = [rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))]
+        return "-".join(syllables).capitalize()
+    return "".join(rng.choice(CJK_CHARACTERS) for _ in range(rng.randint(2, 8)))
+
+
+def random_dictionary(terms: int, seed: int = 0) -> dict[str, str]:
+    """
+    Returns a primary term dictionary with the given number of distinct random terms.
+    """
+    rng = random.Random(seed)
+    primary_term_dict = {}
+    # Random terms collide, so terms are drawn until there are enough distinct ones
+    while len(primary_term_dict) < terms:
+        primary_term_dict.setdefault(random_term(rng), f"nmm-{len(primary_term_dict) // 4:07d}")
+    return primary_term_dict
+
+
+def random_text(
+    primary_term_dict: dict[str, str], characters: int, density: float = 0.05, seed: int = 0
+) -> str:
+    """
+    Returns a random text of about the given length in which a fraction of the words are dictionary terms.
+    """
+    rng = random.Random(seed)
+    terms = list(primary_term_dict)
+    parts = []
+    length = 0
+    while length < characters:
+        if terms and rng.random() < density:
+            part = rng.choice(terms)
+        else:
+            part = random_term(rng).lower()
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:characters]
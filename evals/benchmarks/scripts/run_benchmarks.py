@@ -0,0 +1,408 @@
+"""
+Benchmarks for PrimaryTermExtractor, foundational_cgs and weighted_cgs on the NMM10000 dataset and
+synthetic workloads.
+
+Each benchmark case runs in a fresh process, so that its peak RSS is measured on its own. The results
+are written to a JSON file that can be compared against a previous run (a baseline).
+
+Usage:
+    python run_benchmarks.py [--scale small|full] [--filter TEXT] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generators import (
+    deep_chain,
+    random_dag,
+    random_dictionary,
+    random_text,
+    wide_fan_in,
+    with_weights,
+)
+
+from pycgs.cgs import PrimaryTermExtractor, foundational_cgs, weighted_cgs
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
+
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+NMM10000_DATASET_DIR = os.path.join(
+    os.path.dirname(PARENT_DIR), "cgs_nmm10000/dataset/nmm10000"
+)
+NMM10000_PRIMARY_TERM_DICT_PATH = os.path.join(
+    NMM10000_DATASET_DIR, "nmm10000_primary_term_dict.json"
+)
+NMM10000_TEXTS_PATH = os.path.join(NMM10000_DATASET_DIR, "nmm10000_texts.csv")
+DEFAULT_OUTPUT_PATH = os.path.join(PARENT_DIR, "results/latest.json")
+
+# The size of each synthetic workload at each scale
+SCALES = {
+    "small": {
+        "dictionary_terms": 100_000,
+        "text_characters": 200_000,
+        "chain_length": 10_000,
+        "fan_in_width": 100_000,
+        "dag_nodes": 50_000,
+    },
+    "full": {
+        "dictionary_terms": 1_000_000,
+        "text_characters": 2_000_000,
+        "chain_length": 200_000,
+        "fan_in_width": 1_000_000,
+        "dag_nodes": 500_000,
+    },
+}
+
+EXTRACTOR_BACKENDS = ("trie", "automaton")
+GRAPH_BACKENDS = ("networkx", "compact")
+
+# The number of fresh interpreters started by each startup case, of which the median is reported
+STARTUP_RUNS = 7
+# The dependencies whose import a startup case reports
+HEAVY_MODULES = ("networkx", "marisa_trie", "asyncio", "multiprocessing")
+
+# Runs in a fresh interpreter: times the import of pycgs, the setup of the workload and its first
+# call, and prints them as JSON
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pycgs.cgs
+imported = time.perf_counter()
+{setup}
+ready = time.perf_counter()
+{first_call}
+done = time.perf_counter()
+try:
+    import resource
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:
+    peak_rss_mb = None
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "setup_ms": (ready - imported) * 1000,
+    "first_call_ms": (done - ready) * 1000,
+    "peak_rss_mb": peak_rss_mb,
+    "modules": [module for module in {heavy_modules!r} if module in sys.modules],
+}}))
+"""
+
+
+def load_nmm10000() -> tuple[dict[str, str], list[str]]:
+    """
+    Loads the NMM10000 primary term dictionary and texts.
+    """
+    with open(NMM10000_PRIMARY_TERM_DICT_PATH, "r", encoding="utf-8") as f:
+        primary_term_dict = json.load(f)
+    with open(NMM10000_TEXTS_PATH, "r", encoding="utf-8") as f:
+        texts = [row["nmm_text_for_search"] for row in csv.DictReader(f)]
+    return primary_term_dict, texts
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Returns the q-th percentile (0 <= q <= 100) of sorted values, with linear interpolation.
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (
+        position - lower
+    )
+
+
+def time_call(func, *args) -> float:
+    """
+    Returns the wall-clock seconds of one call.
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def bench_construction(primary_term_dict: dict[str, str], backend: str) -> dict:
+    """
+    Measures building an extractor from a dictionary.
+    """
+    seconds = time_call(PrimaryTermExtractor, primary_term_dict, False, backend)
+    return {
+        "seconds": seconds,
+        "terms": len(primary_term_dict),
+        "terms_per_second": len(primary_term_dict) / seconds,
+    }
+
+
+def bench_extraction(extractor: PrimaryTermExtractor, texts: list[str]) -> dict:
+    """
+    Measures the per-call latency and throughput of extracting from many short texts.
+    """
+    latencies = sorted(
+        time_call(extractor.extract_primary_terms, text) for text in texts
+    )
+    seconds = sum(latencies)
+    characters = sum(map(len, texts))
+    return {
+        "seconds": seconds,
+        "calls": len(texts),
+        "calls_per_second": len(texts) / seconds,
+        "characters_per_second": characters / seconds,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def bench_large_text(extractor: PrimaryTermExtractor, text: str) -> dict:
+    """
+    Measures extracting from one large text.
+    """
+    seconds = time_call(extractor.extract_primary_terms, text)
+    return {
+        "seconds": seconds,
+        "characters": len(text),
+        "characters_per_second": len(text) / seconds,
+    }
+
+
+def bench_cgs(cgs_function, relationships: list, backend: str) -> dict:
+    """
+    Measures resolving the Primary Terms of a graph.
+    """
+    seconds = time_call(cgs_function, relationships, backend)
+    return {
+        "seconds": seconds,
+        "edges": len(relationships),
+        "edges_per_second": len(relationships) / seconds,
+    }
+
+
+def bench_startup(setup: str = "", first_call: str = "") -> dict:
+    """
+    Measures the cold start of a process: importing pycgs.cgs, setting up a workload and making its
+    first call, in fresh interpreters. The times are medians over STARTUP_RUNS runs, and "seconds"
+    is the time from the start of the import to the end of the first call.
+    """
+    script = STARTUP_SCRIPT.format(
+        setup=setup, first_call=first_call, heavy_modules=HEAVY_MODULES
+    )
+    runs, process_seconds = [], []
+    for _ in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, check=True, text=True
+        ).stdout
+        process_seconds.append(time.perf_counter() - start)
+        runs.append(json.loads(output))
+
+    metrics = {
+        name: statistics.median(run[name] for run in runs)
+        for name in ("import_ms", "setup_ms", "first_call_ms")
+    }
+    metrics["seconds"] = (
+        statistics.median(
+            run["import_ms"] + run["setup_ms"] + run["first_call_ms"] for run in runs
+        )
+        / 1000
+    )
+    metrics["process_seconds"] = statistics.median(process_seconds)
+    if runs[0]["peak_rss_mb"] is not None:
+        metrics["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    metrics["modules"] = runs[0]["modules"]
+    return metrics
+
+
+def build_cases(scale: dict) -> dict:
+    """
+    Returns the benchmark cases by name. Each case is a function that prepares its inputs and
+    returns its metrics; only the measured part is timed.
+    """
+    cases = {}
+
+    for backend in EXTRACTOR_BACKENDS:
+
+        def nmm10000_construction(backend=backend):
+            primary_term_dict, _ = load_nmm10000()
+            return bench_construction(primary_term_dict, backend)
+
+        def nmm10000_extraction(backend=backend):
+            primary_term_dict, texts = load_nmm10000()
+            extractor = PrimaryTermExtractor(primary_term_dict, backend=backend)
+            return bench_extraction(extractor, texts)
+
+        def synthetic_construction(backend=backend):
+            primary_term_dict = random_dictionary(scale["dictionary_terms"])
+            return bench_construction(primary_term_dict, backend)
+
+        def synthetic_large_text(backend=backend):
+            primary_term_dict = random_dictionary(scale["dictionary_terms"])
+            text = random_text(primary_term_dict, scale["text_characters"])
+            extractor = PrimaryTermExtractor(primary_term_dict, backend=backend)
+            return bench_large_text(extractor, text)
+
+        cases[f"extractor/construction/nmm10000/{backend}"] = nmm10000_construction
+        cases[f"extractor/extraction/nmm10000/{backend}"] = nmm10000_extraction
+        cases[f"extractor/construction/synthetic/{backend}"] = synthetic_construction
+        cases[f"extractor/large_text/synthetic/{backend}"] = synthetic_large_text
+
+    graphs = {
+        "deep_chain": lambda: deep_chain(scale["chain_length"]),
+        "wide_fan_in": lambda: wide_fan_in(scale["fan_in_width"]),
+        "random_dag": lambda: random_dag(scale["dag_nodes"]),
+    }
+    for graph_name, make_graph in graphs.items():
+        for backend in GRAPH_BACKENDS:
+
+            def foundational(make_graph=make_graph, backend=backend):
+                return bench_cgs(foundational_cgs, make_graph(), backend)
+
+            def weighted(make_graph=make_graph, backend=backend):
+                return bench_cgs(weighted_cgs, with_weights(make_graph()), backend)
+
+            cases[f"foundational_cgs/{graph_name}/{backend}"] = foundational
+            cases[f"weighted_cgs/{graph_name}/{backend}"] = weighted
+
+    def startup_import():
+        return bench_startup()
+
+    def startup_resolution():
+        return bench_startup(
+            first_call="pycgs.cgs.foundational_cgs([('a', 'b'), ('b', 'c')], backend='compact')"
+        )
+
+    cases["startup/import"] = startup_import
+    cases["startup/first_resolution/compact"] = startup_resolution
+
+    for backend in EXTRACTOR_BACKENDS:
+
+        def startup_extraction(backend=backend):
+            # The extractor is saved once, then loaded by each fresh interpreter, as a serverless
+            # function would load it from its package
+            primary_term_dict, texts = load_nmm10000()
+            with tempfile.TemporaryDirectory() as path:
+                PrimaryTermExtractor(primary_term_dict, backend=backend).save(path)
+                return bench_startup(
+                    setup=f"extractor = pycgs.cgs.PrimaryTermExtractor.load({path!r})",
+                    first_call=f"extractor.extract_primary_terms({texts[0]!r})",
+                )
+
+        cases[f"startup/first_extraction/nmm10000/{backend}"] = startup_extraction
+
+    return cases
+
+
+def run_case(scale_name: str, case_name: str, connection):
+    """
+    Runs one benchmark case in a worker process and sends back its metrics and peak RSS.
+    """
+    metrics = build_cases(SCALES[scale_name])[case_name]()
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        # Startup cases report the peak RSS of their own fresh interpreters
+        metrics.setdefault("peak_rss_mb", peak_rss / divisor)
+    connection.send(metrics)
+    connection.close()
+
+
+def run_benchmarks(scale_name: str, name_filter: str | None) -> dict:
+    """
+    Runs the selected benchmark cases, each in a fresh process, and returns the results.
+    """
+    results = {}
+    for case_name in build_cases(SCALES[scale_name]):
+        if name_filter and name_filter not in case_name:
+            continue
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=run_case, args=(scale_name, case_name, sender)
+        )
+        process.start()
+        sender.close()
+        metrics = receiver.recv()
+        process.join()
+
+        results[case_name] = metrics
+        print(
+            f"{case_name:50s} {metrics['seconds']:10.4f} s"
+            f" {metrics.get('peak_rss_mb', float('nan')):10.1f} MB"
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """
+    Prints the time and peak RSS ratios against a baseline and flags regressions.
+    """
+    print(f"\nComparison against the baseline (tolerance {tolerance:.0%}):")
+    regressions = 0
+    for case_name, metrics in results.items():
+        if case_name not in baseline:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if metric not in metrics or metric not in baseline[case_name]:
+                continue
+            ratio = metrics[metric] / baseline[case_name][metric]
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{case_name:50s} {metric:12s} x{ratio:6.2f}{flag}")
+    print(f"{regressions} regression(s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--compare", help="a previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scale, args.filter)
+
+    report = {
+        "metadata": {
+            "scale": args.scale,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["metadata"]["scale"] != args.scale:
+            print("Warning: the baseline was recorded at a different scale.")
+        compare(results, baseline["results"], args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,102 @@
 """
-`pycgs.cgs` is a module that provides the core algorithms and functions for Coreference-based Graph Search (CGS). 
+`pycgs.cgs` is a module that provides the core algorithms and functions for Coreference-based Graph Search (CGS).
+
+The submodules are imported on first access of one of their names, so that a process only pays for the
+dependencies it uses: resolving a graph does not import marisa_trie, and extracting terms does not import
+networkx.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
+
 __all__ = [
     "foundational_cgs",
     "weighted_cgs",
+    "ranked_cgs",
+    "RankedPrimaryTerm",
+    "CyclicGraphError",
+    "PrimaryTermMap",
+    "sharded_cgs",
+    "read_edges",
+    "write_primary_terms",
+    "CompactDiGraph",
+    "CGSIndex",
     "PrimaryTermExtractor",
+    "SharedExtractor",
+    "compile_extractor",
+    "CompileReport",
+    "PrimaryTermIndex",
+    "MatchSpans",
+    "MicroBatcher",
+    "CallMetrics",
+    "MetricsAggregator",
+    "TextNormalizer",
+    "extract_arrow",
+    "extract_arrow_table",
 ]
 
-from .algorithms import foundational_cgs, weighted_cgs
-from .primary_term_extractor import PrimaryTermExtractor
+# The submodule that defines each public name
+_SUBMODULES = {
+    "CyclicGraphError": "algorithms",
+    "PrimaryTermMap": "algorithms",
+    "foundational_cgs": "algorithms",
+    "weighted_cgs": "algorithms",
+    "extract_arrow": "arrow_extraction",
+    "extract_arrow_table": "arrow_extraction",
+    "CGSIndex": "cgs_index",
+    "CompactDiGraph": "compact_graph",
+    "CompileReport": "compiler",
+    "compile_extractor": "compiler",
+    "read_edges": "edge_files",
+    "write_primary_terms": "edge_files",
+    "CallMetrics": "instrumentation",
+    "MetricsAggregator": "instrumentation",
+    "MatchSpans": "match_spans",
+    "MicroBatcher": "micro_batcher",
+    "TextNormalizer": "normalization",
+    "PrimaryTermExtractor": "primary_term_extractor",
+    "SharedExtractor": "shared_extractor",
+    "sharded_cgs": "sharding",
+    "PrimaryTermIndex": "term_index",
+}
+
+# Imported eagerly, as importing the ranked_cgs submodule would otherwise bind the package attribute
+# ranked_cgs to the submodule instead of the function. It only depends on the standard library.
+from .ranked_cgs import RankedPrimaryTerm, ranked_cgs
+
+
+def __getattr__(name: str):
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    # Later accesses find the name in the module namespace without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .algorithms import (
+        CyclicGraphError,
+        PrimaryTermMap,
+        foundational_cgs,
+        weighted_cgs,
+    )
+    from .arrow_extraction import extract_arrow, extract_arrow_table
+    from .cgs_index import CGSIndex
+    from .compact_graph import CompactDiGraph
+    from .compiler import CompileReport, compile_extractor
+    from .edge_files import read_edges, write_primary_terms
+    from .instrumentation import CallMetrics, MetricsAggregator
+    from .match_spans import MatchSpans
+    from .micro_batcher import MicroBatcher
+    from .normalization import TextNormalizer
+    from .primary_term_extractor import PrimaryTermExtractor
+    from .shared_extractor import SharedExtractor
+    from .sharding import sharded_cgs
+    from .term_index import PrimaryTermIndex
@@ -0,0 +1,216 @@
+"""
+This module contains an Aho-Corasick automaton used as a linear-time scan engine for term extraction.
+"""
+
+from collections import deque
+from typing import Iterable, Iterator
+
+from .normalization import is_word_char
+
+
+__all__ = ["AhoCorasickAutomaton"]
+
+
+class AhoCorasickAutomaton:
+    """
+    An Aho-Corasick automaton compiled from a collection of terms.
+
+    The automaton reads a text once, character by character, and reports every term occurrence
+    without re-probing the text at each offset.
+
+    Attributes:
+        terms (list[str]): The compiled terms, indexed by term id.
+        max_length (int): The length of the longest compiled term.
+
+    Methods:
+        iter_longest_matches(text, word_boundaries): Yields the leftmost-longest, non-overlapping term matches in the text.
+        iter_all_matches(text): Yields every term occurrence in the text, including overlapping ones.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        """
+        Initializes the automaton by building the goto, failure and output functions for the given terms.
+
+        Args:
+            terms (Iterable[str]): The terms to compile. Empty and duplicate terms are ignored.
+        """
+        self.terms: list[str] = []
+        self.max_length = 0
+
+        # State 0 is the root; each state stores its transitions, failure link, depth and outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._depth: list[int] = [0]
+        # Outputs are (length, term_id) pairs of every term ending in the state, longest first
+        self._output: list[tuple[tuple[int, int], ...]] = [()]
+
+        for term in terms:
+            self._insert(term)
+        self._build_failure_links()
+
+    def _insert(self, term: str):
+        """
+        Adds a term to the goto function of the automaton.
+        """
+        if not term:
+            return
+
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._depth.append(self._depth[state] + 1)
+                self._output.append(())
+            state = next_state
+
+        # Skip duplicate terms, keeping the id of the first occurrence
+        if self._output[state]:
+            return
+
+        self._output[state] = ((len(term), len(self.terms)),)
+        self.terms.append(term)
+        self.max_length = max(self.max_length, len(term))
+
+    def _build_failure_links(self):
+        """
+        Computes the failure links and merges the outputs along them in breadth-first order.
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                # Follow the failure links of the parent until a state with a transition on char is found
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def iter_longest_matches(
+        self, text: Iterable[str], word_boundaries: bool = False
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the leftmost-longest, non-overlapping term matches in the text.
+
+        The results are identical to a greedy scan that, from left to right, takes the longest
+        term starting at the current position and then jumps past it. A candidate match is only
+        settled once the automaton proves that no longer match can start at the same position.
+
+        Args:
+            text (Iterable[str]): The input text to scan, or any iterator over its characters.
+            word_boundaries (bool): Whether to reject matches that start or end inside a word, i.e. between
+                two word characters as defined by is_word_char(). Default is False.
+
+        Yields:
+            tuple[int, int, int]: The (start, end, term_id) of each match, in text order.
+        """
+        goto, fail, depth, output = self._goto, self._fail, self._depth, self._output
+
+        state = 0
+        cursor = 0  # No match may start before the end of the previously emitted match
+        settled = 0  # Every start position before this one has been resolved
+        # start -> (end, term_id) of the longest match found so far for each unresolved start
+        pending: dict[int, tuple[int, int]] = {}
+
+        if word_boundaries:
+            # Whether each of the last characters is a word character, indexed by position modulo its size
+            word_chars = bytearray(self.max_length + 2)
+            # The (start, end, term_id) of the matches ending before the current character, whose end
+            # boundary can only be checked once the current character is known
+            unchecked: list[tuple[int, int, int]] = []
+            previous_word = False
+
+        for end, char in enumerate(text, 1):
+            if word_boundaries:
+                word = is_word_char(char)
+                word_chars[(end - 1) % len(word_chars)] = word
+                if unchecked:
+                    if not (word and previous_word):
+                        for start, match_end, term_id in unchecked:
+                            pending[start] = (match_end, term_id)
+                    unchecked.clear()
+                previous_word = word
+
+            # Follow the failure links until a transition on char is found
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+
+            for length, term_id in output[state]:
+                start = end - length
+                if start >= cursor:
+                    if word_boundaries:
+                        size = len(word_chars)
+                        if (
+                            start
+                            and word_chars[start % size]
+                            and word_chars[(start - 1) % size]
+                        ):
+                            continue
+                        unchecked.append((start, end, term_id))
+                    else:
+                        # Matches are discovered in order of their end, so a later one is always longer
+                        pending[start] = (end, term_id)
+
+            # No match ending after this position can start before the frontier
+            frontier = end - depth[state]
+            if frontier > settled:
+                settled = frontier
+                if pending:
+                    for start in sorted(start for start in pending if start < frontier):
+                        match_end, term_id = pending.pop(start)
+                        if start >= cursor:
+                            yield start, match_end, term_id
+                            cursor = match_end
+
+        # The end of the text is a word boundary
+        if word_boundaries:
+            for start, match_end, term_id in unchecked:
+                pending[start] = (match_end, term_id)
+
+        # Resolve the remaining candidates at the end of the text
+        for start in sorted(pending):
+            match_end, term_id = pending[start]
+            if start >= cursor:
+                yield start, match_end, term_id
+                cursor = match_end
+
+    def iter_all_matches(self, text: Iterable[str]) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields every term occurrence in the text, including overlapping and nested ones.
+
+        Args:
+            text (Iterable[str]): The input text to scan, or any iterator over its characters.
+
+        Yields:
+            tuple[int, int, int]: The (start, end, term_id) of each occurrence, in order of end and,
+            for the same end, from the longest to the shortest.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+
+        state = 0
+        for end, char in enumerate(text, 1):
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+
+            for length, term_id in output[state]:
+                yield end - length, end, term_id
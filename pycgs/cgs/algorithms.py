@@ -2,54 +2,332 @@
 This module contains the algorithms for Coreference-based Graph Search (CGS).
 """
 
-import networkx as nx
+from array import array
+from collections.abc import Mapping
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from pycgs.types import Edge, EdgeWithWeight
 
+from .compact_graph import CompactDiGraph
+from .instrumentation import CallMetrics, MetricsCallback, _graph_counters
 
-__all__ = ["foundational_cgs", "weighted_cgs"]
+if TYPE_CHECKING:
+    import networkx as nx
 
 
-def foundational_cgs(relationships: list[Edge] | set[Edge]) -> dict[str, str]:
+__all__ = ["CyclicGraphError", "PrimaryTermMap", "foundational_cgs", "weighted_cgs"]
+
+
+GRAPH_BACKENDS = ("networkx", "compact")
+
+
+class CyclicGraphError(ValueError):
+    """
+    Raised when the Coreference-based Primary Term Graph contains a cycle.
+
+    Attributes:
+        components (list[set[str]]): The strongly connected components that contain the cycles.
+    """
+
+    def __init__(self, message: str, components: list[set[str]]):
+        super().__init__(message)
+        self.components = components
+
+    def __reduce__(self):
+        # Keep the components when the error is sent back from a worker process
+        return (self.__class__, (str(self), self.components))
+
+
+class PrimaryTermMap(Mapping):
+    """
+    A read-only mapping from each term to its ultimate Primary Term, backed by the interned names of a
+    compact graph and an array of Primary Term ids, instead of a dictionary entry per term.
+
+    The terms are iterated in the order in which they first appear in the edges, like the dictionaries
+    returned by the compact backend.
+    """
+
+    def __init__(self, names: list[str], ids: dict[str, int], resolved: array):
+        """
+        Initializes the mapping.
+
+        Args:
+            names (list[str]): The name of each node id.
+            ids (dict[str, int]): The node id of each name.
+            resolved (array): The node id of the Primary Term of each node id.
+        """
+        self._names = names
+        self._ids = ids
+        self._resolved = resolved
+
+    def __getitem__(self, term: str) -> str:
+        return self._names[self._resolved[self._ids[term]]]
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} terms)"
+
+
+def _check_graph_backend(backend: str, lazy: bool = False):
+    """
+    Raises a ValueError if the graph backend is not supported, or cannot return lazy results.
+    """
+    if backend not in GRAPH_BACKENDS:
+        raise ValueError(
+            f"Unsupported backend: {backend!r}. Expected one of {GRAPH_BACKENDS}."
+        )
+    if lazy and backend != "compact":
+        raise ValueError('lazy results require the "compact" backend.')
+
+
+def _cyclic_components(cptg: "nx.DiGraph", nodes=None) -> list[set[str]]:
+    """
+    Returns the strongly connected components of the graph that contain a cycle,
+    optionally restricted to the components containing one of the given nodes.
+    """
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
+    components = []
+    for component in nx.strongly_connected_components(cptg):
+        if nodes is not None and component.isdisjoint(nodes):
+            continue
+        node = next(iter(component))
+        if len(component) > 1 or cptg.has_edge(node, node):
+            components.append(component)
+    return components
+
+
+def _compact_cyclic_components(
+    graph: CompactDiGraph, nodes: Iterable[int] | None = None
+) -> list[set[str]]:
+    """
+    Returns the strongly connected components of a compact graph that contain a cycle, by node name,
+    optionally restricted to the components containing one of the given node ids.
+    """
+    components = []
+    for component in graph.strongly_connected_components():
+        if nodes is not None and component.isdisjoint(nodes):
+            continue
+        node = next(iter(component))
+        if len(component) > 1 or node in graph.successors(node):
+            components.append({graph.names[member] for member in component})
+    return components
+
+
+def _report_graph_metrics(
+    metrics_callback: MetricsCallback,
+    operation: str,
+    started: float,
+    nodes: int,
+    edges: int,
+    depths: Iterable[int],
+):
+    """
+    Reports the metrics of a CGS call, given the length of the chain from each node to its Primary Term.
+    """
+    metrics_callback(
+        CallMetrics(
+            operation, perf_counter() - started, _graph_counters(nodes, edges, depths)
+        )
+    )
+
+
+def foundational_cgs(
+    relationships: Iterable[Edge],
+    backend: str = "networkx",
+    lazy: bool = False,
+    metrics_callback: MetricsCallback | None = None,
+) -> dict[str, str] | PrimaryTermMap:
     """
     Foundational CGS algorithm.
+
+    The relationships may be any iterable of edges, such as a generator reading them from a file with
+    read_edges(); they are consumed once and duplicate edges are dropped by the graph store.
+
+    The "compact" backend stores the graph as interned integer ids and CSR arrays instead of a
+    networkx.DiGraph, and does not import networkx. Both backends return the same results. With
+    lazy=True, the compact backend returns a PrimaryTermMap instead of building a dictionary.
+
+    If a metrics_callback is given, it is called with the CallMetrics of the call, including the
+    sizes of the graph and the depth of its chains.
+
+    Raises:
+        CyclicGraphError: If the graph is not a Directed Acyclic Graph.
+        ValueError: If the backend is not supported, or lazy is True with another backend than "compact".
     """
+    _check_graph_backend(backend, lazy)
+    started = perf_counter() if metrics_callback is not None else 0.0
+    if backend == "compact":
+        graph = CompactDiGraph(relationships)
+        # The length of the chain from each node to its Primary Term, only kept when instrumented
+        depths = (
+            array("i", bytes(4 * len(graph))) if metrics_callback is not None else None
+        )
+        result = _primary_terms(graph, _foundational_cgs_compact(graph, depths), lazy)
+        if metrics_callback is not None:
+            _report_graph_metrics(
+                metrics_callback,
+                "foundational_cgs",
+                started,
+                len(graph),
+                graph.number_of_edges(),
+                depths,
+            )
+        return result
+
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
     # Create a Directed Acyclic Graph
     cptg = nx.DiGraph()  # CPTG: Coreference-based Primary Term Graph
 
     # Add edges to the graph based on the coreference relationships
-    cptg.add_edges_from(set(relationships))  # Use set to remove duplicates
+    cptg.add_edges_from(relationships)  # Duplicate edges are stored once
 
-    # Check if the graph is a Directed Acyclic Graph
-    if not nx.is_directed_acyclic_graph(cptg):
-        raise ValueError("The graph is  not a Directed Acyclic Graph.")
-
-    # Initialize the dictionary to store the ultimate Primary Terms
-    primary_term_dict = {}
+    # Sort the nodes topologically, which also checks that the graph is a Directed Acyclic Graph
+    try:
+        topological_order = list(nx.topological_sort(cptg))
+    except nx.NetworkXUnfeasible as e:
+        raise CyclicGraphError(
+            "The graph is  not a Directed Acyclic Graph.", _cyclic_components(cptg)
+        ) from e
 
-    # Iterate through each node in the graph
-    for node in cptg.nodes():
-        # Check if the node is a Primary Term (out-degree == 0)
-        if cptg.out_degree(node) == 0:
-            # The node is a Primary Term, map it to itself
-            primary_term_dict[node] = node
+    # Resolve the ultimate Primary Terms in a single reverse topological sweep, so that the
+    # successors of a node are always resolved before the node itself
+    resolved = {}
+    depths = {} if metrics_callback is not None else None
+    for node in reversed(topological_order):
+        successors = cptg.succ[node]
+        if not successors:
+            # The node is a Primary Term (out-degree == 0), map it to itself
+            resolved[node] = node
+            if depths is not None:
+                depths[node] = 0
         else:
-            # The node is not a Primary Term, find its ultimate Primary Term
-            current = node
-            while cptg.out_degree(current) != 0:
-                # Follow the directed edges to find the Primary Term
-                current = sorted(cptg.successors(current))[
-                    0
-                ]  # Sort to get a deterministic result
-            primary_term_dict[node] = current
+            # Follow the smallest successor to get a deterministic result, reusing its Primary Term
+            smallest = min(successors)
+            resolved[node] = resolved[smallest]
+            if depths is not None:
+                depths[node] = depths[smallest] + 1
+
+    # Initialize the dictionary to store the ultimate Primary Terms, in the order of the graph nodes
+    primary_term_dict = {node: resolved[node] for node in cptg.nodes()}
 
+    if metrics_callback is not None:
+        _report_graph_metrics(
+            metrics_callback,
+            "foundational_cgs",
+            started,
+            cptg.number_of_nodes(),
+            cptg.number_of_edges(),
+            depths.values(),
+        )
     return primary_term_dict
 
 
-def weighted_cgs(relationships: list[EdgeWithWeight]) -> dict[str, str]:
+def _primary_terms(
+    graph: CompactDiGraph, resolved: array, lazy: bool
+) -> dict[str, str] | PrimaryTermMap:
+    """
+    Returns the Primary Term of each node of a compact graph, given the Primary Term id of each node id.
+    """
+    names = graph.names
+    if lazy:
+        return PrimaryTermMap(names, graph.ids, resolved)
+    return {names[node]: names[resolved[node]] for node in range(len(names))}
+
+
+def _foundational_cgs_compact(
+    graph: CompactDiGraph, depths: array | None = None
+) -> array:
+    """
+    Foundational CGS algorithm on a compact graph, returning the Primary Term id of each node id.
+
+    If depths is given, the length of the chain from each node to its Primary Term is stored in it.
+    """
+    # Sort the nodes topologically, which also checks that the graph is a Directed Acyclic Graph
+    topological_order = graph.topological_order()
+    if topological_order is None:
+        raise CyclicGraphError(
+            "The graph is  not a Directed Acyclic Graph.",
+            _compact_cyclic_components(graph),
+        )
+
+    names, offsets, targets = graph.names, graph.offsets, graph.targets
+
+    # Resolve the ultimate Primary Terms by node id in a single reverse topological sweep
+    resolved = array("i", bytes(4 * len(names)))
+    for node in reversed(topological_order):
+        start, end = offsets[node], offsets[node + 1]
+        if start == end:
+            # The node is a Primary Term (out-degree == 0), map it to itself
+            resolved[node] = node
+        else:
+            # Follow the successor with the smallest name to get a deterministic result
+            smallest = targets[start]
+            for k in range(start + 1, end):
+                if names[targets[k]] < names[smallest]:
+                    smallest = targets[k]
+            resolved[node] = resolved[smallest]
+            if depths is not None:
+                depths[node] = depths[smallest] + 1
+
+    return resolved
+
+
+def weighted_cgs(
+    relationships: Iterable[EdgeWithWeight],
+    backend: str = "networkx",
+    lazy: bool = False,
+    metrics_callback: MetricsCallback | None = None,
+) -> dict[str, str] | PrimaryTermMap:
     """
     Weighted CGS algorithm.
+
+    The relationships may be any iterable of edges, such as a generator reading them from a file with
+    read_edges(); they are consumed once, and a duplicate edge keeps the weight of its last occurrence.
+
+    The "compact" backend stores the graph as interned integer ids and CSR arrays instead of a
+    networkx.DiGraph, and does not import networkx. Both backends return the same results. With
+    lazy=True, the compact backend returns a PrimaryTermMap instead of building a dictionary.
+
+    If a metrics_callback is given, it is called with the CallMetrics of the call, including the
+    sizes of the graph and the depth of its chains.
+
+    Raises:
+        CyclicGraphError: If following the highest weight edges from a node runs into a cycle.
+        ValueError: If the backend is not supported, or lazy is True with another backend than "compact".
     """
+    _check_graph_backend(backend, lazy)
+    started = perf_counter() if metrics_callback is not None else 0.0
+    if backend == "compact":
+        graph = CompactDiGraph(relationships, weighted=True)
+        # The length of the chain from each node to its Primary Term, only kept when instrumented
+        depths = (
+            array("i", bytes(4 * len(graph))) if metrics_callback is not None else None
+        )
+        result = _primary_terms(graph, _weighted_cgs_compact(graph, depths), lazy)
+        if metrics_callback is not None:
+            _report_graph_metrics(
+                metrics_callback,
+                "weighted_cgs",
+                started,
+                len(graph),
+                graph.number_of_edges(),
+                depths,
+            )
+        return result
+
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
     # Create a Directed Acyclic Graph
     cptg = nx.DiGraph()  # CPTG: Coreference-based Primary Term Graph
 
@@ -59,28 +337,115 @@ def weighted_cgs(relationships: list[EdgeWithWeight]) -> dict[str, str]:
 
     # Initialize the dictionary to store the ultimate Primary Terms
     primary_term_dict = {}
+    depths = {} if metrics_callback is not None else None
 
     # Iterate through each node in the graph
     for node in cptg.nodes():
-        # Check if the node is a Primary Term (out-degree == 0)
-        if cptg.out_degree(node) == 0:
-            primary_term_dict[node] = node
-        else:
-            # The node is not a Primary Term, find its ultimate Primary Term
-            current_node = node
-            while cptg.out_degree(current_node) != 0:
-                # Get the downstream node with the highest weight
-                successors = list(cptg.successors(current_node))
-                if successors:
-                    highest_weight_edge = max(
-                        successors,
-                        key=lambda succ, current=current_node: cptg[current][succ][
-                            "weight"
-                        ],
-                    )
-                    current_node = highest_weight_edge
-                else:
-                    break
-            primary_term_dict[node] = current_node
+        if node in primary_term_dict:
+            # Already resolved as part of the path of an earlier node
+            continue
 
-    return primary_term_dict
+        # Follow the highest weight edges until a Primary Term (out-degree == 0) or an
+        # already resolved node is reached, remembering the path to resolve it at once
+        path = {}  # Used as an insertion-ordered set
+        current_node = node
+        while current_node not in primary_term_dict:
+            successors = cptg.succ[current_node]
+            if not successors:
+                # The node is a Primary Term, map it to itself
+                primary_term_dict[current_node] = current_node
+                if depths is not None:
+                    depths[current_node] = 0
+                break
+            if current_node in path:
+                # The path runs into itself, so it would never reach a Primary Term
+                cycle = list(path)[list(path).index(current_node) :]
+                raise CyclicGraphError(
+                    f"The graph contains a cycle through {cycle!r}.",
+                    _cyclic_components(cptg, cycle),
+                )
+            path[current_node] = None
+            # Get the downstream node with the highest weight
+            current_node = max(
+                successors, key=lambda succ, edges=successors: edges[succ]["weight"]
+            )
+
+        # Every node on the path shares the Primary Term of the node it ended on
+        primary_term = primary_term_dict[current_node]
+        for path_node in path:
+            primary_term_dict[path_node] = primary_term
+        if depths is not None:
+            depth = depths[current_node]
+            for path_node in reversed(path):
+                depth += 1
+                depths[path_node] = depth
+
+    if metrics_callback is not None:
+        _report_graph_metrics(
+            metrics_callback,
+            "weighted_cgs",
+            started,
+            cptg.number_of_nodes(),
+            cptg.number_of_edges(),
+            depths.values(),
+        )
+    # Return the Primary Terms in the order of the graph nodes
+    return {node: primary_term_dict[node] for node in cptg.nodes()}
+
+
+def _weighted_cgs_compact(graph: CompactDiGraph, depths: array | None = None) -> array:
+    """
+    Weighted CGS algorithm on a compact graph, returning the Primary Term id of each node id.
+
+    If depths is given, the length of the chain from each node to its Primary Term is stored in it.
+    """
+    names, offsets, targets, weights = (
+        graph.names,
+        graph.offsets,
+        graph.targets,
+        graph.weights,
+    )
+
+    # The Primary Term id of each node, or -1 if the node is not resolved yet
+    resolved = array("i", [-1]) * len(names)
+
+    for node in range(len(names)):
+        if resolved[node] != -1:
+            # Already resolved as part of the path of an earlier node
+            continue
+
+        # Follow the highest weight edges until a Primary Term or an already resolved node is reached
+        path = {}  # Used as an insertion-ordered set
+        current = node
+        while resolved[current] == -1:
+            start, end = offsets[current], offsets[current + 1]
+            if start == end:
+                # The node is a Primary Term, map it to itself
+                resolved[current] = current
+                break
+            if current in path:
+                # The path runs into itself, so it would never reach a Primary Term
+                cycle = list(path)[list(path).index(current) :]
+                raise CyclicGraphError(
+                    f"The graph contains a cycle through {[names[member] for member in cycle]!r}.",
+                    _compact_cyclic_components(graph, cycle),
+                )
+            path[current] = None
+            # Get the downstream node with the highest weight, keeping the first one on ties
+            highest = start
+            for k in range(start + 1, end):
+                if weights[k] > weights[highest]:
+                    highest = k
+            current = targets[highest]
+
+        # Every node on the path shares the Primary Term of the node it ended on
+        primary_term = resolved[current]
+        for path_node in path:
+            resolved[path_node] = primary_term
+        if depths is not None:
+            depth = depths[current]
+            for path_node in reversed(path):
+                depth += 1
+                depths[path_node] = depth
+
+    return resolved
@@ -0,0 +1,177 @@
+"""
+This module contains vectorized extraction functions for Arrow string arrays and pandas Series.
+
+pyarrow is an optional dependency: it is only imported when these functions are called.
+"""
+
+from array import array
+from itertools import repeat
+from typing import TYPE_CHECKING, Iterator
+
+from .match_spans import MatchSpans
+from .primary_term_extractor import PrimaryTermExtractor
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+__all__ = ["extract_arrow", "extract_arrow_table"]
+
+
+def _to_string_array(values) -> "pa.LargeStringArray":
+    """
+    Converts a pandas Series, an Arrow (chunked) array or a sequence of strings to a single LargeStringArray.
+
+    Series and arrays that are already backed by Arrow are converted without copying the strings.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        # pandas Series implement the Arrow conversion protocol
+        values = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+        raise TypeError(f"Expected an array of strings, got {values.type}.")
+    return values.cast(pa.large_string())
+
+
+def _iter_texts(values: "pa.LargeStringArray") -> Iterator[str | None]:
+    """
+    Yields the text of each row, or None for null rows.
+
+    The data buffer of the array is decoded once; each row is a slice of the decoded text, located
+    with the offsets buffer, so that no Arrow scalar or intermediate Python list is created.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+    n = len(values)
+    if not n:
+        return
+    _, offsets_buffer, data_buffer = values.buffers()
+    byte_offsets = memoryview(offsets_buffer).cast("q")[
+        values.offset : values.offset + n + 1
+    ]
+    first, last = byte_offsets[0], byte_offsets[-1]
+    text = str(memoryview(data_buffer)[first:last], "utf-8") if last > first else ""
+
+    if len(text) == last - first:
+        # ASCII only: byte offsets are character offsets
+        char_offsets = [offset - first for offset in byte_offsets]
+    else:
+        # Count the characters of every slot, including the bytes that null slots may hold
+        unmasked = pa.Array.from_buffers(
+            pa.large_string(),
+            n,
+            [None, offsets_buffer, data_buffer],
+            null_count=0,
+            offset=values.offset,
+        )
+        char_offsets = [0]
+        for length in pc.utf8_length(unmasked).to_pylist():
+            char_offsets.append(char_offsets[-1] + length)
+
+    valid = values.is_valid().to_pylist() if values.null_count else repeat(True, n)
+    for i, is_valid in enumerate(valid):
+        yield text[char_offsets[i] : char_offsets[i + 1]] if is_valid else None
+
+
+def _int_array(values: array, arrow_type: "pa.DataType") -> "pa.Array":
+    """
+    Wraps an array of integers as an Arrow array without copying it.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    return pa.Array.from_buffers(arrow_type, len(values), [None, pa.py_buffer(values)])
+
+
+def _dictionary_array(ids: array, resolve) -> "pa.DictionaryArray":
+    """
+    Encodes ids as a dictionary array of strings that only contains the distinct ids, resolved once each.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    codes = {}
+    indices = array("i", (codes.setdefault(i, len(codes)) for i in ids))
+    dictionary = pa.array([resolve(i) for i in codes], type=pa.string())
+    return pa.DictionaryArray.from_arrays(_int_array(indices, pa.int32()), dictionary)
+
+
+def _span_columns(spans: MatchSpans) -> dict[str, "pa.Array"]:
+    """
+    Returns the columns of the matches: offsets, terms and primary terms, with their ids.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    return {
+        "start": _int_array(spans.starts, pa.int64()),
+        "end": _int_array(spans.ends, pa.int64()),
+        "term": _dictionary_array(spans.term_ids, spans.term),
+        "primary_term": _dictionary_array(spans.primary_ids, spans.primary_term),
+        "term_id": _int_array(spans.term_ids, pa.int32()),
+        "primary_id": _int_array(spans.primary_ids, pa.int32()),
+    }
+
+
+def extract_arrow(extractor: PrimaryTermExtractor, values) -> "pa.LargeListArray":
+    """
+    Extracts the matches of each row of a string column as an Arrow list column.
+
+    Each row becomes a list of structs with the start and end offsets of each match in the row, the
+    matched term and its primary term (dictionary-encoded), and their ids in the index of the extractor.
+    Null rows stay null. The strings are read straight from the Arrow buffers, without converting the
+    column to Python objects, and the matches are collected in compact arrays rather than per-row
+    dictionaries; only the distinct matched terms are turned into strings.
+
+    Args:
+        extractor (PrimaryTermExtractor): The extractor used to find the matches.
+        values: A pandas Series, a pyarrow (chunked) string array or a sequence of strings.
+
+    Returns:
+        pyarrow.LargeListArray: The matches of each row, in text order.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        TypeError: If the values are not strings.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    strings = _to_string_array(values)
+    row_offsets, spans = extractor.find_spans_batch(_iter_texts(strings))
+
+    columns = _span_columns(spans)
+    matches = pa.StructArray.from_arrays(list(columns.values()), names=list(columns))
+    mask = strings.is_null() if strings.null_count else None
+    return pa.LargeListArray.from_arrays(
+        _int_array(row_offsets, pa.int64()), matches, mask=mask
+    )
+
+
+def extract_arrow_table(extractor: PrimaryTermExtractor, values) -> "pa.Table":
+    """
+    Extracts the matches of a string column as an Arrow table with one row per match, ready to be
+    joined back to the input on its row number.
+
+    Args:
+        extractor (PrimaryTermExtractor): The extractor used to find the matches.
+        values: A pandas Series, a pyarrow (chunked) string array or a sequence of strings.
+
+    Returns:
+        pyarrow.Table: The row number of the input text, the start and end offsets of the match in
+        the text, the term and primary term (dictionary-encoded), and their ids.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        TypeError: If the values are not strings.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    strings = _to_string_array(values)
+    row_offsets, spans = extractor.find_spans_batch(_iter_texts(strings))
+
+    rows = array("q")
+    for row in range(len(row_offsets) - 1):
+        rows.extend(repeat(row, row_offsets[row + 1] - row_offsets[row]))
+
+    return pa.table({"row": _int_array(rows, pa.int64()), **_span_columns(spans)})
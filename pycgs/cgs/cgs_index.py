@@ -0,0 +1,312 @@
+"""
+This module contains a stateful CGS index that is maintained incrementally under edge inserts and deletes.
+"""
+
+from typing import Iterable
+
+from pycgs.types import ChangeSet, Edge, EdgeWithWeight
+
+from .algorithms import CyclicGraphError, foundational_cgs, weighted_cgs
+
+
+__all__ = ["CGSIndex"]
+
+
+# Marks an edge that did not exist before an update
+_MISSING = object()
+
+
+class CGSIndex:
+    """
+    A Coreference-based Primary Term Graph whose ultimate Primary Terms are maintained incrementally.
+
+    Each node that is not a Primary Term follows one chosen successor: the one with the smallest name
+    as in foundational_cgs(), or the one with the highest weight as in weighted_cgs(). When an edge is
+    added or removed, only the chosen successor of its source is recomputed, and the new Primary Term
+    is propagated to the ancestors whose chosen path runs through it. The results always equal those
+    of foundational_cgs() or weighted_cgs() on the current edges.
+
+    Every update returns a change-set of the terms whose Primary Term moved, which can be applied to a
+    PrimaryTermExtractor built from the index.
+
+    Attributes:
+        weighted (bool): Whether the index follows the highest weight edges instead of the smallest names.
+
+    Methods:
+        add_edge(source, target, weight): Adds or re-weights an edge and returns the change-set.
+        remove_edge(source, target): Removes an edge and returns the change-set.
+        primary_of(term): Returns the ultimate Primary Term of a term.
+        to_dict(): Returns the ultimate Primary Term of every term.
+    """
+
+    def __init__(
+        self,
+        relationships: Iterable[Edge] | Iterable[EdgeWithWeight] = (),
+        weighted: bool = False,
+    ):
+        """
+        Initializes the index from the coreference relationships.
+
+        Args:
+            relationships (Iterable[Edge] | Iterable[EdgeWithWeight]): The (source, target) edges, or the
+                (source, target, weight) edges if weighted is True. Default is no edges.
+            weighted (bool): Whether to follow the highest weight edges as in weighted_cgs().
+                Default is False, which follows the smallest successor as in foundational_cgs().
+
+        Raises:
+            CyclicGraphError: If the relationships contain a cycle that CGS cannot resolve.
+        """
+        self.weighted = weighted
+
+        # The successors of each node in insertion order, with their weights
+        self._successors: dict[str, dict[str, float | None]] = {}
+        # The predecessors of each node, as insertion-ordered sets
+        self._predecessors: dict[str, dict[str, None]] = {}
+        # The chosen successor of each node that is not a Primary Term
+        self._choice: dict[str, str] = {}
+        # The nodes whose chosen successor is the key, as insertion-ordered sets
+        self._chosen_by: dict[str, dict[str, None]] = {}
+        # The ultimate Primary Term of each node
+        self._primary: dict[str, str] = {}
+
+        relationships = list(relationships)
+        for edge in relationships:
+            self._insert_edge(edge[0], edge[1], edge[2] if weighted else None)
+
+        # Resolve all nodes at once, which also rejects cycles
+        if weighted:
+            self._primary = weighted_cgs(relationships, backend="compact")
+        else:
+            self._primary = foundational_cgs(relationships, backend="compact")
+
+        for node in self._successors:
+            choice = self._choose(node)
+            if choice is not None:
+                self._choice[node] = choice
+                self._chosen_by.setdefault(choice, {})[node] = None
+
+    def __len__(self) -> int:
+        return len(self._primary)
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._primary
+
+    def primary_of(self, term: str) -> str | None:
+        """
+        Returns the ultimate Primary Term of a term, or None if the term is not in the index.
+        """
+        return self._primary.get(term)
+
+    def to_dict(self) -> dict[str, str]:
+        """
+        Returns a dictionary mapping every term to its ultimate Primary Term.
+        """
+        return dict(self._primary)
+
+    def add_edge(
+        self, source: str, target: str, weight: float | None = None
+    ) -> ChangeSet:
+        """
+        Adds an edge, or updates the weight of an existing edge, and updates the affected Primary Terms.
+
+        Args:
+            source (str): The source term of the edge.
+            target (str): The target term of the edge.
+            weight (float | None): The weight of the edge, required if the index is weighted.
+
+        Returns:
+            ChangeSet: The terms whose Primary Term changed, mapped to their new Primary Term.
+
+        Raises:
+            ValueError: If the index is weighted and no weight is given.
+            CyclicGraphError: If the edge would create a cycle that CGS cannot resolve. The index is left unchanged.
+        """
+        if self.weighted and weight is None:
+            raise ValueError("A weight is required to add an edge to a weighted index.")
+
+        new_nodes = [
+            node
+            for node in dict.fromkeys((source, target))
+            if node not in self._successors
+        ]
+        old_weight = self._successors.get(source, {}).get(target, _MISSING)
+        self._insert_edge(source, target, weight if self.weighted else None)
+
+        def rollback():
+            if old_weight is _MISSING:
+                self._delete_edge(source, target)
+            else:
+                self._successors[source][target] = old_weight
+            for node in new_nodes:
+                self._discard_node(node)
+
+        # A foundational index must stay a Directed Acyclic Graph
+        if (
+            not self.weighted
+            and old_weight is _MISSING
+            and self._reaches(target, source)
+        ):
+            component = self._cycle_component(source)
+            rollback()
+            raise CyclicGraphError(
+                "The edge would make the graph not a Directed Acyclic Graph.",
+                [component],
+            )
+
+        changes: ChangeSet = {}
+        for node in new_nodes:
+            self._primary[node] = node
+            changes[node] = node
+        try:
+            self._update_choice(source, changes)
+        except CyclicGraphError:
+            rollback()
+            for node in new_nodes:
+                del self._primary[node]
+            raise
+        return changes
+
+    def remove_edge(self, source: str, target: str) -> ChangeSet:
+        """
+        Removes an edge and updates the affected Primary Terms. Terms left without edges are removed.
+
+        Args:
+            source (str): The source term of the edge.
+            target (str): The target term of the edge.
+
+        Returns:
+            ChangeSet: The terms whose Primary Term changed, mapped to their new Primary Term,
+            or to None if they were removed from the index.
+
+        Raises:
+            KeyError: If the edge is not in the index.
+            CyclicGraphError: If removing the edge would make a weighted index follow a cycle.
+                The index is left unchanged.
+        """
+        if target not in self._successors.get(source, {}):
+            raise KeyError((source, target))
+
+        old_successors = dict(self._successors[source])
+        self._delete_edge(source, target)
+
+        changes: ChangeSet = {}
+        try:
+            self._update_choice(source, changes)
+        except CyclicGraphError:
+            self._successors[source] = old_successors
+            self._predecessors[target][source] = None
+            raise
+
+        for node in dict.fromkeys((source, target)):
+            if not self._successors[node] and not self._predecessors[node]:
+                self._discard_node(node)
+                del self._primary[node]
+                changes[node] = None
+        return changes
+
+    def _insert_edge(self, source: str, target: str, weight: float | None):
+        """
+        Adds an edge to the adjacency dictionaries without resolving anything.
+        """
+        for node in (source, target):
+            if node not in self._successors:
+                self._successors[node] = {}
+                self._predecessors[node] = {}
+        self._successors[source][target] = weight
+        self._predecessors[target][source] = None
+
+    def _delete_edge(self, source: str, target: str):
+        """
+        Removes an edge from the adjacency dictionaries without resolving anything.
+        """
+        del self._successors[source][target]
+        del self._predecessors[target][source]
+
+    def _discard_node(self, node: str):
+        """
+        Removes a node without edges from the adjacency dictionaries.
+        """
+        del self._successors[node]
+        del self._predecessors[node]
+        self._chosen_by.pop(node, None)
+
+    def _choose(self, node: str) -> str | None:
+        """
+        Returns the successor a node follows, or None if the node is a Primary Term.
+        """
+        successors = self._successors[node]
+        if not successors:
+            return None
+        if self.weighted:
+            # Get the downstream node with the highest weight, keeping the first one on ties
+            return max(successors, key=successors.__getitem__)
+        # Follow the smallest successor to get a deterministic result
+        return min(successors)
+
+    def _update_choice(self, node: str, changes: ChangeSet):
+        """
+        Recomputes the chosen successor of a node and propagates its new Primary Term to its ancestors.
+        """
+        old_choice = self._choice.get(node)
+        new_choice = self._choose(node)
+        if new_choice == old_choice:
+            return
+
+        # A weighted index may contain cycles, as long as no chosen path runs into itself
+        if self.weighted and new_choice is not None:
+            current = new_choice
+            while current is not None:
+                if current == node:
+                    raise CyclicGraphError(
+                        f"The graph would contain a cycle through {node!r}.",
+                        [self._cycle_component(node)],
+                    )
+                current = self._choice.get(current)
+
+        if old_choice is not None:
+            del self._chosen_by[old_choice][node]
+        if new_choice is None:
+            del self._choice[node]
+        else:
+            self._choice[node] = new_choice
+            self._chosen_by.setdefault(new_choice, {})[node] = None
+
+        # Propagate to the ancestors whose chosen path runs through a node whose Primary Term changed
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            choice = self._choice.get(current)
+            primary_term = current if choice is None else self._primary[choice]
+            if self._primary[current] != primary_term:
+                self._primary[current] = primary_term
+                changes[current] = primary_term
+                stack.extend(self._chosen_by.get(current, ()))
+
+    def _reaches(self, source: str, target: str) -> bool:
+        """
+        Returns whether target can be reached from source by following the edges.
+        """
+        return target in self._reachable(source, self._successors)
+
+    def _reachable(
+        self, node: str, adjacency: dict[str, dict[str, float | None] | dict[str, None]]
+    ) -> set[str]:
+        """
+        Returns the nodes reachable from a node, including itself, in the given adjacency.
+        """
+        seen = {node}
+        stack = [node]
+        while stack:
+            for neighbor in adjacency[stack.pop()]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return seen
+
+    def _cycle_component(self, node: str) -> set[str]:
+        """
+        Returns the strongly connected component of a node.
+        """
+        return self._reachable(node, self._successors) & self._reachable(
+            node, self._predecessors
+        )
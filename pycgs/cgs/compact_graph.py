@@ -0,0 +1,224 @@
+"""
+This module contains a compact directed graph that stores interned nodes and CSR successor arrays.
+"""
+
+from array import array
+from typing import Iterable, Iterator
+
+from pycgs.types import Edge, EdgeWithWeight
+
+
+__all__ = ["CompactDiGraph"]
+
+
+class CompactDiGraph:
+    """
+    A directed graph that interns node names to integer ids and stores successors in CSR arrays.
+
+    The successors of the node with id i are targets[offsets[i]:offsets[i + 1]], in the order in which
+    their edges were first added. Duplicate edges are stored once, with the weight of their last
+    occurrence, which matches the behavior of networkx.DiGraph.add_edge(). Besides the interned
+    names, the graph holds a few bytes per node and edge instead of Python dicts.
+
+    Attributes:
+        names (list[str]): The name of each node id, in the order in which nodes were first seen.
+        ids (dict[str, int]): The node id of each name.
+        offsets (array): The start of the successors of each node in targets, plus the total edge count.
+        targets (array): The successor node ids of all nodes.
+        weights (array | None): The weight of each edge in targets, if the graph is weighted.
+
+    Methods:
+        successors(node): Returns the successor ids of a node.
+        out_degree(node): Returns the number of successors of a node.
+        topological_order(): Returns the node ids in topological order, or None if the graph has a cycle.
+        strongly_connected_components(): Yields the strongly connected components as sets of node ids.
+    """
+
+    def __init__(
+        self, edges: Iterable[Edge] | Iterable[EdgeWithWeight], weighted: bool = False
+    ):
+        """
+        Initializes the graph from an iterable of edges.
+
+        Args:
+            edges (Iterable[Edge] | Iterable[EdgeWithWeight]): The (source, target) edges, or the
+                (source, target, weight) edges if weighted is True.
+            weighted (bool): Whether the edges carry a weight. Default is False.
+        """
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+
+        # Intern the nodes and collect the edges in insertion order
+        sources = array("i")
+        targets = array("i")
+        weights = array("d") if weighted else None
+        for edge in edges:
+            sources.append(self._intern(edge[0]))
+            targets.append(self._intern(edge[1]))
+            if weights is not None:
+                weights.append(edge[2])
+
+        # Group the edges by source with a stable counting sort
+        n = len(self.names)
+        offsets = array("q", bytes(8 * (n + 1)))
+        for src in sources:
+            offsets[src + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        positions = offsets[:-1]
+        self.targets = array("i", bytes(4 * len(sources)))
+        self.weights = array("d", bytes(8 * len(sources))) if weighted else None
+        for k, src in enumerate(sources):
+            position = positions[src]
+            positions[src] += 1
+            self.targets[position] = targets[k]
+            if weights is not None:
+                self.weights[position] = weights[k]
+        del sources, targets, weights, positions
+
+        self.offsets = offsets
+        self._remove_duplicate_edges()
+
+    def _intern(self, name: str) -> int:
+        """
+        Returns the node id of a name, assigning a new id to unseen names.
+        """
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+    def _remove_duplicate_edges(self):
+        """
+        Compacts the successor arrays in place, keeping the first position and the last weight of each edge.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        write = 0
+        start = 0
+        for node in range(len(self.names)):
+            end = offsets[node + 1]
+            offsets[node] = write
+            if end - start == 1:
+                targets[write] = targets[start]
+                if weights is not None:
+                    weights[write] = weights[start]
+                write += 1
+            elif end - start > 1:
+                written = {}  # target -> position of its edge in the compacted arrays
+                for k in range(start, end):
+                    target = targets[k]
+                    position = written.get(target)
+                    if position is None:
+                        position = written[target] = write
+                        targets[write] = target
+                        write += 1
+                    if weights is not None:
+                        weights[position] = weights[k]
+            start = end
+        offsets[len(self.names)] = write
+
+        del targets[write:]
+        if weights is not None:
+            del weights[write:]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        """
+        Returns the number of distinct edges in the graph.
+        """
+        return len(self.targets)
+
+    def successors(self, node: int) -> array:
+        """
+        Returns the successor ids of a node, in the order in which their edges were added.
+        """
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def out_degree(self, node: int) -> int:
+        """
+        Returns the number of successors of a node.
+        """
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def topological_order(self) -> array | None:
+        """
+        Returns the node ids in topological order using Kahn's algorithm, or None if the graph has a cycle.
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.names)
+
+        in_degree = array("i", bytes(4 * n))
+        for target in targets:
+            in_degree[target] += 1
+
+        order = array("i", (node for node in range(n) if not in_degree[node]))
+        i = 0
+        while i < len(order):
+            node = order[i]
+            i += 1
+            for k in range(offsets[node], offsets[node + 1]):
+                target = targets[k]
+                in_degree[target] -= 1
+                if not in_degree[target]:
+                    order.append(target)
+
+        return order if len(order) == n else None
+
+    def strongly_connected_components(self) -> Iterator[set[int]]:
+        """
+        Yields the strongly connected components as sets of node ids, using an iterative Tarjan's algorithm.
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.names)
+
+        index = array("i", [-1]) * n
+        low_link = array("i", bytes(4 * n))
+        on_stack = bytearray(n)
+        stack = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+
+            # Each frame is (node, position of the next successor edge to visit)
+            frames = [(root, offsets[root])]
+            index[root] = low_link[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+
+            while frames:
+                node, k = frames[-1]
+                if k < offsets[node + 1]:
+                    frames[-1] = (node, k + 1)
+                    target = targets[k]
+                    if index[target] == -1:
+                        index[target] = low_link[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        frames.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        low_link[node] = min(low_link[node], index[target])
+                    continue
+
+                frames.pop()
+                if frames:
+                    parent = frames[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+
+                if low_link[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.add(member)
+                        if member == node:
+                            break
+                    yield component
@@ -0,0 +1,197 @@
+"""
+This module contains a pipeline that compiles coreference relationships into a saved extractor index
+in one step.
+"""
+
+import os
+import sys
+import tracemalloc
+from array import array
+from time import perf_counter
+from typing import Iterable, NamedTuple
+
+import marisa_trie
+
+from pycgs.types import Edge, EdgeWithWeight
+
+from .algorithms import _foundational_cgs_compact, _weighted_cgs_compact
+from .compact_graph import CompactDiGraph
+from .edge_files import read_edges
+from .normalization import TextNormalizer
+from .primary_term_extractor import _check_backend, _lower, _save_config
+from .term_index import PrimaryTermIndex
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+__all__ = ["CompileReport", "compile_extractor"]
+
+
+class CompileReport(NamedTuple):
+    """
+    The summary of a compile_extractor() run.
+
+    Attributes:
+        path (str): The directory the extractor was saved to.
+        nodes (int): The number of terms in the graph.
+        edges (int): The number of distinct edges in the graph.
+        terms (int): The number of terms in the index, fewer than nodes if some normalize to the same key.
+        primary_terms (int): The number of distinct primary terms.
+        elapsed (float): The build time in seconds.
+        stages (dict[str, float]): The time in seconds of each stage: "graph", "resolve", "index" and "save".
+        peak_memory (int | None): The peak size in bytes of the Python allocations made during the build,
+            if trace_memory was True.
+        max_rss (int | None): The peak resident set size of the process in bytes, where available.
+    """
+
+    path: str
+    nodes: int
+    edges: int
+    terms: int
+    primary_terms: int
+    elapsed: float
+    stages: dict[str, float]
+    peak_memory: int | None
+    max_rss: int | None
+
+
+def _max_rss() -> int | None:
+    """
+    Returns the peak resident set size of the process in bytes, or None if it is not available.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def compile_extractor(
+    relationships: Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike,
+    path: str | os.PathLike,
+    weighted: bool = False,
+    ignore_case: bool = False,
+    backend: str = "trie",
+    normalizer: TextNormalizer | None = None,
+    word_boundaries: bool = False,
+    trace_memory: bool = False,
+) -> CompileReport:
+    """
+    Resolves coreference relationships and saves the resulting extractor index, without building any
+    intermediate dictionary of terms.
+
+    Each term is interned once, by the compact graph, and the ultimate Primary Terms are resolved as
+    node ids. The graph arrays are then dropped, and the tries of the index are built straight from the
+    interned names, so the strings exist once in Python plus once in the tries being built, instead of
+    in a networkx graph, a result dictionary, an extractor dictionary and the tries. The directory can
+    be loaded with PrimaryTermExtractor.load(), and gives the same results as an extractor built from
+    the output of foundational_cgs() or weighted_cgs() with the same settings.
+
+    Args:
+        relationships (Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike): The (source, target)
+            edges, or the (source, target, weight) edges if weighted is True, or the path of an edge file
+            read with read_edges().
+        path (str | os.PathLike): The directory to save the extractor to.
+        weighted (bool): Whether to resolve the graph with weighted_cgs() instead of foundational_cgs().
+            Default is False.
+        ignore_case (bool): Whether the extractor matches case-insensitively. Default is False.
+        backend (str): The scan engine of the extractor, "trie" or "automaton". Default is "trie".
+        normalizer (TextNormalizer | None): The normalizer of the extractor. Default is None.
+        word_boundaries (bool): Whether the extractor only matches terms at word boundaries. Default is False.
+        trace_memory (bool): Whether to trace the Python allocations to report their peak size, which
+            slows the build down. Default is False.
+
+    Returns:
+        CompileReport: The sizes of the graph and the index, the build time and the peak memory.
+
+    Raises:
+        CyclicGraphError: If the relationships contain a cycle that CGS cannot resolve.
+        ValueError: If the backend is not supported, or both ignore_case and a normalizer are given.
+    """
+    _check_backend(backend)
+    if ignore_case and normalizer is not None:
+        raise ValueError(
+            "ignore_case cannot be combined with a normalizer; use TextNormalizer(casefold=True) instead."
+        )
+    if isinstance(relationships, (str, os.PathLike)):
+        relationships = read_edges(relationships, weighted=weighted)
+
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+
+    try:
+        started = last = perf_counter()
+        stages = {}
+
+        def end_stage(name: str):
+            nonlocal last
+            now = perf_counter()
+            stages[name] = now - last
+            last = now
+
+        graph = CompactDiGraph(relationships, weighted=weighted)
+        end_stage("graph")
+
+        if weighted:
+            resolved = _weighted_cgs_compact(graph)
+        else:
+            resolved = _foundational_cgs_compact(graph)
+        names = graph.names
+        nodes, edges = len(names), graph.number_of_edges()
+        # Only the interned names and the resolved ids are needed from now on
+        del graph
+        end_stage("resolve")
+
+        # The terms are matched as the extractor prepares them
+        if normalizer is not None:
+            key = normalizer.normalize
+        elif ignore_case:
+            key = _lower
+        else:
+            key = None
+        keys = map(key, names) if key is not None else names
+
+        terms = marisa_trie.Trie(keys)
+        max_term_length = max(map(len, terms), default=0)
+
+        # The trie id of each distinct primary term, by node id
+        primary_nodes = sorted(set(resolved))
+        primary_terms = marisa_trie.Trie(names[node] for node in primary_nodes)
+        primary_term_ids = {node: primary_terms[names[node]] for node in primary_nodes}
+        del primary_nodes
+
+        primary_ids = array("I", bytes(len(terms) * array("I").itemsize))
+        keys = map(key, names) if key is not None else names
+        # Terms normalized to the same key keep the primary term of the last one, as in a dictionary
+        for term, primary in zip(keys, resolved):
+            primary_ids[terms[term]] = primary_term_ids[primary]
+        end_stage("index")
+
+        PrimaryTermIndex(terms, primary_terms, primary_ids).save(path)
+        _save_config(
+            path, ignore_case, backend, max_term_length, normalizer, word_boundaries
+        )
+        end_stage("save")
+
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    return CompileReport(
+        os.fspath(path),
+        nodes,
+        edges,
+        len(terms),
+        len(primary_terms),
+        perf_counter() - started,
+        stages,
+        peak_memory,
+        _max_rss(),
+    )
@@ -0,0 +1,171 @@
+"""
+This module contains streaming readers of coreference edge files and a writer of Primary Term files.
+"""
+
+import csv
+import json
+import os
+from collections.abc import Mapping
+from typing import Iterator
+
+from pycgs.types import Edge, EdgeWithWeight
+
+
+__all__ = ["read_edges", "write_primary_terms"]
+
+
+EDGE_FILE_FORMATS = ("csv", "tsv", "jsonl", "parquet")
+
+
+def _file_format(path: str | os.PathLike, file_format: str | None) -> str:
+    """
+    Returns the format of a file, guessed from its extension if not given.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if file_format is None:
+        file_format = os.path.splitext(os.fspath(path))[1].lower().lstrip(".")
+        if file_format == "ndjson":
+            file_format = "jsonl"
+    if file_format not in EDGE_FILE_FORMATS:
+        raise ValueError(
+            f"Unsupported file format: {file_format!r}. Expected one of {EDGE_FILE_FORMATS}."
+        )
+    return file_format
+
+
+def _iter_parquet_records(path: str | os.PathLike, columns: int) -> Iterator[tuple]:
+    """
+    Yields the first columns of each row of a Parquet file, one record batch at a time.
+    """
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names[:columns]
+    for batch in parquet_file.iter_batches(columns=names):
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+def read_edges(
+    path: str | os.PathLike,
+    weighted: bool = False,
+    file_format: str | None = None,
+    header: bool = False,
+) -> Iterator[Edge] | Iterator[EdgeWithWeight]:
+    """
+    Lazily reads the edges of a coreference graph from a file, one edge per row, so that the edges can be
+    passed to foundational_cgs(), weighted_cgs() or sharded_cgs() without being loaded into a list.
+
+    CSV and TSV rows hold the source, the target and, if weighted is True, the weight. JSONL lines hold
+    either an array [source, target, weight] or an object with "source", "target" and "weight" keys.
+    Parquet files are read one record batch at a time from their first two or three columns. Blank
+    lines are skipped.
+
+    Args:
+        path (str | os.PathLike): The path of the edge file.
+        weighted (bool): Whether to read the weight of each edge. Default is False.
+        file_format (str | None): "csv", "tsv", "jsonl" or "parquet". Default is None, which uses the file
+            extension (".ndjson" is read as JSONL).
+        header (bool): Whether the first row of a CSV or TSV file is a header to skip. Default is False.
+
+    Yields:
+        Edge | EdgeWithWeight: The (source, target) edges, or the (source, target, weight) edges if
+        weighted is True.
+
+    Raises:
+        ImportError: If the file is a Parquet file and pyarrow is not installed.
+        ValueError: If the file format is not supported, or if a line is not valid JSON or does not hold
+            an edge with a source and a target, with its line number.
+    """
+    file_format = _file_format(path, file_format)
+
+    if file_format == "parquet":
+        if weighted:
+            for source, target, weight in _iter_parquet_records(path, 3):
+                yield source, target, float(weight)
+        else:
+            yield from _iter_parquet_records(path, 2)
+        return
+
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_format == "jsonl":
+            lines = enumerate(file, 1)
+        else:
+            reader = csv.reader(file, delimiter="\t" if file_format == "tsv" else ",")
+            if header:
+                next(reader, None)
+            lines = ((reader.line_num, row) for row in reader)
+
+        for line_number, record in lines:
+            try:
+                if file_format == "jsonl":
+                    if not record.strip():
+                        continue
+                    record = json.loads(record)
+                    if isinstance(record, dict):
+                        record = [
+                            record.get(key) for key in ("source", "target", "weight")
+                        ]
+                    elif not isinstance(record, list):
+                        raise TypeError("An edge must be an array or an object.")
+                    if record[0] is None or record[1] is None:
+                        raise ValueError("An edge must have a source and a target.")
+                elif not record:
+                    continue
+                if weighted:
+                    edge = record[0], record[1], float(record[2])
+                else:
+                    edge = record[0], record[1]
+            except (IndexError, TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Invalid edge in {os.fspath(path)!r}, line {line_number}: {record!r}"
+                ) from e
+            yield edge
+
+
+def write_primary_terms(
+    primary_term_dict: Mapping[str, str],
+    path: str | os.PathLike,
+    file_format: str | None = None,
+) -> int:
+    """
+    Writes the ultimate Primary Term of each term to a file, one term per row, without building any
+    intermediate copy of the mapping.
+
+    CSV and TSV rows hold the term and its Primary Term. JSONL lines hold an object with "term" and
+    "primary_term" keys.
+
+    Args:
+        primary_term_dict (Mapping[str, str]): The Primary Term of each term, e.g. the result of
+            foundational_cgs() or weighted_cgs().
+        path (str | os.PathLike): The path of the file to write.
+        file_format (str | None): "csv", "tsv" or "jsonl". Default is None, which uses the file extension.
+
+    Returns:
+        int: The number of rows written.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+    file_format = _file_format(path, file_format)
+    if file_format == "parquet":
+        raise ValueError("Primary Terms cannot be written to Parquet files.")
+
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if file_format == "jsonl":
+            for term, primary_term in primary_term_dict.items():
+                file.write(
+                    json.dumps(
+                        {"term": term, "primary_term": primary_term}, ensure_ascii=False
+                    )
+                )
+                file.write("\n")
+                count += 1
+        else:
+            writer = csv.writer(file, delimiter="\t" if file_format == "tsv" else ",")
+            for row in primary_term_dict.items():
+                writer.writerow(row)
+                count += 1
+    return count
@@ -0,0 +1,268 @@
+"""
+This module contains an index used to find approximate occurrences of terms in a text, within a
+maximum edit distance.
+"""
+
+from collections import deque
+from typing import Iterable, Iterator
+
+from .aho_corasick import AhoCorasickAutomaton
+
+
+__all__ = ["FuzzyIndex"]
+
+
+def _split(term: str, parts: int) -> Iterator[tuple[int, str]]:
+    """
+    Splits a term into consecutive pieces of nearly equal length, yielding the offset of each piece.
+    """
+    length, extra = divmod(len(term), parts)
+    offset = 0
+    for i in range(parts):
+        piece_length = length + (i < extra)
+        yield offset, term[offset : offset + piece_length]
+        offset += piece_length
+
+
+def _extend(pattern: str, window: str, max_distance: int) -> tuple[int, int] | None:
+    """
+    Aligns the whole pattern with the best prefix of the window, within max_distance edits.
+
+    Only the diagonal band of the edit distance matrix that can stay within max_distance is computed,
+    and the computation stops as soon as every cell of a row exceeds it.
+
+    Returns:
+        tuple[int, int] | None: The (distance, length of the prefix of the window), or None.
+    """
+    m = len(pattern)
+    if window.startswith(pattern):
+        return 0, m
+    k = max_distance
+    if not k:
+        return None
+    w = len(window)
+    # Costs above k are all equivalent, so they are capped
+    cap = k + 1
+
+    costs = list(range(k + 1)) + [cap] * (w - k) if w > k else list(range(w + 1))
+    for i, char in enumerate(pattern, 1):
+        new_costs = [cap] * (w + 1)
+        first = i - k
+        last = i + k if i + k < w else w
+        if first <= 0:
+            new_costs[0] = i
+            first = 1
+        row_min = new_costs[0]
+        for j in range(first, last + 1):
+            # Match or substitution, a character of the pattern missing from the window, or an extra one
+            cost = costs[j - 1] + (char != window[j - 1])
+            if costs[j] + 1 < cost:
+                cost = costs[j] + 1
+            if new_costs[j - 1] + 1 < cost:
+                cost = new_costs[j - 1] + 1
+            if cost > cap:
+                cost = cap
+            new_costs[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > k:
+            return None
+        costs = new_costs
+
+    # Among the best prefixes, prefer the one closest in length to the pattern
+    best = None
+    for j in range(max(0, m - k), min(w, m + k) + 1):
+        if costs[j] <= k and (best is None or (costs[j], abs(j - m)) < best[:2]):
+            best = (costs[j], abs(j - m), j)
+    if best is None:
+        return None
+    return best[0], best[2]
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """
+    Returns the edit distance between two strings.
+    """
+    costs = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        diagonal, costs[0] = costs[0], i
+        for j in range(1, len(b) + 1):
+            diagonal, costs[j] = costs[j], min(
+                costs[j] + 1, costs[j - 1] + 1, diagonal + (char != b[j - 1])
+            )
+    return costs[-1]
+
+
+class FuzzyIndex:
+    """
+    An index of terms used to find their approximate occurrences in a text, within a maximum edit
+    (Levenshtein) distance.
+
+    Each term is split into max_distance + 1 pieces. An occurrence with at most max_distance edits
+    contains at least one of the pieces unchanged, so the pieces of all the terms are compiled into an
+    Aho-Corasick automaton that finds the candidate positions in one linear scan of the text. Each
+    candidate is then verified by aligning the rest of the term on both sides of its piece, with a
+    banded edit distance computation that stops as soon as the distance is exceeded.
+
+    Attributes:
+        terms (list[str]): The terms that can be matched approximately, indexed by term index.
+        max_distance (int): The maximum edit distance of an occurrence.
+        min_length (int): The minimum length of a term to be matched approximately.
+
+    Methods:
+        iter_candidates(text): Yields the approximate occurrences of the terms in a text, or in a stream of
+            folded characters.
+    """
+
+    def __init__(
+        self, terms: Iterable[str], max_distance: int = 1, min_length: int = 5
+    ):
+        """
+        Initializes the index by splitting each term into pieces and compiling the pieces.
+
+        Args:
+            terms (Iterable[str]): The terms to index. Terms shorter than min_length are skipped.
+            max_distance (int): The maximum edit distance of an occurrence. Default is 1.
+            min_length (int): The minimum length of a term to be matched approximately. Shorter terms
+                would match too much unrelated text. Default is 5.
+
+        Raises:
+            ValueError: If max_distance is less than 1 or min_length is not greater than max_distance.
+        """
+        if max_distance < 1:
+            raise ValueError("max_distance must be at least 1.")
+        if min_length <= max_distance:
+            raise ValueError("min_length must be greater than max_distance.")
+
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.terms = [term for term in terms if len(term) >= min_length]
+        self._max_length = max(map(len, self.terms), default=0)
+
+        # piece -> (term index, offset of the piece in the term) of each term containing it
+        anchors: dict[str, list[tuple[int, int]]] = {}
+        for term_index, term in enumerate(self.terms):
+            for offset, piece in _split(term, max_distance + 1):
+                anchors.setdefault(piece, []).append((term_index, offset))
+
+        self._automaton = AhoCorasickAutomaton(anchors)
+        self._anchors = [anchors[piece] for piece in self._automaton.terms]
+
+    def iter_candidates(
+        self, text: str | Iterable[tuple[str, int, int]]
+    ) -> Iterator[tuple[int, int, int, int]]:
+        """
+        Yields the approximate occurrences of the terms in the text. Occurrences of different terms,
+        or of the same term at nearby offsets, may overlap.
+
+        The text can also be given as a stream of (char, start, end) tuples, e.g. from TextNormalizer.fold(),
+        which is read once: only the characters of the last two term lengths are kept, and the offsets of
+        the occurrences are the offsets of their characters in the original text.
+
+        Args:
+            text (str | Iterable[tuple[str, int, int]]): The input text to search, or its characters with
+                their offsets in the original text.
+
+        Yields:
+            tuple[int, int, int, int]: The (start, end, term_index, distance) of each occurrence.
+        """
+        reported = set()
+        if isinstance(text, str):
+            for piece in self._automaton.iter_all_matches(text):
+                yield from self._verify(text, 0, *piece, reported)
+            return
+
+        # An occurrence spans at most this many characters after its piece, so the piece is verified once
+        # they are read, and the characters are kept from twice as many before the last one
+        lookahead = self._max_length + self.max_distance
+        chars: list[str] = []
+        starts: list[int] = []
+        ends: list[int] = []
+        window_start = 0
+        # The pieces whose following characters are not read yet, in order of end
+        pending: deque[tuple[int, int, int]] = deque()
+        found: list[tuple[int, int, int, int]] = []
+
+        def verify(piece: tuple[int, int, int]):
+            for start, end, term_index, distance in self._verify(
+                chars, window_start, *piece, reported
+            ):
+                found.append(
+                    (
+                        starts[start - window_start],
+                        ends[end - 1 - window_start],
+                        term_index,
+                        distance,
+                    )
+                )
+
+        def read() -> Iterator[str]:
+            nonlocal window_start
+            for position, (char, start, end) in enumerate(text):
+                while pending and pending[0][1] + lookahead <= position:
+                    verify(pending.popleft())
+                if len(chars) >= 4 * lookahead:
+                    trimmed = 2 * lookahead
+                    del chars[:trimmed], starts[:trimmed], ends[:trimmed]
+                    window_start += trimmed
+                chars.append(char)
+                starts.append(start)
+                ends.append(end)
+                yield char
+
+        for piece in self._automaton.iter_all_matches(read()):
+            pending.append(piece)
+            yield from found
+            found.clear()
+        for piece in pending:
+            verify(piece)
+        yield from found
+
+    def _verify(
+        self,
+        text: str | list[str],
+        text_start: int,
+        piece_start: int,
+        piece_end: int,
+        piece_id: int,
+        reported: set[tuple[int, int, int]],
+    ) -> Iterator[tuple[int, int, int, int]]:
+        """
+        Yields the occurrences of the terms around an exact occurrence of one of their pieces, which were
+        not reported yet, given the characters of the text from text_start.
+        """
+        k = self.max_distance
+        terms = self.terms
+
+        def substring(start: int, end: int) -> str:
+            part = text[max(start - text_start, 0) : end - text_start]
+            return part if isinstance(part, str) else "".join(part)
+
+        for term_index, offset in self._anchors[piece_id]:
+            term = terms[term_index]
+            rest = offset + piece_end - piece_start
+
+            # Align the part of the term before the piece backwards from the piece, then the part after it
+            left = _extend(
+                term[:offset][::-1],
+                substring(piece_start - offset - k, piece_start)[::-1],
+                k,
+            )
+            if left is None:
+                continue
+            right = _extend(
+                term[rest:],
+                substring(piece_end, piece_end + len(term) - rest + k),
+                k - left[0],
+            )
+            if right is None:
+                continue
+
+            start, end = piece_start - left[1], piece_end + right[1]
+            if (term_index, start, end) not in reported:
+                reported.add((term_index, start, end))
+                # The alignment through this piece may not be the best one for this substring
+                distance = left[0] + right[0]
+                if distance:
+                    distance = _edit_distance(term, substring(start, end))
+                yield start, end, term_index, distance
@@ -0,0 +1,127 @@
+"""
+This module contains the opt-in instrumentation of the extractor and the CGS algorithms.
+
+Instrumented calls report a CallMetrics record to a callback. When no callback is set, the only cost is
+a check of the callback before and after each call: no timer is read and no counter is kept.
+"""
+
+import threading
+from typing import Callable, Iterable, NamedTuple
+
+
+__all__ = ["CallMetrics", "MetricsCallback", "MetricsAggregator"]
+
+
+class CallMetrics(NamedTuple):
+    """
+    The metrics of one instrumented call.
+
+    The counters depend on the operation:
+
+    - extract_primary_terms, find_spans, find_spans_batch and extract_fuzzy report the number of
+      "texts", the "characters" scanned, the "trie_probes" (lookups of the trie at a position of the
+      text, 0 with the "automaton" backend, which reads each character once), the "matches" and,
+      when a result cache is used, the "cache_hits". A cache hit scans no "characters", and reports the
+      "matches" of the extraction that was cached.
+    - foundational_cgs and weighted_cgs report the number of "nodes" and distinct "edges" of the graph,
+      the number of "primary_terms", and the length of the chain from each node to its Primary Term:
+      their sum as "hops" and their maximum as "max_depth".
+    """
+
+    operation: str
+    elapsed: float
+    counters: dict[str, int]
+
+
+MetricsCallback = Callable[[CallMetrics], None]
+"""
+A function called with the metrics of each instrumented call, in the thread that made the call.
+"""
+
+
+class MetricsAggregator:
+    """
+    A thread-safe metrics callback that sums the calls, times and counters of each operation.
+
+    Methods:
+        summary(): Returns the totals of each operation.
+        reset(): Drops the totals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict[str, float]] = {}
+
+    def __call__(self, metrics: CallMetrics):
+        with self._lock:
+            totals = self._totals.get(metrics.operation)
+            if totals is None:
+                totals = self._totals[metrics.operation] = {"calls": 0, "elapsed": 0.0}
+            totals["calls"] += 1
+            totals["elapsed"] += metrics.elapsed
+            for name, value in metrics.counters.items():
+                # Maxima are not additive
+                if name.startswith("max_"):
+                    totals[name] = max(totals.get(name, 0), value)
+                else:
+                    totals[name] = totals.get(name, 0) + value
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the number of calls, the total time in seconds and the totals of the counters of each operation.
+        """
+        with self._lock:
+            return {
+                operation: dict(totals) for operation, totals in self._totals.items()
+            }
+
+    def reset(self):
+        """
+        Drops the totals of all operations.
+        """
+        with self._lock:
+            self._totals.clear()
+
+
+class _CountingTrie:
+    """
+    A proxy of a marisa_trie.Trie that counts the prefix lookups made through it.
+    """
+
+    def __init__(self, trie):
+        self._trie = trie
+        self.probes = 0
+
+    def prefixes(self, key: str) -> list[str]:
+        self.probes += 1
+        return self._trie.prefixes(key)
+
+    def iter_prefixes_with_ids(self, key: str) -> Iterable[tuple[str, int]]:
+        self.probes += 1
+        return self._trie.iter_prefixes_with_ids(key)
+
+    def __getitem__(self, key: str) -> int:
+        return self._trie[key]
+
+    def __getattr__(self, name: str):
+        return getattr(self._trie, name)
+
+
+def _graph_counters(nodes: int, edges: int, depths: Iterable[int]) -> dict[str, int]:
+    """
+    Returns the counters of a CGS call, given the length of the chain from each node to its Primary Term.
+    """
+    primary_terms = hops = max_depth = 0
+    for depth in depths:
+        if not depth:
+            primary_terms += 1
+        hops += depth
+        if depth > max_depth:
+            max_depth = depth
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "primary_terms": primary_terms,
+        "hops": hops,
+        "max_depth": max_depth,
+    }
@@ -0,0 +1,72 @@
+"""
+This module contains the policies that choose which of the overlapping term matches of a text are reported.
+"""
+
+from bisect import bisect_right
+
+
+__all__ = ["MATCH_POLICIES", "select_max_coverage"]
+
+
+MATCH_POLICIES = ("longest", "all", "coverage")
+"""
+- "longest": the leftmost-longest, non-overlapping matches of a greedy scan.
+- "all": every match, including overlapping and nested ones.
+- "coverage": the non-overlapping matches that cover the most characters of the text.
+"""
+
+
+def _check_policy(policy: str):
+    """
+    Raises a ValueError if the match policy is not supported.
+    """
+    if policy not in MATCH_POLICIES:
+        raise ValueError(
+            f"Unsupported policy: {policy!r}. Expected one of {MATCH_POLICIES}."
+        )
+
+
+def select_max_coverage(
+    matches: list[tuple[int, int, int]],
+) -> list[tuple[int, int, int]]:
+    """
+    Selects the non-overlapping matches that cover the most characters, using weighted interval scheduling.
+
+    Among selections of equal coverage, the one with the fewest matches wins, i.e. longer terms are
+    preferred over several shorter ones.
+
+    Args:
+        matches (list[tuple[int, int, int]]): The (start, end, term_id) of the candidate matches.
+
+    Returns:
+        list[tuple[int, int, int]]: The selected matches, in text order.
+    """
+    by_end = sorted(matches, key=lambda match: (match[1], match[0]))
+    ends = [end for _, end, _ in by_end]
+
+    # best[i] is the (coverage, -count) of the best selection among the first i matches by end, and
+    # previous[i] is the number of matches that remain compatible when the i-th match is selected,
+    # or -1 if it is not selected
+    best = [(0, 0)]
+    previous = [-1]
+    for i, (start, end, _) in enumerate(by_end):
+        compatible = bisect_right(ends, start, 0, i)
+        coverage, count = best[compatible]
+        selected = (coverage + end - start, count - 1)
+        if selected > best[i]:
+            best.append(selected)
+            previous.append(compatible)
+        else:
+            best.append(best[i])
+            previous.append(-1)
+
+    selection = []
+    i = len(by_end)
+    while i:
+        if previous[i] == -1:
+            i -= 1
+        else:
+            selection.append(by_end[i - 1])
+            i = previous[i]
+    selection.reverse()
+    return selection
@@ -0,0 +1,74 @@
+"""
+This module contains a compact, array-based container for the matches found in a text.
+"""
+
+from array import array
+from typing import Iterator
+
+from .term_index import PrimaryTermIndex
+
+
+__all__ = ["MatchSpans"]
+
+
+class MatchSpans:
+    """
+    The matches found in a text, stored as parallel arrays of offsets and ids instead of strings.
+
+    The i-th match covers text[starts[i]:ends[i]], is the term with id term_ids[i] and maps to the
+    primary term with id primary_ids[i]. The ids refer to the index the matches were found with, which
+    resolves them to strings on demand.
+
+    Attributes:
+        starts (array): The start offset of each match.
+        ends (array): The end offset of each match.
+        term_ids (array): The term id of each match.
+        primary_ids (array): The primary term id of each match.
+        index (PrimaryTermIndex): The index that the ids refer to.
+
+    Methods:
+        term(term_id): Returns the term with the given id.
+        primary_term(primary_id): Returns the primary term with the given id.
+    """
+
+    __slots__ = ("starts", "ends", "term_ids", "primary_ids", "index")
+
+    def __init__(self, index: PrimaryTermIndex):
+        """
+        Initializes an empty set of matches.
+
+        Args:
+            index (PrimaryTermIndex): The index that the ids of the matches refer to.
+        """
+        self.starts = array("q")
+        self.ends = array("q")
+        self.term_ids = array("i")
+        self.primary_ids = array("i")
+        self.index = index
+
+    def append(self, start: int, end: int, term_id: int, primary_id: int):
+        """
+        Adds a match.
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.term_ids.append(term_id)
+        self.primary_ids.append(primary_id)
+
+    def term(self, term_id: int) -> str:
+        """
+        Returns the term with the given id.
+        """
+        return self.index.terms.restore_key(term_id)
+
+    def primary_term(self, primary_id: int) -> str:
+        """
+        Returns the primary term with the given id.
+        """
+        return self.index.primary_terms.restore_key(primary_id)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int]]:
+        return zip(self.starts, self.ends, self.term_ids, self.primary_ids)
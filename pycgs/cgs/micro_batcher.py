@@ -0,0 +1,224 @@
+"""
+This module contains an asyncio front-end that groups concurrent extraction requests into micro-batches
+run on an executor.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, AsyncIterator, Iterable
+
+if TYPE_CHECKING:
+    from .primary_term_extractor import PrimaryTermExtractor
+
+
+__all__ = ["MicroBatcher"]
+
+
+def _extract_each(
+    extractor: "PrimaryTermExtractor", texts: list[str]
+) -> list[tuple[dict[str, str] | None, Exception | None]]:
+    """
+    Extracts primary terms from each text, capturing the error of each text separately.
+    """
+    results = []
+    for text in texts:
+        try:
+            results.append((extractor.extract_primary_terms(text), None))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            results.append((None, error))
+    return results
+
+
+class MicroBatcher:
+    """
+    An asyncio front-end to a PrimaryTermExtractor that never blocks the event loop.
+
+    Requests made while the event loop is busy are collected into a micro-batch, which is extracted
+    on an executor in a single call. A batch is dispatched at the next iteration of the event loop,
+    after max_delay seconds, or as soon as it reaches max_batch_size texts or max_batch_characters
+    characters, whichever comes first. A text of max_batch_characters characters or more is extracted
+    in a batch of its own, so that one large document does not hold back the others.
+
+    A batcher serves one event loop at a time.
+
+    Attributes:
+        extractor (PrimaryTermExtractor): The extractor used for the extractions.
+        max_batch_size (int): The maximum number of texts in a batch.
+        max_batch_characters (int): The number of characters after which a batch is dispatched.
+        max_delay (float): The maximum number of seconds a request waits for its batch to fill.
+        executor (Executor | None): The executor the batches run on, or None for the default executor of the loop.
+
+    Methods:
+        aextract(text): Extracts primary terms from a text without blocking the event loop.
+        aextract_batch(texts, max_in_flight): Asynchronously yields the results of many texts in input order.
+    """
+
+    def __init__(
+        self,
+        extractor: "PrimaryTermExtractor",
+        max_batch_size: int = 64,
+        max_batch_characters: int = 65536,
+        max_delay: float = 0.0,
+        executor: Executor | None = None,
+    ):
+        """
+        Initializes the batcher.
+
+        Args:
+            extractor (PrimaryTermExtractor): The extractor used for the extractions.
+            max_batch_size (int): The maximum number of texts in a batch. Default is 64.
+            max_batch_characters (int): The number of characters after which a batch is dispatched, and
+                from which a text is extracted on its own. Default is 65536.
+            max_delay (float): The maximum number of seconds a request waits for more requests to join
+                its batch. Default is 0, which only batches the requests made in the same loop iteration.
+            executor (Executor | None): The executor to run the batches on. Default is None, which uses
+                the default thread pool of the event loop.
+
+        Raises:
+            ValueError: If max_batch_size or max_batch_characters is less than 1, or max_delay is negative.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_batch_characters < 1:
+            raise ValueError("max_batch_characters must be at least 1.")
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative.")
+
+        self.extractor = extractor
+        self.max_batch_size = max_batch_size
+        self.max_batch_characters = max_batch_characters
+        self.max_delay = max_delay
+        self.executor = executor
+
+        # The texts of the batch being collected and the futures of their results
+        self._texts: list[str] = []
+        self._futures: list[asyncio.Future] = []
+        self._characters = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.Handle | None = None
+
+    def submit(self, text: str) -> asyncio.Future:
+        """
+        Adds a text to the current batch and returns the future of its result. Must be called from
+        a running event loop.
+
+        Raises:
+            RuntimeError: If a batch of another event loop is still being collected.
+        """
+        loop = asyncio.get_running_loop()
+        if self._texts and loop is not self._loop:
+            raise RuntimeError("A MicroBatcher cannot serve two event loops at once.")
+        self._loop = loop
+
+        # The texts collected before a large text are dispatched without it, so they do not wait for it
+        if self._texts and len(text) >= self.max_batch_characters:
+            self._dispatch()
+
+        future = loop.create_future()
+        self._texts.append(text)
+        self._futures.append(future)
+        self._characters += len(text)
+
+        if (
+            len(self._texts) >= self.max_batch_size
+            or self._characters >= self.max_batch_characters
+        ):
+            self._dispatch()
+        elif self._timer is None:
+            if self.max_delay:
+                self._timer = loop.call_later(self.max_delay, self._dispatch)
+            else:
+                self._timer = loop.call_soon(self._dispatch)
+
+        return future
+
+    def _dispatch(self):
+        """
+        Runs the current batch on the executor and starts a new one.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        texts, futures = self._texts, self._futures
+        self._texts, self._futures, self._characters = [], [], 0
+        if not texts:
+            return
+
+        batch = self._loop.run_in_executor(
+            self.executor, _extract_each, self.extractor, texts
+        )
+
+        def resolve(batch: asyncio.Future):
+            if batch.cancelled() or batch.exception() is not None:
+                error = (
+                    asyncio.CancelledError() if batch.cancelled() else batch.exception()
+                )
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+            for future, (result, error) in zip(futures, batch.result()):
+                # The caller may have stopped waiting
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        batch.add_done_callback(resolve)
+
+    async def aextract(self, text: str) -> dict[str, str]:
+        """
+        Extracts primary terms from a text on the executor, batched with the other concurrent requests.
+
+        Args:
+            text (str): The input text from which to extract primary terms.
+
+        Returns:
+            dict[str, str]: The result of extract_primary_terms() for the text.
+        """
+        return await self.submit(text)
+
+    async def aextract_batch(
+        self,
+        texts: AsyncIterable[str] | Iterable[str],
+        max_in_flight: int = 256,
+    ) -> AsyncIterator[dict[str, str]]:
+        """
+        Asynchronously yields the results of many texts in input order, keeping up to max_in_flight
+        texts submitted ahead of the one being awaited.
+
+        Args:
+            texts (AsyncIterable[str] | Iterable[str]): The input texts, e.g. an async stream of requests.
+            max_in_flight (int): The maximum number of texts submitted but not yet yielded. Default is 256.
+
+        Yields:
+            dict[str, str]: The result of extract_primary_terms() for each text, in input order.
+
+        Raises:
+            ValueError: If max_in_flight is less than 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+
+        in_flight: deque[asyncio.Future] = deque()
+        try:
+            if isinstance(texts, AsyncIterable):
+                async for text in texts:
+                    in_flight.append(self.submit(text))
+                    if len(in_flight) >= max_in_flight:
+                        yield await in_flight.popleft()
+            else:
+                for text in texts:
+                    in_flight.append(self.submit(text))
+                    if len(in_flight) >= max_in_flight:
+                        yield await in_flight.popleft()
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            # Results that will not be consumed are not waited for
+            for future in in_flight:
+                future.cancel()
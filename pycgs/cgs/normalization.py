@@ -0,0 +1,215 @@
+"""
+This module contains a character-level text normalizer used to match terms regardless of case, width,
+Chinese script variants and separators.
+"""
+
+import re
+import unicodedata
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+
+__all__ = ["TextNormalizer", "TRADITIONAL_TO_SIMPLIFIED", "is_word_char"]
+
+
+# Hyphen and dash characters folded like whitespace, in addition to the ASCII hyphen-minus
+HYPHENS = "-‐‑‒–—―−﹘﹣－"
+
+# Characters from U+2E80 on (CJK, kana, Hangul, full-width forms, ...) are scanned at every position
+# and never treated as word characters
+WORD_SCRIPT_LIMIT = "\u2e80"
+
+# A word character, as defined by is_word_char()
+WORD_CHAR = r"[^\W_\u2e80-\U0010ffff]"
+
+# A run of word characters or any other single character. In word boundary mode, matches can only
+# start where one of these tokens starts.
+TOKEN = re.compile(f"{WORD_CHAR}+|.", re.DOTALL)
+
+# A small table of traditional Chinese characters common in natural medicinal material names.
+# It is not exhaustive: pass a complete table (e.g. exported from OpenCC) as variants for full coverage.
+TRADITIONAL_TO_SIMPLIFIED = {
+    "黃": "黄",
+    "質": "质",
+    "莖": "茎",
+    "葉": "叶",
+    "實": "实",
+    "種": "种",
+    "參": "参",
+    "歸": "归",
+    "術": "术",
+    "當": "当",
+    "藥": "药",
+    "連": "连",
+    "龍": "龙",
+    "膽": "胆",
+    "銀": "银",
+    "烏": "乌",
+    "蘆": "芦",
+    "薈": "荟",
+    "黨": "党",
+    "蘇": "苏",
+    "蓮": "莲",
+    "鹽": "盐",
+    "靈": "灵",
+    "紅": "红",
+    "綠": "绿",
+    "麥": "麦",
+    "馬": "马",
+    "棗": "枣",
+    "薑": "姜",
+    "雞": "鸡",
+    "貝": "贝",
+    "頭": "头",
+    "蟲": "虫",
+    "製": "制",
+    "殼": "壳",
+    "錢": "钱",
+    "廣": "广",
+    "東": "东",
+    "澤": "泽",
+    "瀉": "泻",
+    "會": "会",
+    "絲": "丝",
+    "飛": "飞",
+    "鳳": "凤",
+    "蘭": "兰",
+    "懷": "怀",
+    "車": "车",
+    "楓": "枫",
+    "陳": "陈",
+}
+
+
+def is_word_char(char: str) -> bool:
+    """
+    Returns whether a character is part of a space-delimited word, i.e. a letter or digit of a
+    non-CJK script such as Latin. Matches in word boundary mode may not start or end inside a word.
+    """
+    return char < WORD_SCRIPT_LIMIT and char.isalnum()
+
+
+class TextNormalizer:
+    """
+    A character-level normalizer that folds text through a per-character table.
+
+    Each character is mapped independently: to its simplified Chinese variant, through NFKC (which also
+    folds full-width and half-width forms), through case folding, and with every whitespace or hyphen
+    character folded to a single space. Runs of separators are collapsed into one space. The mapping
+    of each character is computed once and cached, and texts are folded lazily while they are scanned,
+    so no normalized copy of a text is made and every folded character keeps its original offsets.
+
+    Because characters are mapped independently, combining sequences are not composed: a term and a
+    text only match if they use the same composed or decomposed forms.
+
+    Attributes:
+        casefold (bool): Whether to apply Unicode case folding.
+        nfkc (bool): Whether to apply NFKC compatibility normalization.
+        fold_separators (bool): Whether to fold whitespace and hyphens to a single space.
+        variants (dict[str, str]): A character-to-character table, e.g. traditional to simplified Chinese.
+
+    Methods:
+        normalize(text): Returns the normalized text.
+        fold(chunks): Yields each normalized character of the chunks with its original offsets.
+        to_config(): Returns the settings as a JSON-serializable dictionary.
+        from_config(config): Creates a normalizer from the settings returned by to_config().
+    """
+
+    def __init__(
+        self,
+        casefold: bool = True,
+        nfkc: bool = True,
+        fold_separators: bool = True,
+        variants: Mapping[str, str] | None = None,
+    ):
+        """
+        Initializes the normalizer.
+
+        Args:
+            casefold (bool): Whether to apply Unicode case folding. Default is True.
+            nfkc (bool): Whether to apply NFKC compatibility normalization. Default is True.
+            fold_separators (bool): Whether to fold whitespace and hyphens to a single space. Default is True.
+            variants (Mapping[str, str] | None): A table mapping single characters to their preferred variant.
+                Default is None, which uses the built-in TRADITIONAL_TO_SIMPLIFIED table; an empty table
+                disables variant folding.
+        """
+        self.casefold = casefold
+        self.nfkc = nfkc
+        self.fold_separators = fold_separators
+        self.variants = dict(
+            TRADITIONAL_TO_SIMPLIFIED if variants is None else variants
+        )
+
+        # The normalized form of each character seen so far
+        self._table: dict[str, str] = {}
+
+    def _fold_char(self, char: str) -> str:
+        """
+        Computes and caches the normalized form of a character, which may be empty or several characters long.
+        """
+        folded = self.variants.get(char, char)
+        if self.nfkc:
+            folded = unicodedata.normalize("NFKC", folded)
+        if self.casefold:
+            folded = folded.casefold()
+        if self.fold_separators:
+            folded = "".join(" " if c.isspace() or c in HYPHENS else c for c in folded)
+        self._table[char] = folded
+        return folded
+
+    def fold(self, chunks: Iterable[str]) -> Iterator[tuple[str, int, int]]:
+        """
+        Yields each normalized character of the chunks with the offsets of the original character it comes from.
+
+        Args:
+            chunks (Iterable[str]): The consecutive chunks of a text.
+
+        Yields:
+            tuple[str, int, int]: A normalized character and the (start, end) offsets of its original
+            character in the whole text.
+        """
+        table = self._table
+        fold_separators = self.fold_separators
+        previous_separator = False
+        offset = 0
+
+        for chunk in chunks:
+            for i, char in enumerate(chunk, offset):
+                folded = table.get(char)
+                if folded is None:
+                    folded = self._fold_char(char)
+                for folded_char in folded:
+                    if fold_separators:
+                        # Collapse runs of separators into one space
+                        if folded_char == " ":
+                            if previous_separator:
+                                continue
+                            previous_separator = True
+                        else:
+                            previous_separator = False
+                    yield folded_char, i, i + 1
+            offset += len(chunk)
+
+    def normalize(self, text: str) -> str:
+        """
+        Returns the normalized text, as used for the terms of a dictionary.
+        """
+        return "".join(char for char, _, _ in self.fold((text,)))
+
+    def to_config(self) -> dict:
+        """
+        Returns the settings of the normalizer as a JSON-serializable dictionary.
+        """
+        return {
+            "casefold": self.casefold,
+            "nfkc": self.nfkc,
+            "fold_separators": self.fold_separators,
+            "variants": self.variants,
+        }
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "TextNormalizer":
+        """
+        Creates a normalizer from the settings returned by to_config().
+        """
+        return cls(**config)
@@ -1,40 +1,435 @@
+import json
+import os
+import threading
+from array import array
+from collections import deque
+from collections.abc import AsyncIterable, Mapping
+from functools import cached_property
+from itertools import chain, islice
+from time import perf_counter
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, TextIO
+
 import marisa_trie
 
+from .aho_corasick import AhoCorasickAutomaton
+from .fuzzy_index import FuzzyIndex
+from .instrumentation import CallMetrics, MetricsCallback, _CountingTrie
+from .match_policy import _check_policy, select_max_coverage
+from .match_spans import MatchSpans
+from .normalization import TOKEN, TextNormalizer, is_word_char
+from .result_cache import CacheInfo, ResultCache
+from .term_index import PrimaryTermIndex
+
+if TYPE_CHECKING:
+    from .micro_batcher import MicroBatcher
+
+
+BACKENDS = ("trie", "automaton")
+
+EXTRACTOR_CONFIG_FILENAME = "extractor.json"
+
+# The extractor shared by the worker processes of extract_batch(), set once per worker by the pool initializer
+_worker_extractor: "PrimaryTermExtractor | None" = None
+
+
+def _init_worker(extractor: "PrimaryTermExtractor"):
+    """
+    Stores the extractor in the worker process so that it is transferred once per worker instead of once per task.
+    """
+    global _worker_extractor  # pylint: disable=global-statement
+    _worker_extractor = extractor
+
+
+def _extract_in_worker(text: str) -> dict[str, str]:
+    """
+    Extracts primary terms from a text with the extractor of the current worker process.
+    """
+    return _worker_extractor.extract_primary_terms(text)
+
+
+def _check_backend(backend: str):
+    """
+    Raises a ValueError if the backend is not supported.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unsupported backend: {backend!r}. Expected one of {BACKENDS}."
+        )
+
+
+def _iter_chunks(
+    stream: TextIO | Iterable[str] | str, chunk_size: int
+) -> Iterator[str]:
+    """
+    Splits a file object or a string into chunks of chunk_size characters; other iterables are passed through.
+    """
+    if isinstance(stream, str):
+        for i in range(0, len(stream), chunk_size):
+            yield stream[i : i + chunk_size]
+    elif hasattr(stream, "read"):
+        while chunk := stream.read(chunk_size):
+            yield chunk
+    else:
+        yield from stream
+
+
+def _at_word_boundaries(text: str, start: int, end: int) -> bool:
+    """
+    Returns whether text[start:end] neither starts nor ends inside a word.
+    """
+    if 0 < start and is_word_char(text[start - 1]) and is_word_char(text[start]):
+        return False
+    if end < len(text) and is_word_char(text[end - 1]) and is_word_char(text[end]):
+        return False
+    return True
+
+
+def _lower(text: str) -> str:
+    """
+    Lowercases a text for case-insensitive matching, one character for one character, so that the offsets
+    of matches still refer to the original text. The few characters whose lowercase form is longer, such
+    as "İ", are folded to its first character.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join([char.lower()[0] for char in text])
+
+
+def _save_config(
+    path: str | os.PathLike,
+    ignore_case: bool,
+    backend: str,
+    max_term_length: int,
+    normalizer: TextNormalizer | None,
+    word_boundaries: bool,
+):
+    """
+    Writes the settings of an extractor next to its index, to be read by PrimaryTermExtractor.load().
+    """
+    config = {
+        "ignore_case": ignore_case,
+        "backend": backend,
+        "max_term_length": max_term_length,
+        "normalizer": normalizer.to_config() if normalizer is not None else None,
+        "word_boundaries": word_boundaries,
+    }
+    with open(
+        os.path.join(path, EXTRACTOR_CONFIG_FILENAME), "w", encoding="utf-8"
+    ) as f:
+        json.dump(config, f)
+
+
+class _Snapshot:
+    """
+    An immutable version of the dictionary of an extractor and the structures compiled from it.
+
+    The id-based structures used by the span APIs are only built when they are first needed.
+    """
+
+    def __init__(
+        self,
+        primary_term_dict: Mapping[str, str],
+        trie: marisa_trie.Trie,
+        max_term_length: int,
+        automaton: AhoCorasickAutomaton | None,
+    ):
+        self.primary_term_dict = primary_term_dict
+        self.trie = trie
+        self.max_term_length = max_term_length
+        self.automaton = automaton
+        # (max_distance, min_length) -> the fuzzy index built for these settings
+        self._fuzzy_indexes: dict[tuple[int, int], FuzzyIndex] = {}
+
+    @cached_property
+    def index(self) -> PrimaryTermIndex:
+        """
+        The index that assigns ids to the terms and the interned primary terms.
+        """
+        if isinstance(self.primary_term_dict, PrimaryTermIndex):
+            return self.primary_term_dict
+        return PrimaryTermIndex.from_dict(self.primary_term_dict, self.trie)
+
+    def fuzzy_index(self, max_distance: int, min_length: int) -> FuzzyIndex:
+        """
+        The index used to find the approximate occurrences of the terms, built on first use.
+        """
+        key = (max_distance, min_length)
+        fuzzy_index = self._fuzzy_indexes.get(key)
+        if fuzzy_index is None:
+            fuzzy_index = FuzzyIndex(self.primary_term_dict, max_distance, min_length)
+            self._fuzzy_indexes[key] = fuzzy_index
+        return fuzzy_index
+
+    @cached_property
+    def match_automaton(self) -> AhoCorasickAutomaton:
+        """
+        The automaton that finds all the matches: the compiled one with the "automaton" backend, or
+        one built on first use with the "trie" backend.
+        """
+        if self.automaton is not None:
+            return self.automaton
+        return AhoCorasickAutomaton(self.primary_term_dict)
+
+    @cached_property
+    def automaton_term_ids(self) -> array:
+        """
+        The term id in the trie of each term of the automaton.
+        """
+        trie = self.trie
+        return array("i", (trie[term] for term in self.match_automaton.terms))
+
+
+class _CountingSnapshot:
+    """
+    A view of a snapshot whose trie counts the lookups made through it, used by instrumented calls.
+
+    Everything else, including the structures built on first use, is read from the snapshot itself.
+    """
+
+    def __init__(self, snapshot: _Snapshot):
+        self._snapshot = snapshot
+        self.trie = _CountingTrie(snapshot.trie)
+
+    def __getattr__(self, name: str):
+        return getattr(self._snapshot, name)
+
+
+def _report_metrics(
+    metrics_callback: MetricsCallback,
+    operation: str,
+    started: float,
+    snapshot: _CountingSnapshot,
+    counters: dict[str, int],
+):
+    """
+    Reports the metrics of an instrumented extraction, adding the trie lookups counted by its snapshot.
+    """
+    counters["trie_probes"] = snapshot.trie.probes
+    metrics_callback(CallMetrics(operation, perf_counter() - started, counters))
+
 
 class PrimaryTermExtractor:
     """
     A class used to extract primary terms from texts using an exact match from a dictionary of terms.
 
+    The dictionary and the structures compiled from it form an immutable snapshot. Updates build a
+    new snapshot on the side and publish it with a single attribute assignment, so each extraction
+    call works on one consistent snapshot without taking a lock.
+
     Attributes:
-        primary_term_dict (dict): A dictionary mapping terms to their primary terms.
+        primary_term_dict (Mapping): A dictionary mapping terms to their primary terms, or a
+            PrimaryTermIndex when the extractor is loaded from disk.
         trie (marisa_trie.Trie): A trie structure to efficiently match terms from the primary_term_dict.
         ignore_case (bool): Flag to indicate if the matching should be case-insensitive.
+        normalizer (TextNormalizer | None): The normalizer applied to the terms and, while scanning, to the texts.
+        word_boundaries (bool): Flag to indicate if matches may not start or end inside a word.
+        backend (str): The scan engine used for matching, either "trie" or "automaton".
+        automaton (AhoCorasickAutomaton | None): The compiled automaton when the "automaton" backend is used.
+        metrics_callback (MetricsCallback | None): The function called with the CallMetrics of each
+            extraction, or None to disable the instrumentation.
 
     Methods:
-        extract_primary_terms(text): Extracts primary terms from the input text using the trie.
+        extract_primary_terms(text, policy): Extracts primary terms from the input text using the trie.
+        extract_batch(texts, workers, chunksize): Extracts primary terms from many texts, optionally in parallel.
+        aextract(text): Extracts primary terms from a text without blocking the event loop.
+        aextract_batch(texts, max_in_flight): Asynchronously yields the results of many texts in input order.
+        extract_stream(stream, chunk_size): Yields the matched terms of a text stream as it is read.
+        save(path): Writes the extractor as a compiled index to a directory.
+        load(path, mmap, backend): Loads an extractor from a directory written by save().
+        update(changes): Adds, changes or deletes terms while extraction keeps running.
+        replace(primary_term_dict): Swaps in a whole new dictionary while extraction keeps running.
+        iter_matches(text, policy): Yields every match of the text as a tuple of offsets and ids.
+        find_spans(text, policy): Returns every match of the text as compact arrays of offsets and ids.
+        find_spans_batch(texts, policy): Returns every match of many texts as compact arrays, with row offsets.
+        extract_fuzzy(text, max_distance, min_length): Returns the exact and approximate matches of the text.
+        cache_info(): Returns the statistics of the result cache.
+        cache_clear(): Drops the cached results.
     """
 
-    def __init__(self, primary_term_dict: dict[str, str], ignore_case: bool = False):
+    def __init__(
+        self,
+        primary_term_dict: dict[str, str],
+        ignore_case: bool = False,
+        backend: str = "trie",
+        normalizer: TextNormalizer | None = None,
+        word_boundaries: bool = False,
+        cache_size: int = 0,
+        cache_max_bytes: int | None = None,
+        metrics_callback: MetricsCallback | None = None,
+    ):
         """
         Initializes the PrimaryTermExtractor with a primary term dictionary and builds a trie for efficient matching.
 
         Args:
             primary_term_dict (dict): A dictionary where keys are terms and values are their corresponding primary terms.
             ignore_case (bool): Whether to enable case-insensitive matching. Default is False.
+            backend (str): The scan engine to use. "trie" probes the trie at each position of the text,
+                while "automaton" compiles an Aho-Corasick automaton that scans each text once in linear time.
+                Both backends return identical results. Default is "trie".
+            normalizer (TextNormalizer | None): A normalizer for case, width, Chinese variants and separators.
+                The terms are normalized once when the extractor is built, and each text is folded character
+                by character while it is scanned, without a normalized copy; offsets still refer to the
+                original text and the matched terms are reported in their normalized form. Default is None.
+            word_boundaries (bool): Whether to only match terms at word boundaries. A match may not start
+                right after, or end right before, a letter or digit of a space-delimited script such as Latin,
+                so "Qing-hao" is not found inside "Qing-haoxyz". CJK characters have no word boundaries and
+                are still matched at every position. Default is False.
+            cache_size (int): The number of texts whose results of extract_primary_terms() are kept in an
+                LRU cache, so that repeated texts are not scanned again. The cache is dropped whenever the
+                dictionary changes. Default is 0, which disables the cache.
+            cache_max_bytes (int | None): The maximum approximate memory size of the cached results.
+                Default is None, which only bounds the number of texts.
+            metrics_callback (MetricsCallback | None): A function called with the CallMetrics of each call
+                to extract_primary_terms(), find_spans(), find_spans_batch() and extract_fuzzy(): its time,
+                the characters scanned, the trie lookups, the matches and the cache hits. It can also be set
+                or removed later through the attribute. Default is None, which disables the instrumentation.
+
+        Raises:
+            ValueError: If the backend is not supported, if both ignore_case and a normalizer are given,
+                or if the cache limits are invalid.
         """
+        _check_backend(backend)
+        if ignore_case and normalizer is not None:
+            raise ValueError(
+                "ignore_case cannot be combined with a normalizer; use TextNormalizer(casefold=True) instead."
+            )
+
         self.ignore_case = ignore_case
+        self.backend = backend
+        self.normalizer = normalizer
+        self.word_boundaries = word_boundaries
+        self.metrics_callback = metrics_callback
+
+        self._cache = ResultCache(cache_size, cache_max_bytes) if cache_size else None
+
+        # Created on the first asynchronous call
+        self._micro_batcher: "MicroBatcher | None" = None
+
+        # Serializes the writers; readers never take it
+        self._update_lock = threading.Lock()
+        self._publish(self._build_snapshot(self._prepare(primary_term_dict)))
 
+    def _prepare(self, primary_term_dict: Mapping[str, str]) -> Mapping[str, str]:
+        """
+        Returns the dictionary as it is matched, with lowercase keys if ignore_case is True and
+        normalized keys if a normalizer is used.
+        """
+        if self.normalizer is not None:
+            normalize = self.normalizer.normalize
+            return {normalize(k): v for k, v in primary_term_dict.items()}
         # If ignore_case is True, convert both keys and values of the dictionary to lowercase
         if self.ignore_case:
-            self.primary_term_dict = {
-                k.lower(): v for k, v in primary_term_dict.items()
-            }
-            self.trie = marisa_trie.Trie(k.lower() for k in primary_term_dict.keys())
-        else:
-            self.primary_term_dict = primary_term_dict
-            self.trie = marisa_trie.Trie(primary_term_dict.keys())
+            return {_lower(k): v for k, v in primary_term_dict.items()}
+        return primary_term_dict
+
+    def _build_snapshot(
+        self,
+        primary_term_dict: Mapping[str, str],
+        trie: marisa_trie.Trie | None = None,
+        max_term_length: int | None = None,
+    ) -> _Snapshot:
+        """
+        Builds the trie, and the automaton if the "automaton" backend is used, for a dictionary.
+        """
+        if trie is None:
+            trie = marisa_trie.Trie(primary_term_dict.keys())
+        if max_term_length is None:
+            # The longest term bounds how much text a single match can cover
+            max_term_length = max(map(len, primary_term_dict), default=0)
+        automaton = (
+            AhoCorasickAutomaton(primary_term_dict)
+            if self.backend == "automaton"
+            else None
+        )
+        return _Snapshot(primary_term_dict, trie, max_term_length, automaton)
+
+    def _publish(self, snapshot: _Snapshot):
+        """
+        Makes a snapshot the current one and drops the results cached for the previous one.
+        """
+        self._snapshot = snapshot
+        if self._cache is not None:
+            self._cache.clear(snapshot)
 
-    def extract_primary_terms(self, text: str) -> dict[str, str]:
+    @property
+    def primary_term_dict(self) -> Mapping[str, str]:
+        """
+        The dictionary mapping terms to their primary terms in the current snapshot.
+        """
+        return self._snapshot.primary_term_dict
+
+    @property
+    def trie(self) -> marisa_trie.Trie:
+        """
+        The trie of the terms in the current snapshot.
+        """
+        return self._snapshot.trie
+
+    @property
+    def max_term_length(self) -> int:
+        """
+        The length of the longest term in the current snapshot.
+        """
+        return self._snapshot.max_term_length
+
+    @property
+    def automaton(self) -> AhoCorasickAutomaton | None:
+        """
+        The compiled automaton of the current snapshot when the "automaton" backend is used.
+        """
+        return self._snapshot.automaton
+
+    def update(self, changes: Mapping[str, str | None]):
+        """
+        Adds, changes or deletes terms without interrupting running extractions.
+
+        A copy of the dictionary is updated and compiled, then published atomically. Calls that
+        started before the update finish on the previous snapshot; later calls see the new one.
+        The change-sets returned by CGSIndex can be applied directly.
+
+        Args:
+            changes (Mapping[str, str | None]): The new primary term of each added or changed term,
+                or None for each term to delete. Deleting a missing term is ignored.
+        """
+        with self._update_lock:
+            primary_term_dict = dict(self._snapshot.primary_term_dict)
+            for term, primary_term in self._prepare_changes(changes):
+                if primary_term is None:
+                    primary_term_dict.pop(term, None)
+                else:
+                    primary_term_dict[term] = primary_term
+            self._publish(self._build_snapshot(primary_term_dict))
+
+    def replace(self, primary_term_dict: Mapping[str, str]):
+        """
+        Swaps in a whole new dictionary without interrupting running extractions.
+
+        Args:
+            primary_term_dict (Mapping[str, str]): The new dictionary mapping terms to their primary terms.
+        """
+        snapshot = self._build_snapshot(self._prepare(primary_term_dict))
+        with self._update_lock:
+            self._publish(snapshot)
+
+    def _prepare_changes(
+        self, changes: Mapping[str, str | None]
+    ) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields the changes with lowercase terms if ignore_case is True and normalized terms if a
+        normalizer is used.
+        """
+        if self.normalizer is not None:
+            normalize = self.normalizer.normalize
+            for term, primary_term in changes.items():
+                yield normalize(term), primary_term
+            return
+        for term, primary_term in changes.items():
+            yield (_lower(term) if self.ignore_case else term), primary_term
+
+    def extract_primary_terms(
+        self, text: str, policy: str = "longest"
+    ) -> dict[str, str]:
         """
         Extracts primary terms from the given text by matching terms from the primary_term_dict.
 
@@ -44,31 +439,875 @@ class PrimaryTermExtractor:
 
         Args:
             text (str): The input text from which to extract primary terms.
+            policy (str): Which of the overlapping matches are reported: "longest" for the leftmost-longest
+                matches, "all" for every match including nested ones, or "coverage" for the non-overlapping
+                matches that cover the most of the text. Only the "longest" results are cached.
+                Default is "longest".
 
         Returns:
             dict[str, str]: A dictionary where the keys are the matched terms found in the text and
             the values are their corresponding primary terms.
+
+        Raises:
+            ValueError: If the policy is not supported.
         """
+        _check_policy(policy)
+        # Work on one snapshot, even if the dictionary is updated during the call
+        snapshot = self._snapshot
+        scanned_snapshot = snapshot
+
+        metrics_callback = self.metrics_callback
+        if metrics_callback is not None:
+            started = perf_counter()
+            scanned_snapshot = _CountingSnapshot(snapshot)
+
+        cache = self._cache if policy == "longest" else None
+        if cache is not None:
+            cached = cache.get(text, snapshot)
+            if cached is not None:
+                primary_term_map, matches = cached
+                if metrics_callback is not None:
+                    _report_metrics(
+                        metrics_callback,
+                        "extract_primary_terms",
+                        started,
+                        scanned_snapshot,
+                        {
+                            "texts": 1,
+                            "characters": 0,
+                            "matches": matches,
+                            "cache_hits": 1,
+                        },
+                    )
+                return primary_term_map
+
         primary_term_map = {}
+        primary_term_dict = snapshot.primary_term_dict
 
         # If ignore_case is enabled, convert the text to lowercase
+        scanned_text = _lower(text) if self.ignore_case else text
+
+        matches = 0
+        if policy == "longest":
+            for _, _, term in self._iter_longest_matches(
+                scanned_text, scanned_snapshot
+            ):
+                primary_term_map[term] = primary_term_dict[term]
+                matches += 1
+        else:
+            restore_key = snapshot.trie.restore_key
+            for _, _, term_id in self._select_match_ids(
+                scanned_text, scanned_snapshot, policy
+            ):
+                term = restore_key(term_id)
+                primary_term_map[term] = primary_term_dict[term]
+                matches += 1
+
+        if cache is not None:
+            cache.put(text, primary_term_map, snapshot, matches)
+
+        if metrics_callback is not None:
+            counters = {"texts": 1, "characters": len(text), "matches": matches}
+            if cache is not None:
+                counters["cache_hits"] = 0
+            _report_metrics(
+                metrics_callback,
+                "extract_primary_terms",
+                started,
+                scanned_snapshot,
+                counters,
+            )
+        return primary_term_map
+
+    def cache_info(self) -> CacheInfo | None:
+        """
+        Returns the hits, misses, limits and current size of the result cache, or None if it is disabled.
+        """
+        if self._cache is None:
+            return None
+        return self._cache.info()
+
+    def cache_clear(self):
+        """
+        Drops the cached results, keeping the hit and miss counts.
+        """
+        if self._cache is not None:
+            self._cache.clear(self._snapshot)
+
+    def iter_matches(
+        self, text: str, policy: str = "longest"
+    ) -> Iterator[tuple[int, int, int, int]]:
+        """
+        Yields every match in the text with its offsets, without building a string per match.
+
+        Unlike extract_primary_terms(), repeated occurrences of a term are all reported. The ids refer
+        to the current PrimaryTermIndex, available as find_spans(text).index, whose tries resolve
+        them to strings; they may change when the dictionary is updated.
+
+        Args:
+            text (str): The input text from which to extract primary terms.
+            policy (str): Which of the overlapping matches are reported: "longest", "all" or "coverage",
+                as in extract_primary_terms(). Default is "longest".
+
+        Yields:
+            tuple[int, int, int, int]: The (start, end, term_id, primary_id) of each match, in text order,
+            and from the longest to the shortest for matches starting at the same offset.
+
+        Raises:
+            ValueError: If the policy is not supported.
+        """
+        _check_policy(policy)
+        snapshot = self._snapshot
+        primary_ids = snapshot.index.primary_ids
+
         if self.ignore_case:
-            text = text.lower()
+            text = _lower(text)
+
+        for start, end, term_id in self._select_match_ids(text, snapshot, policy):
+            yield start, end, term_id, primary_ids[term_id]
+
+    def find_spans(self, text: str, policy: str = "longest") -> MatchSpans:
+        """
+        Returns every match in the text as parallel arrays of offsets and ids.
+
+        Args:
+            text (str): The input text from which to extract primary terms.
+            policy (str): Which of the overlapping matches are reported: "longest", "all" or "coverage",
+                as in extract_primary_terms(). Default is "longest".
+
+        Returns:
+            MatchSpans: The (start, end, term_id, primary_id) of each match, in text order, together
+            with the index that resolves the ids to strings.
+
+        Raises:
+            ValueError: If the policy is not supported.
+        """
+        _check_policy(policy)
+        snapshot = self._snapshot
+        index = snapshot.index
+        primary_ids = index.primary_ids
+        spans = MatchSpans(index)
+
+        metrics_callback = self.metrics_callback
+        if metrics_callback is not None:
+            started = perf_counter()
+            snapshot = _CountingSnapshot(snapshot)
+
+        if self.ignore_case:
+            text = _lower(text)
+
+        for start, end, term_id in self._select_match_ids(text, snapshot, policy):
+            spans.append(start, end, term_id, primary_ids[term_id])
+
+        if metrics_callback is not None:
+            _report_metrics(
+                metrics_callback,
+                "find_spans",
+                started,
+                snapshot,
+                {"texts": 1, "characters": len(text), "matches": len(spans)},
+            )
+        return spans
+
+    def find_spans_batch(
+        self, texts: Iterable[str | None], policy: str = "longest"
+    ) -> tuple[array, MatchSpans]:
+        """
+        Returns every match of many texts as one set of parallel arrays, found on one snapshot of the dictionary.
+
+        The matches of the i-th text are spans[row_offsets[i]:row_offsets[i + 1]], which is the layout
+        of an Arrow list column. None texts, e.g. missing values, have no matches.
 
+        Args:
+            texts (Iterable[str | None]): The input texts from which to extract primary terms.
+            policy (str): Which of the overlapping matches are reported: "longest", "all" or "coverage",
+                as in extract_primary_terms(). Default is "longest".
+
+        Returns:
+            tuple[array, MatchSpans]: The row offsets, one more than the number of texts, and the matches
+            of all the texts, with offsets relative to the start of each text.
+
+        Raises:
+            ValueError: If the policy is not supported.
+        """
+        _check_policy(policy)
+        snapshot = self._snapshot
+        index = snapshot.index
+        primary_ids = index.primary_ids
+        spans = MatchSpans(index)
+        row_offsets = array("q", [0])
+
+        metrics_callback = self.metrics_callback
+        if metrics_callback is not None:
+            started = perf_counter()
+            snapshot = _CountingSnapshot(snapshot)
+        characters = 0
+
+        for text in texts:
+            if text is not None:
+                characters += len(text)
+                if self.ignore_case:
+                    text = _lower(text)
+                for start, end, term_id in self._select_match_ids(
+                    text, snapshot, policy
+                ):
+                    spans.append(start, end, term_id, primary_ids[term_id])
+            row_offsets.append(len(spans))
+
+        if metrics_callback is not None:
+            _report_metrics(
+                metrics_callback,
+                "find_spans_batch",
+                started,
+                snapshot,
+                {
+                    "texts": len(row_offsets) - 1,
+                    "characters": characters,
+                    "matches": len(spans),
+                },
+            )
+
+        return row_offsets, spans
+
+    def extract_fuzzy(
+        self, text: str, max_distance: int = 1, min_length: int = 5
+    ) -> list[tuple[int, int, str, str, int]]:
+        """
+        Returns the exact and approximate matches of the text, within a maximum edit distance, e.g. to
+        recover terms with OCR or typing errors such as "Artemisia anua".
+
+        The approximate occurrences are found with a FuzzyIndex, built once per snapshot and setting,
+        which only verifies the positions where a piece of a term occurs exactly. When matches overlap,
+        the one with the smallest distance wins, then the longest, then the leftmost. The normalizer
+        and word boundary settings of the extractor apply to the approximate matches as well.
+
+        Args:
+            text (str): The input text from which to extract primary terms.
+            max_distance (int): The maximum edit distance (insertions, deletions and substitutions)
+                between a term and its occurrence. Default is 1.
+            min_length (int): The minimum length of a term to be matched approximately; shorter terms
+                are only matched exactly. Default is 5.
+
+        Returns:
+            list[tuple[int, int, str, str, int]]: The (start, end, term, primary_term, distance) of each
+            non-overlapping match, in text order, where term is the dictionary term that was matched.
+
+        Raises:
+            ValueError: If max_distance is less than 1 or min_length is not greater than max_distance.
+        """
+        snapshot = self._snapshot
+        fuzzy_index = snapshot.fuzzy_index(max_distance, min_length)
+        primary_term_dict = snapshot.primary_term_dict
+
+        metrics_callback = self.metrics_callback
+        if metrics_callback is not None:
+            started = perf_counter()
+            snapshot = _CountingSnapshot(snapshot)
+
+        candidates = [
+            (start, end, term, 0)
+            for start, end, term in self._iter_longest_matches(
+                _lower(text) if self.ignore_case else text, snapshot
+            )
+        ]
+
+        # The approximate matches are searched in the text as it is matched, with a normalizer as it is
+        # folded, which reports the offsets in the original text
+        if self.normalizer is not None:
+            scanned_text = self.normalizer.fold((text,))
+        else:
+            scanned_text = _lower(text) if self.ignore_case else text
+        for start, end, term_index, distance in fuzzy_index.iter_candidates(
+            scanned_text
+        ):
+            if self.word_boundaries and not _at_word_boundaries(text, start, end):
+                continue
+            candidates.append((start, end, fuzzy_index.terms[term_index], distance))
+
+        # Keep the best of overlapping matches
+        candidates.sort(key=lambda c: (c[3], c[0] - c[1], c[0]))
+        taken = bytearray(len(text))
+        matches = []
+        for start, end, term, distance in candidates:
+            if taken.find(1, start, end) != -1:
+                continue
+            taken[start:end] = b"\x01" * (end - start)
+            matches.append((start, end, term, primary_term_dict[term], distance))
+
+        matches.sort()
+        if metrics_callback is not None:
+            _report_metrics(
+                metrics_callback,
+                "extract_fuzzy",
+                started,
+                snapshot,
+                {"texts": 1, "characters": len(text), "matches": len(matches)},
+            )
+        return matches
+
+    def extract_batch(
+        self,
+        texts: Iterable[str],
+        workers: int | None = 1,
+        chunksize: int = 256,
+    ) -> Iterator[dict[str, str]]:
+        """
+        Extracts primary terms from an iterable of texts, yielding the results in input order.
+
+        With more than one worker, the texts are spread over a process pool. The extractor is sent
+        to each worker once when the pool starts, rather than being pickled with every task, and
+        texts are dispatched in chunks to amortize the inter-process communication. As with any
+        multiprocessing pool, a script calling it with more than one worker must guard its entry point
+        with `if __name__ == "__main__":`, since under the spawn start method (the default on macOS and
+        Windows) each worker re-imports the main module.
+
+        Args:
+            texts (Iterable[str]): The input texts from which to extract primary terms.
+            workers (int | None): The number of worker processes. 1 extracts in the current process,
+                and None uses one worker per CPU. Default is 1.
+            chunksize (int): The number of texts sent to a worker at a time. Default is 256.
+
+        Returns:
+            Iterator[dict[str, str]]: The result of extract_primary_terms() for each text, in input order.
+
+        Raises:
+            ValueError: If workers or chunksize is less than 1.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1.")
+
+        if workers == 1:
+            return map(self.extract_primary_terms, texts)
+
+        return self._extract_batch_in_pool(texts, workers, chunksize)
+
+    def _extract_batch_in_pool(
+        self, texts: Iterable[str], workers: int, chunksize: int
+    ) -> Iterator[dict[str, str]]:
+        """
+        Yields the results of extract_primary_terms() for the texts, computed by a process pool.
+        """
+        # Imported on first use, as it is slow to import and most processes never start a pool
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(self,)
+        ) as pool:
+            yield from pool.imap(_extract_in_worker, texts, chunksize)
+
+    async def aextract(self, text: str) -> dict[str, str]:
+        """
+        Extracts primary terms from a text without blocking the event loop.
+
+        Concurrent calls are grouped into micro-batches that run on the default executor of the loop,
+        so a long scan never stalls the other coroutines. Use a MicroBatcher directly to tune the
+        batching or to use another executor.
+
+        Args:
+            text (str): The input text from which to extract primary terms.
+
+        Returns:
+            dict[str, str]: The result of extract_primary_terms() for the text.
+        """
+        return await self._get_micro_batcher().aextract(text)
+
+    def aextract_batch(
+        self, texts: AsyncIterable[str] | Iterable[str], max_in_flight: int = 256
+    ) -> AsyncIterator[dict[str, str]]:
+        """
+        Asynchronously yields the primary terms of many texts in input order, e.g. for `async for`
+        over a stream of requests, batching them like aextract().
+
+        Args:
+            texts (AsyncIterable[str] | Iterable[str]): The input texts.
+            max_in_flight (int): The maximum number of texts submitted but not yet yielded. Default is 256.
+
+        Returns:
+            AsyncIterator[dict[str, str]]: The result of extract_primary_terms() for each text, in input order.
+        """
+        return self._get_micro_batcher().aextract_batch(texts, max_in_flight)
+
+    def _get_micro_batcher(self) -> "MicroBatcher":
+        """
+        Returns the batcher of the asynchronous API, creating it on first use.
+        """
+        if self._micro_batcher is None:
+            # Imported on first use, as asyncio is slow to import
+            from .micro_batcher import (  # pylint: disable=import-outside-toplevel
+                MicroBatcher,
+            )
+
+            self._micro_batcher = MicroBatcher(self)
+        return self._micro_batcher
+
+    def extract_stream(
+        self, stream: TextIO | Iterable[str] | str, chunk_size: int = 65536
+    ) -> Iterator[tuple[int, int, str, str]]:
+        """
+        Yields the matched terms of a text stream as it is read, with bounded memory.
+
+        The stream is consumed chunk by chunk. Only the unresolved tail of the previous chunk, at most
+        as long as the longest term, is carried over to the next one, so a term split between two
+        reads is still found while memory stays at about chunk_size plus the longest term length.
+        The matches are the same as those found by extract_primary_terms() on the whole text.
+
+        Args:
+            stream (TextIO | Iterable[str] | str): A text file object, an iterable of text chunks, or a
+                (possibly huge) string that is processed one chunk at a time.
+            chunk_size (int): The number of characters read from a file object or string at a time.
+                Default is 65536.
+
+        Yields:
+            tuple[int, int, str, str]: The (start, end, term, primary_term) of each match, where start
+            and end are offsets in the whole stream.
+
+        Raises:
+            ValueError: If chunk_size is less than 1.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        return self._extract_stream(_iter_chunks(stream, chunk_size))
+
+    def _extract_stream(
+        self, chunks: Iterable[str]
+    ) -> Iterator[tuple[int, int, str, str]]:
+        """
+        Yields the matches of a stream of text chunks, carrying the unresolved tail across chunks.
+        """
+        # Work on one snapshot for the whole stream, even if the dictionary is updated meanwhile
+        snapshot = self._snapshot
+        primary_term_dict = snapshot.primary_term_dict
+
+        if self.normalizer is not None or self.word_boundaries:
+            # The characters are scanned as they are read, so no tail needs to be carried over
+            if self.normalizer is not None:
+                matches = self._iter_normalized_match_ids(chunks, snapshot)
+            else:
+                if self.ignore_case:
+                    chunks = map(_lower, chunks)
+                matches = self._iter_longest_match_ids_in_chars(
+                    chain.from_iterable(chunks), snapshot
+                )
+            restore_key = snapshot.trie.restore_key
+            for start, end, term_id in matches:
+                term = restore_key(term_id)
+                yield start, end, term, primary_term_dict[term]
+            return
+
+        lookahead = snapshot.max_term_length
+        buffer = ""
+        offset = 0  # The offset of buffer[0] in the whole stream
+
+        for chunk in chunks:
+            # Only the current chunk is lowercased, never the whole text
+            if self.ignore_case:
+                chunk = _lower(chunk)
+            buffer += chunk
+
+            # The longest match starting before the limit lies entirely within the buffer
+            limit = len(buffer) - lookahead + 1
+            if limit <= 0:
+                continue
+
+            cursor = 0
+            for start, end, term in self._iter_longest_matches(buffer, snapshot):
+                if start >= limit:
+                    break
+                yield offset + start, offset + end, term, primary_term_dict[term]
+                cursor = end
+
+            # Keep the tail that may still contain the start of a match
+            keep = max(cursor, limit)
+            buffer = buffer[keep:]
+            offset += keep
+
+        for start, end, term in self._iter_longest_matches(buffer, snapshot):
+            yield offset + start, offset + end, term, primary_term_dict[term]
+
+    def save(self, path: str | os.PathLike):
+        """
+        Writes the extractor as a compiled index to a directory, creating it if needed.
+
+        The directory holds the trie of terms, a trie of the distinct primary terms and an array
+        mapping each term id to its primary term id, so that it can be memory-mapped by load().
+
+        Args:
+            path (str | os.PathLike): The directory to write the extractor to.
+        """
+        snapshot = self._snapshot
+        index = snapshot.primary_term_dict
+        if not isinstance(index, PrimaryTermIndex):
+            index = PrimaryTermIndex.from_dict(index, snapshot.trie)
+        index.save(path)
+
+        _save_config(
+            path,
+            self.ignore_case,
+            self.backend,
+            snapshot.max_term_length,
+            self.normalizer,
+            self.word_boundaries,
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: str | os.PathLike,
+        mmap: bool = True,
+        backend: str | None = None,
+        cache_size: int = 0,
+        cache_max_bytes: int | None = None,
+    ) -> "PrimaryTermExtractor":
+        """
+        Loads an extractor from a directory written by save().
+
+        With mmap enabled, the index is memory-mapped rather than read, so that processes loading the
+        same directory share one page-cached copy and start without parsing or rebuilding anything.
+        Pickling a loaded extractor, e.g. for extract_batch(), re-loads it from the same directory.
+
+        Args:
+            path (str | os.PathLike): The directory to load the extractor from.
+            mmap (bool): Whether to memory-map the index instead of reading it into memory. Default is True.
+            backend (str | None): The scan engine to use. Default is None, which uses the saved backend.
+            cache_size (int): The number of texts whose results are cached. Default is 0 (no cache).
+            cache_max_bytes (int | None): The maximum approximate memory size of the cached results.
+                Default is None.
+
+        Returns:
+            PrimaryTermExtractor: The loaded extractor, whose primary_term_dict is a PrimaryTermIndex.
+
+        Raises:
+            ValueError: If the backend, the index format or the cache limits are not supported.
+        """
+        with open(
+            os.path.join(path, EXTRACTOR_CONFIG_FILENAME), "r", encoding="utf-8"
+        ) as f:
+            config = json.load(f)
+        if backend is None:
+            backend = config["backend"]
+        _check_backend(backend)
+
+        index = PrimaryTermIndex.load(path, mmap=mmap)
+
+        extractor = cls.__new__(cls)
+        extractor.ignore_case = config["ignore_case"]
+        extractor.backend = backend
+        normalizer_config = config.get("normalizer")
+        extractor.normalizer = (
+            TextNormalizer.from_config(normalizer_config)
+            if normalizer_config is not None
+            else None
+        )
+        extractor.word_boundaries = config.get("word_boundaries", False)
+        extractor.metrics_callback = None
+        extractor._cache = (
+            ResultCache(cache_size, cache_max_bytes) if cache_size else None
+        )
+        extractor._micro_batcher = None
+        extractor._update_lock = threading.Lock()
+        extractor._publish(
+            extractor._build_snapshot(index, index.terms, config["max_term_length"])
+        )
+        return extractor
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_update_lock"]
+        # The batcher holds futures of the current event loop
+        state["_micro_batcher"] = None
+        # Callbacks report to the current process, and are often not picklable
+        state["metrics_callback"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._update_lock = threading.Lock()
+        # The cache arrives empty; attach it to the current snapshot
+        if self._cache is not None:
+            self._cache.clear(self._snapshot)
+
+    def __reduce_ex__(self, protocol):
+        # An extractor loaded from disk is re-loaded by the receiving process instead of being copied
+        index = self._snapshot.primary_term_dict
+        if isinstance(index, PrimaryTermIndex) and index.path is not None:
+            cache = self._cache
+            cache_args = (cache.maxsize, cache.max_bytes) if cache is not None else ()
+            return (self.load, (index.path, index.mmap, self.backend, *cache_args))
+        return super().__reduce_ex__(protocol)
+
+    def _iter_longest_matches(
+        self, text: str, snapshot: _Snapshot
+    ) -> Iterator[tuple[int, int, str]]:
+        """
+        Yields the (start, end, term) of the leftmost-longest matches in the text using the selected backend.
+        """
+        automaton = snapshot.automaton
+        if self.normalizer is None and automaton is not None:
+            terms = automaton.terms
+            for start, end, term_id in automaton.iter_longest_matches(
+                text, self.word_boundaries
+            ):
+                yield start, end, terms[term_id]
+            return
+
+        if self.normalizer is not None or self.word_boundaries:
+            restore_key = snapshot.trie.restore_key
+            for start, end, term_id in self._iter_longest_match_ids(text, snapshot):
+                yield start, end, restore_key(term_id)
+            return
+
+        trie = snapshot.trie
+        window = snapshot.max_term_length
         n = len(text)
         i = 0
 
         while i < n:
-            # Search for the longest prefix match starting from the current position
-            candidates = self.trie.prefixes(text[i:])
+            # Search for the longest prefix match starting from the current position.
+            # Only a window as long as the longest term is copied, instead of the whole suffix.
+            candidates = trie.prefixes(text[i : i + window])
             if candidates:
                 # Select the longest match from the candidates
                 longest_match = max(candidates, key=len)
-                primary_term_map[longest_match] = self.primary_term_dict[longest_match]
+                yield i, i + len(longest_match), longest_match
                 # Move the index forward by the length of the longest match
                 i += len(longest_match)
             else:
                 # If no match is found, move to the next character
                 i += 1
 
-        return primary_term_map
+    def _select_match_ids(
+        self, text: str, snapshot: _Snapshot, policy: str
+    ) -> Iterable[tuple[int, int, int]]:
+        """
+        Returns the (start, end, term_id) of the matches in the text chosen by the policy, in text order.
+        """
+        if policy == "longest":
+            return self._iter_longest_match_ids(text, snapshot)
+        matches = self._find_all_match_ids(text, snapshot)
+        if policy == "coverage":
+            return select_max_coverage(matches)
+        return matches
+
+    def _find_all_match_ids(
+        self, text: str, snapshot: _Snapshot
+    ) -> list[tuple[int, int, int]]:
+        """
+        Returns the (start, end, term_id) of every match in the text, including overlapping and nested
+        ones, found in a single pass of the automaton. The matches are sorted by start, then from the
+        longest to the shortest.
+        """
+        automaton = snapshot.match_automaton
+        term_ids = snapshot.automaton_term_ids
+        word_boundaries = self.word_boundaries
+        matches = []
+
+        if self.normalizer is None:
+            for start, end, automaton_term_id in automaton.iter_all_matches(text):
+                if word_boundaries and not _at_word_boundaries(text, start, end):
+                    continue
+                matches.append((start, end, term_ids[automaton_term_id]))
+            matches.sort(key=lambda match: (match[0], -match[1]))
+            return matches
+
+        # The text is matched as it is folded, without a folded copy. A match is reported as soon as its
+        # last character is read, so the folded characters and original offsets of the last term length,
+        # plus the characters before and after it for word boundaries, are kept in a ring buffer
+        size = snapshot.max_term_length + 2
+        chars = [""] * size
+        starts = array("q", [0]) * size
+        ends = array("q", [0]) * size
+        # The matches ending at the current position, whose end boundary depends on the next character
+        pending: list[tuple[int, int, int]] = []
+
+        def add_matches(found: list[tuple[int, int, int]], following: str):
+            for start, end, automaton_term_id in found:
+                if word_boundaries and (
+                    (
+                        start
+                        and is_word_char(chars[(start - 1) % size])
+                        and is_word_char(chars[start % size])
+                    )
+                    or (
+                        is_word_char(chars[(end - 1) % size])
+                        and is_word_char(following)
+                    )
+                ):
+                    continue
+                matches.append(
+                    (
+                        starts[start % size],
+                        ends[(end - 1) % size],
+                        term_ids[automaton_term_id],
+                    )
+                )
+
+        def folded_chars() -> Iterator[str]:
+            for position, (char, start, end) in enumerate(
+                self.normalizer.fold((text,))
+            ):
+                slot = position % size
+                chars[slot] = char
+                starts[slot] = start
+                ends[slot] = end
+                if pending:
+                    add_matches(pending, char)
+                    pending.clear()
+                yield char
+
+        for match in automaton.iter_all_matches(folded_chars()):
+            if word_boundaries:
+                pending.append(match)
+            else:
+                add_matches([match], "")
+        add_matches(pending, "")
+
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        return matches
+
+    def _iter_longest_match_ids(
+        self, text: str, snapshot: _Snapshot
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the (start, end, term_id) of the leftmost-longest matches in the text, where term_id
+        is the id of the term in the trie.
+        """
+        if self.normalizer is not None:
+            yield from self._iter_normalized_match_ids((text,), snapshot)
+            return
+
+        if snapshot.automaton is not None:
+            yield from self._iter_longest_match_ids_in_chars(text, snapshot)
+            return
+
+        if self.word_boundaries:
+            yield from self._iter_word_match_ids(text, snapshot)
+            return
+
+        trie = snapshot.trie
+        window = snapshot.max_term_length
+        n = len(text)
+        i = 0
+
+        while i < n:
+            # The prefixes are found in order of length, so the last one is the longest match
+            match_length = longest_term_id = 0
+            for prefix, term_id in trie.iter_prefixes_with_ids(text[i : i + window]):
+                match_length = len(prefix)
+                longest_term_id = term_id
+            if match_length:
+                yield i, i + match_length, longest_term_id
+                i += match_length
+            else:
+                i += 1
+
+    def _iter_normalized_match_ids(
+        self, chunks: Iterable[str], snapshot: _Snapshot
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the (start, end, term_id) of the leftmost-longest matches in the normalized text, with
+        start and end mapped back to offsets in the original text.
+        """
+        # A match is always reported before the scan runs more than two term lengths past its start,
+        # so the original offsets of the last folded characters are kept in a ring buffer
+        size = 2 * snapshot.max_term_length + 2
+        starts = array("q", [0]) * size
+        ends = array("q", [0]) * size
+
+        def folded_chars() -> Iterator[str]:
+            for position, (char, start, end) in enumerate(self.normalizer.fold(chunks)):
+                slot = position % size
+                starts[slot] = start
+                ends[slot] = end
+                yield char
+
+        for start, end, term_id in self._iter_longest_match_ids_in_chars(
+            folded_chars(), snapshot
+        ):
+            yield starts[start % size], ends[(end - 1) % size], term_id
+
+    def _iter_word_match_ids(
+        self, text: str, snapshot: _Snapshot
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the (start, end, term_id) of the leftmost-longest matches in the text that start and end
+        at word boundaries, skipping the positions inside words without probing the trie.
+        """
+        trie = snapshot.trie
+        window = snapshot.max_term_length
+        n = len(text)
+        cursor = 0  # No match may start before the end of the previous match
+
+        # Only the starts of tokens are probed, so the positions inside words are jumped over
+        for token in TOKEN.finditer(text):
+            i = token.start()
+            if i < cursor:
+                continue
+
+            match_length = longest_term_id = 0
+            for prefix, term_id in trie.iter_prefixes_with_ids(text[i : i + window]):
+                end = i + len(prefix)
+                # Skip the prefixes that end inside a word
+                if end < n and is_word_char(text[end]) and is_word_char(prefix[-1]):
+                    continue
+                match_length = len(prefix)
+                longest_term_id = term_id
+            if match_length:
+                yield i, i + match_length, longest_term_id
+                cursor = i + match_length
+
+    def _iter_longest_match_ids_in_chars(
+        self, chars: Iterable[str], snapshot: _Snapshot
+    ) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the (start, end, term_id) of the leftmost-longest matches in a stream of characters,
+        where start and end are positions in the stream.
+        """
+        word_boundaries = self.word_boundaries
+        automaton = snapshot.automaton
+        if automaton is not None:
+            term_ids = snapshot.automaton_term_ids
+            for start, end, automaton_term_id in automaton.iter_longest_matches(
+                chars, word_boundaries
+            ):
+                yield start, end, term_ids[automaton_term_id]
+            return
+
+        chars = iter(chars)
+        trie = snapshot.trie
+        window = snapshot.max_term_length
+        # The next characters of the stream: as many as the longest term, plus one to check the end boundary
+        buffer = deque(islice(chars, window + 1))
+        previous = ""  # The character before the current position
+        i = 0
+
+        while buffer:
+            match_length = longest_term_id = 0
+            # In word boundary mode, no match can start inside a word
+            if not (
+                word_boundaries and is_word_char(previous) and is_word_char(buffer[0])
+            ):
+                for prefix, term_id in trie.iter_prefixes_with_ids(
+                    "".join(islice(buffer, window))
+                ):
+                    length = len(prefix)
+                    if (
+                        word_boundaries
+                        and length < len(buffer)
+                        and is_word_char(buffer[length])
+                        and is_word_char(prefix[-1])
+                    ):
+                        continue
+                    match_length = length
+                    longest_term_id = term_id
+            if match_length:
+                yield i, i + match_length, longest_term_id
+            step = match_length or 1
+            for _ in range(step):
+                previous = buffer.popleft()
+            buffer.extend(islice(chars, step))
+            i += step
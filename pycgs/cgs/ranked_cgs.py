@@ -0,0 +1,197 @@
+"""
+This module contains a weighted CGS variant that ranks the k best Primary Terms of each term by path weight.
+"""
+
+import heapq
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Iterator, NamedTuple
+
+from pycgs.types import EdgeWithWeight
+
+from .algorithms import CyclicGraphError, _compact_cyclic_components
+from .compact_graph import CompactDiGraph
+
+
+__all__ = ["RankedPrimaryTerm", "RankedPrimaryTerms", "ranked_cgs"]
+
+
+class RankedPrimaryTerm(NamedTuple):
+    """
+    A Primary Term reachable from a term, with the heaviest path that reaches it.
+    """
+
+    primary_term: str
+    weight: float
+    path: tuple[str, ...]
+
+
+class RankedPrimaryTerms(Mapping):
+    """
+    A read-only mapping from each term to its k best Primary Terms, ranked by accumulated path weight.
+
+    The rankings are stored in flat arrays of k slots per term, holding the weight, the Primary Term id
+    and the next node on the path of each ranked Primary Term. Paths are only turned into strings when
+    the ranking of a term is read.
+
+    Attributes:
+        k (int): The maximum number of Primary Terms ranked for each term.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        ids: dict[str, int],
+        k: int,
+        counts: array,
+        weights: array,
+        primaries: array,
+        next_nodes: array,
+    ):
+        """
+        Initializes the mapping from the rankings computed by ranked_cgs().
+        """
+        self.k = k
+        self._names = names
+        self._ids = ids
+        self._counts = counts
+        self._weights = weights
+        self._primaries = primaries
+        self._next_nodes = next_nodes
+
+    def _path(self, node: int, primary: int) -> tuple[str, ...]:
+        """
+        Returns the heaviest path from a node to one of its ranked Primary Terms.
+        """
+        k, names, primaries, next_nodes = (
+            self.k,
+            self._names,
+            self._primaries,
+            self._next_nodes,
+        )
+        path = [names[node]]
+        while node != primary:
+            # Each node on the path ranks the Primary Term, with the rest of the path
+            slot = node * k
+            while primaries[slot] != primary:
+                slot += 1
+            node = next_nodes[slot]
+            path.append(names[node])
+        return tuple(path)
+
+    def __getitem__(self, term: str) -> list[RankedPrimaryTerm]:
+        node = self._ids[term]
+        names = self._names
+        ranking = []
+        for slot in range(node * self.k, node * self.k + self._counts[node]):
+            primary = self._primaries[slot]
+            ranking.append(
+                RankedPrimaryTerm(
+                    names[primary], self._weights[slot], self._path(node, primary)
+                )
+            )
+        return ranking
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} terms, k={self.k})"
+
+
+def ranked_cgs(
+    relationships: Iterable[EdgeWithWeight], k: int = 3
+) -> RankedPrimaryTerms:
+    """
+    Ranked weighted CGS algorithm.
+
+    Whereas weighted_cgs() greedily follows the highest weight edge of each node and returns a single
+    Primary Term, this ranks the k Primary Terms reachable from each term with the highest accumulated
+    weight, i.e. the sum of the edge weights along the heaviest path to each of them, together with
+    that path. The best ranked Primary Term may therefore differ from the result of weighted_cgs().
+
+    The rankings are computed by dynamic programming in a single reverse topological sweep: the
+    ranking of a node is merged from the rankings of its successors, each shifted by the weight of the
+    edge to it, so no path is ever enumerated. Keeping the k best Primary Terms of each successor is
+    enough, since a Primary Term outside them is outweighed through that successor by k others. Ties
+    are broken by the name of the Primary Term, then by the first successor in edge order.
+
+    Args:
+        relationships (Iterable[EdgeWithWeight]): The (source, target, weight) edges. A duplicate edge keeps
+            the weight of its last occurrence.
+        k (int): The maximum number of Primary Terms ranked for each term. Default is 3.
+
+    Returns:
+        RankedPrimaryTerms: The ranked Primary Terms of each term, from the heaviest to the lightest path.
+        A Primary Term ranks only itself, with weight 0.
+
+    Raises:
+        CyclicGraphError: If the graph is not a Directed Acyclic Graph.
+        ValueError: If k is less than 1.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+
+    graph = CompactDiGraph(relationships, weighted=True)
+    topological_order = graph.topological_order()
+    if topological_order is None:
+        raise CyclicGraphError(
+            "The graph is  not a Directed Acyclic Graph.",
+            _compact_cyclic_components(graph),
+        )
+
+    names, offsets, targets, edge_weights = (
+        graph.names,
+        graph.offsets,
+        graph.targets,
+        graph.weights,
+    )
+    n = len(names)
+
+    # The ranking of node i is held in the slots i * k to i * k + counts[i]
+    counts = array("i", bytes(4 * n))
+    weights = array("d", bytes(8 * n * k))
+    primaries = array("i", bytes(4 * n * k))
+    next_nodes = array("i", [-1]) * (n * k)
+
+    for node in reversed(topological_order):
+        slot = node * k
+        start, end = offsets[node], offsets[node + 1]
+        if start == end:
+            # The node is a Primary Term, ranked first in its own ranking
+            counts[node] = 1
+            primaries[slot] = node
+            continue
+
+        # The heaviest path to each Primary Term reachable through the successors: id -> (weight, next node)
+        best: dict[int, tuple[float, int]] = {}
+        for e in range(start, end):
+            successor, edge_weight = targets[e], edge_weights[e]
+            for successor_slot in range(
+                successor * k, successor * k + counts[successor]
+            ):
+                primary = primaries[successor_slot]
+                weight = weights[successor_slot] + edge_weight
+                candidate = best.get(primary)
+                if candidate is None or weight > candidate[0]:
+                    best[primary] = (weight, successor)
+
+        ranking = heapq.nsmallest(
+            k, best.items(), key=lambda item: (-item[1][0], names[item[0]])
+        )
+        counts[node] = len(ranking)
+        for primary, (weight, successor) in ranking:
+            weights[slot] = weight
+            primaries[slot] = primary
+            next_nodes[slot] = successor
+            slot += 1
+
+    return RankedPrimaryTerms(
+        names, graph.ids, k, counts, weights, primaries, next_nodes
+    )
@@ -0,0 +1,154 @@
+"""
+This module contains a bounded LRU cache for the results of term extraction.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple
+
+
+__all__ = ["ResultCache", "CacheInfo"]
+
+
+class CacheInfo(NamedTuple):
+    """
+    The statistics of a ResultCache.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    nbytes: int
+    max_bytes: int | None
+
+
+class ResultCache:
+    """
+    A thread-safe least-recently-used cache of extraction results, bounded by a number of entries and
+    optionally by an approximate memory size.
+
+    Each entry keeps the number of matches its result was built from, so that a hit reports the same
+    number of matches as the extraction it replaces.
+
+    Every entry belongs to a version, e.g. a snapshot of a dictionary. Moving the cache to a new version
+    drops all the entries, and results computed for any other version are neither returned nor stored,
+    so a result computed while the version changed can never be served afterwards.
+
+    Attributes:
+        maxsize (int): The maximum number of entries.
+        max_bytes (int | None): The maximum approximate size of the entries in bytes, or None for no limit.
+
+    Methods:
+        get(key, version): Returns the cached result of a key and its number of matches, or None.
+        put(key, result, version, matches): Stores the result of a key, evicting the least recently used entries.
+        clear(version): Drops all the entries and moves the cache to a new version.
+        info(): Returns the hit and miss counts and the current size.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int | None = None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries.
+            max_bytes (int | None): The maximum approximate size of the entries in bytes. Default is None.
+
+        Raises:
+            ValueError: If maxsize or max_bytes is less than 1.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1.")
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> (result, number of matches, size in bytes), from the least to the most recently used
+        self._entries: OrderedDict[Hashable, tuple[dict, int, int]] = OrderedDict()
+        self._version: object = None
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, version: object) -> tuple[dict, int] | None:
+        """
+        Returns a copy of the cached result of a key and its number of matches, or None if it is not
+        cached for this version.
+        """
+        with self._lock:
+            entry = self._entries.get(key) if version is self._version else None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return dict(entry[0]), entry[1]
+
+    def put(self, key: Hashable, result: dict, version: object, matches: int = 0):
+        """
+        Stores a copy of the result of a key and the number of matches it was built from, unless the
+        cache has moved to another version or the entry alone exceeds max_bytes.
+        """
+        size = _sizeof(key, result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        result = dict(result)
+
+        with self._lock:
+            if version is not self._version:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[2]
+            self._entries[key] = (result, matches, size)
+            self._nbytes += size
+
+            # Evict the least recently used entries
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self._nbytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_size
+
+    def clear(self, version: object = None):
+        """
+        Drops all the entries and moves the cache to a new version. The statistics are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._version = version
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the hit and miss counts, the limits and the current size of the cache.
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self.maxsize,
+                len(self._entries),
+                self._nbytes,
+                self.max_bytes,
+            )
+
+    def __reduce__(self):
+        # A copy of the cache, e.g. in a worker process, starts empty
+        return (self.__class__, (self.maxsize, self.max_bytes))
+
+
+def _sizeof(key: Hashable, result: dict) -> int:
+    """
+    Returns the approximate memory size of a cache entry. The primary terms are shared with the
+    dictionary, so only the key, the result dictionary and its terms are counted.
+    """
+    return (
+        sys.getsizeof(key)
+        + sys.getsizeof(result)
+        + sum(sys.getsizeof(term) for term in result)
+    )
@@ -0,0 +1,227 @@
+"""
+This module contains a sharded CGS resolution that splits the graph into its weakly connected components
+and resolves them in a process pool.
+"""
+
+import heapq
+import multiprocessing
+import os
+from array import array
+from typing import Iterable
+
+from pycgs.types import Edge, EdgeWithWeight
+
+from .algorithms import _check_graph_backend, foundational_cgs, weighted_cgs
+from .edge_files import read_edges
+
+
+__all__ = ["sharded_cgs"]
+
+
+def _resolve(
+    edges: Iterable[Edge] | Iterable[EdgeWithWeight], weighted: bool, backend: str
+) -> dict[str, str]:
+    """
+    Resolves the ultimate Primary Terms of a graph in the current process.
+    """
+    if weighted:
+        return weighted_cgs(edges, backend=backend)
+    return foundational_cgs(edges, backend=backend)
+
+
+def _resolve_shard(
+    names: list[str],
+    node_ids: array,
+    sources: array,
+    targets: array,
+    weights: array | None,
+    backend: str,
+) -> tuple[array, array]:
+    """
+    Resolves the ultimate Primary Terms of the components of a shard, given as edges between local ids.
+
+    Returns the global id of each local node and the global id of its Primary Term, so that the parent
+    process can merge the result without building a dictionary.
+    """
+    edges = zip(map(names.__getitem__, sources), map(names.__getitem__, targets))
+    if weights is not None:
+        edges = ((src, tgt, weight) for (src, tgt), weight in zip(edges, weights))
+    primary_term_dict = _resolve(edges, weights is not None, backend)
+
+    local_ids = {name: local for local, name in enumerate(names)}
+    primary_ids = array(
+        "i", [node_ids[local_ids[primary_term_dict[name]]] for name in names]
+    )
+    return node_ids, primary_ids
+
+
+def _resolve_shard_args(args: tuple) -> tuple[array, array]:
+    """
+    Calls _resolve_shard() with a tuple of arguments, as passed by Pool.imap_unordered().
+    """
+    return _resolve_shard(*args)
+
+
+def sharded_cgs(
+    relationships: Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike,
+    weighted: bool = False,
+    workers: int | None = None,
+    shards_per_worker: int = 4,
+    backend: str = "compact",
+) -> dict[str, str]:
+    """
+    Resolves the ultimate Primary Terms of a coreference graph by weakly connected component, in a process pool.
+
+    The Primary Term of a node only depends on the nodes reachable from it, so the weakly connected
+    components of the graph can be resolved independently. The edges are read once, as a stream: the
+    terms are interned to integer ids and the components are tracked with a union-find over compact
+    arrays, which costs a few bytes per edge instead of a graph object. The components are then packed
+    into shards of similar edge counts, the shards are resolved by foundational_cgs() or weighted_cgs()
+    in worker processes, and their results are merged. Each shard is built only when it is sent, as
+    arrays of node ids with the names of its nodes, and each result comes back as an array of Primary
+    Term ids that is merged and freed as soon as it arrives.
+
+    The results are the same as those of foundational_cgs() or weighted_cgs() with the compact backend,
+    in the order in which the terms first appear in the edges.
+
+    Args:
+        relationships (Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike): The (source, target)
+            edges, or the (source, target, weight) edges if weighted is True, or the path of an edge file
+            read with read_edges().
+        weighted (bool): Whether to resolve the graph with weighted_cgs() instead of foundational_cgs().
+            Default is False.
+        workers (int | None): The number of worker processes. 1 resolves the graph in the current process,
+            and None uses one worker per CPU. Default is None.
+        shards_per_worker (int): The number of shards per worker, so that a worker that finishes early
+            can take another shard. Default is 4.
+        backend (str): The graph backend used to resolve each shard. Default is "compact".
+
+    Returns:
+        dict[str, str]: The ultimate Primary Term of each term.
+
+    Raises:
+        CyclicGraphError: If a component of the graph contains a cycle that CGS cannot resolve.
+        ValueError: If workers or shards_per_worker is less than 1, or the backend is not supported.
+    """
+    _check_graph_backend(backend)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    if shards_per_worker < 1:
+        raise ValueError("shards_per_worker must be at least 1.")
+    if isinstance(relationships, (str, os.PathLike)):
+        relationships = read_edges(relationships, weighted=weighted)
+    if workers == 1:
+        return _resolve(relationships, weighted, backend)
+
+    names: list[str] = []
+    ids: dict[str, int] = {}
+    sources, targets = array("i"), array("i")
+    weights = array("d") if weighted else None
+    # The union-find forest of the weakly connected components, by node id
+    parents, sizes = array("i"), array("i")
+
+    def find(node: int) -> int:
+        while parents[node] != node:
+            # Path halving
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    def intern(name: str) -> int:
+        node = ids.get(name)
+        if node is None:
+            node = ids[name] = len(names)
+            names.append(name)
+            parents.append(node)
+            sizes.append(1)
+        return node
+
+    for edge in relationships:
+        src, tgt = intern(edge[0]), intern(edge[1])
+        sources.append(src)
+        targets.append(tgt)
+        if weights is not None:
+            weights.append(edge[2])
+
+        # Union by size
+        src, tgt = find(src), find(tgt)
+        if src != tgt:
+            if sizes[src] < sizes[tgt]:
+                src, tgt = tgt, src
+            parents[tgt] = src
+            sizes[src] += sizes[tgt]
+
+    # Count the edges of each component, by the id of its root
+    edge_counts: dict[int, int] = {}
+    for src in sources:
+        root = find(src)
+        edge_counts[root] = edge_counts.get(root, 0) + 1
+
+    num_shards = min(workers * shards_per_worker, len(edge_counts))
+    if num_shards <= 1:
+        # A single component is not worth a process pool
+        edges = zip(map(names.__getitem__, sources), map(names.__getitem__, targets))
+        if weights is not None:
+            edges = ((src, tgt, weights[k]) for k, (src, tgt) in enumerate(edges))
+        return _resolve(edges, weighted, backend)
+
+    # Pack the largest components first into the shard with the fewest edges
+    shard_of: dict[int, int] = {}
+    heap = [(0, shard) for shard in range(num_shards)]
+    for root in sorted(edge_counts, key=edge_counts.__getitem__, reverse=True):
+        count, shard = heapq.heappop(heap)
+        shard_of[root] = shard
+        heapq.heappush(heap, (count + edge_counts[root], shard))
+    del edge_counts
+
+    # Group the edge indices by shard with a counting sort, keeping their order so that ties are broken
+    # as in a serial run
+    edge_shards = array("i", [shard_of[find(src)] for src in sources])
+    del parents, sizes, shard_of
+    shard_offsets = [0] * (num_shards + 1)
+    for shard in edge_shards:
+        shard_offsets[shard + 1] += 1
+    for shard in range(num_shards):
+        shard_offsets[shard + 1] += shard_offsets[shard]
+    positions = shard_offsets[:-1]
+    edge_order = array("i", bytes(4 * len(edge_shards)))
+    for k, shard in enumerate(edge_shards):
+        edge_order[positions[shard]] = k
+        positions[shard] += 1
+    del edge_shards, positions
+
+    def iter_shards():
+        """
+        Yields the arguments of _resolve_shard() for each shard, built only when the pool takes it.
+        """
+        for shard in range(num_shards):
+            local_ids: dict[int, int] = {}
+            node_ids, shard_sources, shard_targets = array("i"), array("i"), array("i")
+            shard_weights = array("d") if weights is not None else None
+            for k in edge_order[shard_offsets[shard] : shard_offsets[shard + 1]]:
+                for node, shard_nodes in (
+                    (sources[k], shard_sources),
+                    (targets[k], shard_targets),
+                ):
+                    local = local_ids.get(node)
+                    if local is None:
+                        local = local_ids[node] = len(node_ids)
+                        node_ids.append(node)
+                    shard_nodes.append(local)
+                if shard_weights is not None:
+                    shard_weights.append(weights[k])
+            shard_names = [names[node] for node in node_ids]
+            yield shard_names, node_ids, shard_sources, shard_targets, shard_weights, backend
+
+    # Each result is merged into an array of Primary Term ids and freed before the next one
+    resolved = array("i", [-1]) * len(names)
+    with multiprocessing.Pool(workers) as pool:
+        for node_ids, primary_ids in pool.imap_unordered(
+            _resolve_shard_args, iter_shards()
+        ):
+            for node, primary in zip(node_ids, primary_ids):
+                resolved[node] = primary
+
+    return dict(zip(names, map(names.__getitem__, resolved)))
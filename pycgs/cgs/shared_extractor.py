@@ -0,0 +1,265 @@
+"""
+This module contains an extractor index placed in shared memory once by a parent process, which worker
+processes attach to without copying it.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+from collections.abc import Mapping
+from typing import Iterable
+
+from pycgs.types import Edge, EdgeWithWeight
+
+from .compiler import compile_extractor
+from .normalization import TextNormalizer
+from .primary_term_extractor import PrimaryTermExtractor
+
+
+__all__ = ["SharedExtractor"]
+
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def _shared_memory_dir() -> str | None:
+    """
+    Returns the directory of the RAM-backed file system, or None to use the temporary directory where
+    there is none, e.g. on macOS and Windows.
+    """
+    if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        return SHARED_MEMORY_DIR
+    return None
+
+
+def _unlink_in_creator(path: str, pid: int):
+    """
+    Deletes a shared index, unless called in a forked child of the process that created it, whose exit
+    must not delete the index of the other workers.
+    """
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class SharedExtractor:
+    """
+    A handle on an extractor index written once to shared memory, which any number of worker processes
+    attach to with zero copy, e.g. the workers of a gunicorn or uvicorn server.
+
+    The index is a directory of files written by PrimaryTermExtractor.save(), on the RAM-backed file
+    system (/dev/shm) where there is one. Each attached extractor memory-maps the files read-only, so its
+    tries and its table of primary term ids live in pages shared by all the processes, with no Python
+    object per term: adding a worker only adds the few objects of the extractor itself, and refcount
+    updates never touch the shared pages, so they stay shared after a fork.
+
+    An owner handle also unlinks the index when it is garbage collected or when the process exits, so a
+    crash or a missed shutdown does not leave it in RAM-backed storage; keep it alive for as long as new
+    workers may attach. Forked children never unlink the index of their parent.
+
+    Attached extractors always use the "trie" backend, as the "automaton" backend builds its automaton
+    as Python objects in each process. The handle pickles as its path, so it can be passed to spawned
+    workers, or the path can be passed on e.g. through an environment variable.
+
+    Attributes:
+        path (str): The directory of the shared index.
+        owner (bool): Whether this handle created the index, and unlinks it when used as a context manager,
+            when it is garbage collected or when the process exits.
+
+    Methods:
+        from_dict(primary_term_dict, ...): Writes the index of a dictionary of terms to primary terms.
+        from_extractor(extractor): Writes the index of an existing extractor.
+        compile(relationships, ...): Resolves coreference relationships straight into an index.
+        attach(): Returns an extractor reading the shared index.
+        unlink(): Deletes the shared index.
+    """
+
+    def __init__(self, path: str | os.PathLike, owner: bool = False):
+        """
+        Initializes a handle on an existing shared index, e.g. in a worker given its path.
+
+        Args:
+            path (str | os.PathLike): The directory of the shared index.
+            owner (bool): Whether this handle is responsible for unlinking the index. Default is False.
+        """
+        self.path = os.fspath(path)
+        self.owner = owner
+        self._finalizer = (
+            weakref.finalize(self, _unlink_in_creator, self.path, os.getpid())
+            if owner
+            else None
+        )
+
+    @classmethod
+    def _create(
+        cls, directory: str | os.PathLike | None
+    ) -> tuple["SharedExtractor", str]:
+        """
+        Returns an owner handle on a new, empty directory, and the path of the directory.
+        """
+        if directory is None:
+            directory = _shared_memory_dir()
+        path = tempfile.mkdtemp(prefix="pycgs-", dir=directory)
+        return cls(path, owner=True), path
+
+    @classmethod
+    def from_extractor(
+        cls,
+        extractor: PrimaryTermExtractor,
+        directory: str | os.PathLike | None = None,
+    ) -> "SharedExtractor":
+        """
+        Writes the index of an extractor to shared memory. The extractor can be dropped afterwards.
+
+        Args:
+            extractor (PrimaryTermExtractor): The extractor to share, with its settings.
+            directory (str | os.PathLike | None): The directory to create the index in. Default is None,
+                which uses /dev/shm where available and the temporary directory otherwise.
+
+        Returns:
+            SharedExtractor: The owner handle of the new index.
+        """
+        shared, path = cls._create(directory)
+        try:
+            extractor.save(path)
+        except BaseException:
+            shared.unlink()
+            raise
+        return shared
+
+    @classmethod
+    def from_dict(
+        cls,
+        primary_term_dict: Mapping[str, str],
+        ignore_case: bool = False,
+        normalizer: TextNormalizer | None = None,
+        word_boundaries: bool = False,
+        directory: str | os.PathLike | None = None,
+    ) -> "SharedExtractor":
+        """
+        Writes the index of a dictionary of terms to primary terms to shared memory.
+
+        Args:
+            primary_term_dict (Mapping[str, str]): A mapping of terms to their primary terms.
+            ignore_case (bool): Whether to enable case-insensitive matching. Default is False.
+            normalizer (TextNormalizer | None): The normalizer of the extractor. Default is None.
+            word_boundaries (bool): Whether to only match terms at word boundaries. Default is False.
+            directory (str | os.PathLike | None): The directory to create the index in. Default is None,
+                which uses /dev/shm where available and the temporary directory otherwise.
+
+        Returns:
+            SharedExtractor: The owner handle of the new index.
+
+        Raises:
+            ValueError: If both ignore_case and a normalizer are given.
+        """
+        extractor = PrimaryTermExtractor(
+            primary_term_dict,
+            ignore_case=ignore_case,
+            normalizer=normalizer,
+            word_boundaries=word_boundaries,
+        )
+        return cls.from_extractor(extractor, directory)
+
+    @classmethod
+    def compile(
+        cls,
+        relationships: Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike,
+        weighted: bool = False,
+        ignore_case: bool = False,
+        normalizer: TextNormalizer | None = None,
+        word_boundaries: bool = False,
+        directory: str | os.PathLike | None = None,
+    ) -> "SharedExtractor":
+        """
+        Resolves coreference relationships with compile_extractor() and writes the resulting index to
+        shared memory, without building a dictionary of terms in the parent process.
+
+        Args:
+            relationships (Iterable[Edge] | Iterable[EdgeWithWeight] | str | os.PathLike): The (source, target)
+                edges, or the (source, target, weight) edges if weighted is True, or the path of an edge file.
+            weighted (bool): Whether to resolve the graph with weighted_cgs() instead of foundational_cgs().
+                Default is False.
+            ignore_case (bool): Whether to enable case-insensitive matching. Default is False.
+            normalizer (TextNormalizer | None): The normalizer of the extractor. Default is None.
+            word_boundaries (bool): Whether to only match terms at word boundaries. Default is False.
+            directory (str | os.PathLike | None): The directory to create the index in. Default is None,
+                which uses /dev/shm where available and the temporary directory otherwise.
+
+        Returns:
+            SharedExtractor: The owner handle of the new index.
+
+        Raises:
+            CyclicGraphError: If the relationships contain a cycle that CGS cannot resolve.
+            ValueError: If both ignore_case and a normalizer are given.
+        """
+        shared, path = cls._create(directory)
+        try:
+            compile_extractor(
+                relationships,
+                path,
+                weighted=weighted,
+                ignore_case=ignore_case,
+                normalizer=normalizer,
+                word_boundaries=word_boundaries,
+            )
+        except BaseException:
+            shared.unlink()
+            raise
+        return shared
+
+    def attach(
+        self, cache_size: int = 0, cache_max_bytes: int | None = None
+    ) -> PrimaryTermExtractor:
+        """
+        Returns an extractor that memory-maps the shared index, to be called once in each worker.
+
+        The extractor keeps working after the index is unlinked, until it is dropped. Its update() and
+        replace() methods build a private dictionary, which is no longer shared.
+
+        Args:
+            cache_size (int): The number of texts whose results are cached by this process. Default is 0.
+            cache_max_bytes (int | None): The maximum approximate memory size of the cached results.
+                Default is None.
+
+        Returns:
+            PrimaryTermExtractor: The attached extractor, with the "trie" backend.
+        """
+        return PrimaryTermExtractor.load(
+            self.path,
+            mmap=True,
+            backend="trie",
+            cache_size=cache_size,
+            cache_max_bytes=cache_max_bytes,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The total size in bytes of the files of the shared index.
+        """
+        with os.scandir(self.path) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+
+    def unlink(self):
+        """
+        Deletes the shared index. Extractors already attached keep their mappings, but no new process
+        can attach to it.
+        """
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> "SharedExtractor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owner:
+            self.unlink()
+
+    def __reduce__(self):
+        # Only the creating process owns the index
+        return (self.__class__, (self.path,))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
@@ -0,0 +1,192 @@
+"""
+This module contains a compact, persistable index of terms and their primary terms.
+"""
+
+import json
+import mmap as mmap_module
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Iterator
+
+import marisa_trie
+
+
+__all__ = ["PrimaryTermIndex"]
+
+
+INDEX_FORMAT_VERSION = 1
+
+TERMS_FILENAME = "terms.marisa"
+PRIMARY_TERMS_FILENAME = "primary_terms.marisa"
+PRIMARY_IDS_FILENAME = "primary_ids.bin"
+METADATA_FILENAME = "metadata.json"
+
+
+class PrimaryTermIndex(Mapping[str, str]):
+    """
+    A read-only mapping of terms to primary terms backed by two tries and an array of ids.
+
+    Each term is stored once in the terms trie, and each distinct primary term is interned once in
+    the primary terms trie. The primary_ids array maps the id of a term to the id of its primary term.
+    A saved index can be memory-mapped, so that processes loading the same index share one
+    page-cached copy instead of holding a Python dict each.
+
+    Attributes:
+        terms (marisa_trie.Trie): The trie of terms. The id of a term is its key id in this trie.
+        primary_terms (marisa_trie.Trie): The trie of distinct primary terms.
+        primary_ids (array | memoryview): The primary term id of each term id.
+        path (str | None): The directory the index was loaded from, if any.
+        mmap (bool): Whether the index is memory-mapped from path.
+
+    Methods:
+        from_dict(primary_term_dict, terms): Builds an index from a dictionary of terms to primary terms.
+        save(path): Writes the index to a directory.
+        load(path, mmap): Loads an index from a directory.
+    """
+
+    def __init__(
+        self,
+        terms: marisa_trie.Trie,
+        primary_terms: marisa_trie.Trie,
+        primary_ids: array | memoryview,
+        path: str | None = None,
+        mmap: bool = False,
+    ):
+        """
+        Initializes the index from its components.
+
+        Args:
+            terms (marisa_trie.Trie): The trie of terms.
+            primary_terms (marisa_trie.Trie): The trie of distinct primary terms.
+            primary_ids (array | memoryview): The primary term id of each term id.
+            path (str | None): The directory the index was loaded from, if any. Default is None.
+            mmap (bool): Whether the index is memory-mapped from path. Default is False.
+        """
+        self.terms = terms
+        self.primary_terms = primary_terms
+        self.primary_ids = primary_ids
+        self.path = path
+        self.mmap = mmap
+
+    @classmethod
+    def from_dict(
+        cls, primary_term_dict: Mapping[str, str], terms: marisa_trie.Trie | None = None
+    ) -> "PrimaryTermIndex":
+        """
+        Builds an index from a dictionary of terms to primary terms.
+
+        Args:
+            primary_term_dict (Mapping[str, str]): A mapping of terms to their primary terms.
+            terms (marisa_trie.Trie | None): An existing trie of the keys of primary_term_dict to reuse.
+                Default is None, which builds a new trie.
+
+        Returns:
+            PrimaryTermIndex: The index of primary_term_dict.
+        """
+        if terms is None:
+            terms = marisa_trie.Trie(primary_term_dict.keys())
+        primary_terms = marisa_trie.Trie(set(primary_term_dict.values()))
+
+        primary_ids = array("I", bytes(len(terms) * array("I").itemsize))
+        for term, term_id in terms.iteritems():
+            primary_ids[term_id] = primary_terms[primary_term_dict[term]]
+
+        return cls(terms, primary_terms, primary_ids)
+
+    def save(self, path: str | os.PathLike):
+        """
+        Writes the index to a directory, creating it if needed.
+
+        Args:
+            path (str | os.PathLike): The directory to write the index to.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        self.terms.save(os.path.join(path, TERMS_FILENAME))
+        self.primary_terms.save(os.path.join(path, PRIMARY_TERMS_FILENAME))
+        with open(os.path.join(path, PRIMARY_IDS_FILENAME), "wb") as f:
+            f.write(memoryview(self.primary_ids).cast("B"))
+
+        metadata = {
+            "version": INDEX_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "itemsize": memoryview(self.primary_ids).itemsize,
+        }
+        with open(os.path.join(path, METADATA_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, mmap: bool = True) -> "PrimaryTermIndex":
+        """
+        Loads an index from a directory written by save().
+
+        Args:
+            path (str | os.PathLike): The directory to load the index from.
+            mmap (bool): Whether to memory-map the index files instead of reading them into memory.
+                Default is True.
+
+        Returns:
+            PrimaryTermIndex: The loaded index.
+
+        Raises:
+            ValueError: If the index was written in an unsupported format.
+        """
+        path = os.fspath(path)
+        with open(os.path.join(path, METADATA_FILENAME), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported index format version: {metadata.get('version')!r}."
+            )
+        if metadata["itemsize"] != array("I").itemsize:
+            raise ValueError("The index was written with an incompatible item size.")
+
+        terms = marisa_trie.Trie()
+        primary_terms = marisa_trie.Trie()
+        if mmap:
+            terms.mmap(os.path.join(path, TERMS_FILENAME))
+            primary_terms.mmap(os.path.join(path, PRIMARY_TERMS_FILENAME))
+        else:
+            terms.load(os.path.join(path, TERMS_FILENAME))
+            primary_terms.load(os.path.join(path, PRIMARY_TERMS_FILENAME))
+
+        primary_ids_path = os.path.join(path, PRIMARY_IDS_FILENAME)
+        native = metadata["byteorder"] == sys.byteorder
+        if mmap and native and os.path.getsize(primary_ids_path):
+            with open(primary_ids_path, "rb") as f:
+                buffer = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+            primary_ids = memoryview(buffer).cast("I")
+        else:
+            primary_ids = array("I")
+            with open(primary_ids_path, "rb") as f:
+                primary_ids.frombytes(f.read())
+            if not native:
+                primary_ids.byteswap()
+
+        return cls(terms, primary_terms, primary_ids, path=path, mmap=mmap)
+
+    def __getitem__(self, term: str) -> str:
+        term_id = self.terms.get(term) if isinstance(term, str) else None
+        if term_id is None:
+            raise KeyError(term)
+        return self.primary_terms.restore_key(self.primary_ids[term_id])
+
+    def __contains__(self, term: object) -> bool:
+        return isinstance(term, str) and term in self.terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __reduce__(self):
+        # A loaded index is re-loaded from its directory instead of being copied into the pickle
+        if self.path is not None:
+            return (self.load, (self.path, self.mmap))
+        return (
+            self.__class__,
+            (self.terms, self.primary_terms, array("I", self.primary_ids)),
+        )
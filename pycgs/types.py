@@ -12,3 +12,8 @@ EdgeWithWeight = tuple[str, str, float]
 """
 (source, target, weight)
 """
+
+ChangeSet = dict[str, str | None]
+"""
+{term: new ultimate Primary Term, or None if the term was removed}
+"""
@@ -0,0 +1,73 @@
+"""
+Test: pycgs.cgs.aho_corasick
+"""
+
+import random
+
+from pycgs.cgs.aho_corasick import AhoCorasickAutomaton
+
+
+def greedy_longest_matches(terms, text):
+    """
+    Reference implementation: take the longest term at each position and jump past it.
+    """
+    matches = []
+    i = 0
+    while i < len(text):
+        candidates = [term for term in terms if term and text.startswith(term, i)]
+        if candidates:
+            longest = max(candidates, key=len)
+            matches.append((i, i + len(longest), longest))
+            i += len(longest)
+        else:
+            i += 1
+    return matches
+
+
+def test_iter_longest_matches_basic():
+    """
+    Test leftmost-longest matching with nested and shared-suffix terms.
+    """
+    automaton = AhoCorasickAutomaton(["ab", "c", "abcx", "草麻黄", "草麻黄草质茎"])
+
+    matches = [
+        (start, end, automaton.terms[term_id])
+        for start, end, term_id in automaton.iter_longest_matches("abcd草麻黄草质茎")
+    ]
+
+    assert matches == [(0, 2, "ab"), (2, 3, "c"), (4, 10, "草麻黄草质茎")]
+
+
+def test_empty_and_duplicate_terms():
+    """
+    Test that empty and duplicate terms are ignored.
+    """
+    automaton = AhoCorasickAutomaton(["", "a", "a"])
+
+    assert automaton.terms == ["a"]
+    assert automaton.max_length == 1
+    assert list(automaton.iter_longest_matches("")) == []
+    assert list(automaton.iter_longest_matches("aa")) == [(0, 1, 0), (1, 2, 0)]
+
+
+def test_iter_longest_matches_random():
+    """
+    Test that the automaton agrees with the greedy reference scan on random inputs.
+    """
+    rng = random.Random(0)
+    for _ in range(200):
+        terms = list(
+            {
+                "".join(rng.choice("abc") for _ in range(rng.randint(1, 5)))
+                for _ in range(rng.randint(1, 8))
+            }
+        )
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+        automaton = AhoCorasickAutomaton(terms)
+
+        matches = [
+            (start, end, automaton.terms[term_id])
+            for start, end, term_id in automaton.iter_longest_matches(text)
+        ]
+
+        assert matches == greedy_longest_matches(terms, text)
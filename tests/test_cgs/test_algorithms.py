@@ -2,9 +2,13 @@
 Test: pycgs.cgs
 """
 
+import random
+
 import pytest
 
 from pycgs.cgs.algorithms import (
+    CyclicGraphError,
+    PrimaryTermMap,
     foundational_cgs,
     weighted_cgs,
 )
@@ -69,7 +73,11 @@ def test_foundational_cgs():
         },
     ]
     for test in tests:
-        assert foundational_cgs(test["relationships"]) == test["primary_term_dict"]
+        for backend in ("networkx", "compact"):
+            assert (
+                foundational_cgs(test["relationships"], backend=backend)
+                == test["primary_term_dict"]
+            )
 
     value_error_tests = [
         {
@@ -78,8 +86,50 @@ def test_foundational_cgs():
         },
     ]
     for test in value_error_tests:
-        with pytest.raises(ValueError):
-            foundational_cgs(test["relationships"])
+        for backend in ("networkx", "compact"):
+            with pytest.raises(ValueError):
+                foundational_cgs(test["relationships"], backend=backend)
+
+
+def test_foundational_cgs_matches_chain_walk():
+    """
+    Test that foundational_cgs() agrees with walking each node's chain of smallest successors.
+    """
+    rng = random.Random(0)
+    for _ in range(50):
+        nodes = [f"t{i}" for i in range(30)]
+        # Edges only point from a node to a later one, so the graph is acyclic
+        relationships = {
+            (nodes[i], nodes[j])
+            for i in range(len(nodes))
+            for j in range(i + 1, len(nodes))
+            if rng.random() < 0.1
+        }
+
+        successors = {}
+        for src, tgt in relationships:
+            successors.setdefault(src, []).append(tgt)
+        expected = {}
+        for node in {node for edge in relationships for node in edge}:
+            current = node
+            while current in successors:
+                current = min(successors[current])
+            expected[node] = current
+
+        assert foundational_cgs(relationships) == expected
+        assert foundational_cgs(relationships, backend="compact") == expected
+
+
+def test_foundational_cgs_long_chain():
+    """
+    Test foundational_cgs() on a long coreference chain.
+    """
+    relationships = [(f"t{i}", f"t{i + 1}") for i in range(10000)]
+
+    primary_term_dict = foundational_cgs(relationships)
+
+    assert len(primary_term_dict) == 10001
+    assert set(primary_term_dict.values()) == {"t10000"}
 
 
 def test_weighted_cgs():
@@ -98,4 +148,126 @@ def test_weighted_cgs():
         },
     ]
     for test in tests:
-        assert weighted_cgs(test["relationships"]) == test["primary_term_dict"]
+        for backend in ("networkx", "compact"):
+            assert (
+                weighted_cgs(test["relationships"], backend=backend)
+                == test["primary_term_dict"]
+            )
+
+
+def test_weighted_cgs_shared_paths():
+    """
+    Test weighted_cgs() on nodes whose highest weight paths share resolved nodes.
+    """
+    relationships = [
+        ("A", "B", 1),
+        ("B", "C", 1),
+        ("B", "D", 1),  # Ties keep the first successor
+        ("E", "B", 3),
+        ("E", "F", 2),
+        ("G", "E", 1),
+    ]
+
+    for backend in ("networkx", "compact"):
+        assert weighted_cgs(relationships, backend=backend) == {
+            "A": "C",
+            "B": "C",
+            "C": "C",
+            "D": "D",
+            "E": "C",
+            "F": "F",
+            "G": "C",
+        }
+
+
+def test_weighted_cgs_backends_agree():
+    """
+    Test that both graph backends of weighted_cgs() agree on random acyclic graphs with duplicate edges.
+    """
+    rng = random.Random(0)
+    for _ in range(50):
+        nodes = [f"t{i}" for i in range(20)]
+        relationships = [
+            (nodes[i], nodes[j], rng.randint(1, 3))
+            for i in range(len(nodes))
+            for j in range(i + 1, len(nodes))
+            if rng.random() < 0.15
+        ]
+        relationships += rng.sample(relationships, len(relationships) // 4)
+
+        assert weighted_cgs(relationships, backend="compact") == weighted_cgs(
+            relationships
+        )
+
+
+def test_streamed_relationships():
+    """
+    Test that generators of relationships are consumed once, with the same results as lists.
+    """
+    relationships = [("A", "B"), ("B", "C"), ("A", "B"), ("D", "B"), ("E", "F")]
+    weighted_relationships = [(src, tgt, 1.0) for src, tgt in relationships]
+    for backend in ("networkx", "compact"):
+        assert foundational_cgs(
+            (edge for edge in relationships), backend=backend
+        ) == foundational_cgs(relationships, backend=backend)
+        assert weighted_cgs(
+            (edge for edge in weighted_relationships), backend=backend
+        ) == weighted_cgs(weighted_relationships, backend=backend)
+
+
+def test_lazy_results():
+    """
+    Test that lazy results are read-only mappings equal to the dictionaries.
+    """
+    relationships = [("A", "B"), ("B", "C"), ("D", "B"), ("E", "F")]
+    primary_terms = foundational_cgs(relationships, backend="compact", lazy=True)
+    assert isinstance(primary_terms, PrimaryTermMap)
+    assert primary_terms == foundational_cgs(relationships, backend="compact")
+    assert list(primary_terms) == ["A", "B", "C", "D", "E", "F"]
+    assert primary_terms["D"] == "C"
+    assert "F" in primary_terms and "G" not in primary_terms
+    with pytest.raises(KeyError):
+        primary_terms["G"]  # pylint: disable=pointless-statement
+
+    weighted_relationships = [("A", "B", 1), ("A", "C", 2)]
+    assert dict(weighted_cgs(weighted_relationships, backend="compact", lazy=True)) == {
+        "A": "C",
+        "B": "B",
+        "C": "C",
+    }
+
+    with pytest.raises(ValueError):
+        foundational_cgs(relationships, lazy=True)
+
+
+def test_cyclic_graph_error():
+    """
+    Test that cycles are reported with their strongly connected components instead of hanging.
+    """
+    for backend in ("networkx", "compact"):
+        with pytest.raises(CyclicGraphError) as exc_info:
+            foundational_cgs(
+                [("A", "B"), ("B", "C"), ("C", "A"), ("D", "E")], backend=backend
+            )
+        assert exc_info.value.components == [{"A", "B", "C"}]
+
+        with pytest.raises(CyclicGraphError) as exc_info:
+            weighted_cgs(
+                [("X", "A", 1), ("A", "B", 2), ("B", "A", 1), ("A", "C", 1)],
+                backend=backend,
+            )
+        assert exc_info.value.components == [{"A", "B"}]
+
+        with pytest.raises(CyclicGraphError) as exc_info:
+            weighted_cgs([("A", "A", 1)], backend=backend)
+        assert exc_info.value.components == [{"A"}]
+
+
+def test_unsupported_backend():
+    """
+    Test that an unsupported graph backend raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        foundational_cgs([("A", "B")], backend="igraph")
+    with pytest.raises(ValueError):
+        weighted_cgs([("A", "B", 1)], backend="igraph")
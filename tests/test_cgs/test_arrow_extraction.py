@@ -0,0 +1,58 @@
+"""
+Test: pycgs.cgs.arrow_extraction
+"""
+
+import pytest
+
+from pycgs.cgs.arrow_extraction import extract_arrow, extract_arrow_table
+from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
+
+pa = pytest.importorskip("pyarrow")
+
+
+PRIMARY_TERM_DICT = {"青蒿": "nmm-0001", "Qing-hao": "nmm-0001", "草麻黄": "nmm-0003"}
+TEXTS = ["用青蒿和草麻黄", None, "", "Qing-hao", "none"]
+
+
+def test_extract_arrow():
+    """
+    Test extracting a list column from an Arrow string array, including null rows and non-ASCII text.
+    """
+    extractor = PrimaryTermExtractor(PRIMARY_TERM_DICT)
+
+    result = extract_arrow(extractor, pa.array(TEXTS))
+
+    rows = result.to_pylist()
+    assert rows[1] is None
+    assert rows[2] == [] and rows[4] == []
+    assert [(m["start"], m["end"], m["term"], m["primary_term"]) for m in rows[0]] == [
+        (1, 3, "青蒿", "nmm-0001"),
+        (4, 7, "草麻黄", "nmm-0003"),
+    ]
+    assert [m["term"] for m in rows[3]] == ["Qing-hao"]
+
+
+def test_extract_arrow_table():
+    """
+    Test extracting a long table from sliced and chunked arrays, with row numbers ready for joins.
+    """
+    extractor = PrimaryTermExtractor(PRIMARY_TERM_DICT)
+    chunked = pa.chunked_array([pa.array(["x"] + TEXTS[:2]).slice(1), TEXTS[2:]])
+
+    table = extract_arrow_table(extractor, chunked)
+
+    assert table.column("row").to_pylist() == [0, 0, 3]
+    assert table.column("start").to_pylist() == [1, 4, 0]
+    assert table.column("primary_term").to_pylist() == [
+        "nmm-0001",
+        "nmm-0003",
+        "nmm-0001",
+    ]
+
+
+def test_extract_arrow_invalid_type():
+    """
+    Test that non-string columns are rejected.
+    """
+    with pytest.raises(TypeError):
+        extract_arrow(PrimaryTermExtractor(PRIMARY_TERM_DICT), pa.array([1, 2]))
@@ -0,0 +1,112 @@
+"""
+Test: pycgs.cgs.cgs_index
+"""
+
+import random
+
+import pytest
+
+from pycgs.cgs.algorithms import CyclicGraphError, foundational_cgs, weighted_cgs
+from pycgs.cgs.cgs_index import CGSIndex
+
+
+def test_initialization():
+    """
+    Test that an index built from relationships matches the CGS algorithms.
+    """
+    relationships = [("A", "B"), ("B", "C"), ("D", "B"), ("E", "F")]
+    index = CGSIndex(relationships)
+
+    assert index.to_dict() == foundational_cgs(relationships)
+    assert index.primary_of("A") == "C"
+    assert index.primary_of("Z") is None
+    assert "E" in index
+    assert len(index) == 6
+
+    weighted_relationships = [
+        ("A", "B", 1),
+        ("B", "C", 2),
+        ("D", "B", 1),
+        ("B", "E", 1),
+    ]
+    assert CGSIndex(weighted_relationships, weighted=True).to_dict() == weighted_cgs(
+        weighted_relationships
+    )
+
+
+def test_add_and_remove_edge():
+    """
+    Test that edge updates return the change-set of the moved Primary Terms.
+    """
+    index = CGSIndex([("A", "B"), ("B", "C"), ("D", "B"), ("E", "F")])
+
+    assert index.add_edge("C", "G") == {
+        "G": "G",
+        "A": "G",
+        "B": "G",
+        "C": "G",
+        "D": "G",
+    }
+    assert index.add_edge("B", "F") == {}  # "C" is still the smallest successor of "B"
+    assert index.remove_edge("B", "C") == {"B": "F", "A": "F", "D": "F"}
+    assert index.remove_edge("C", "G") == {"C": None, "G": None}
+    assert index.to_dict() == {"A": "F", "B": "F", "D": "F", "E": "F", "F": "F"}
+
+    with pytest.raises(KeyError):
+        index.remove_edge("A", "F")
+
+
+def test_cycles_are_rejected():
+    """
+    Test that updates creating an unresolvable cycle raise and leave the index unchanged.
+    """
+    index = CGSIndex([("A", "B"), ("B", "C")])
+    with pytest.raises(CyclicGraphError) as exc_info:
+        index.add_edge("C", "A")
+    assert exc_info.value.components == [{"A", "B", "C"}]
+    assert index.to_dict() == {"A": "C", "B": "C", "C": "C"}
+    with pytest.raises(CyclicGraphError):
+        index.add_edge("E", "E")
+    assert "E" not in index
+    assert index.add_edge("C", "D") == {"D": "D", "A": "D", "B": "D", "C": "D"}
+
+    with pytest.raises(CyclicGraphError):
+        CGSIndex([("A", "B"), ("B", "A")])
+
+    # A weighted index tolerates cycles that no chosen path follows
+    weighted_index = CGSIndex([("C", "X", 2), ("C", "D", 1)], weighted=True)
+    assert weighted_index.add_edge("D", "C", 1) == {"D": "X"}
+    with pytest.raises(CyclicGraphError):
+        weighted_index.remove_edge("C", "X")
+    assert weighted_index.to_dict() == {"C": "X", "X": "X", "D": "X"}
+
+    with pytest.raises(ValueError):
+        weighted_index.add_edge("X", "Y")
+
+
+def test_random_updates_match_full_rebuilds():
+    """
+    Test that random incremental updates agree with rebuilding from the current edges.
+    """
+    rng = random.Random(0)
+    nodes = [f"t{i}" for i in range(12)]
+
+    for weighted in (False, True):
+        index = CGSIndex(weighted=weighted)
+        edges = {}
+        for _ in range(300):
+            i, j = sorted(rng.sample(range(len(nodes)), 2))
+            source, target = nodes[i], nodes[j]  # Edges point forward, so no cycles
+            if (source, target) in edges and rng.random() < 0.5:
+                index.remove_edge(source, target)
+                del edges[(source, target)]
+            else:
+                weight = rng.random()
+                index.add_edge(source, target, weight)
+                edges[(source, target)] = weight
+
+            if weighted:
+                expected = weighted_cgs([(s, t, w) for (s, t), w in edges.items()])
+            else:
+                expected = foundational_cgs(list(edges))
+            assert index.to_dict() == expected
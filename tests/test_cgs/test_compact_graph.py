@@ -0,0 +1,60 @@
+"""
+Test: pycgs.cgs.compact_graph
+"""
+
+from pycgs.cgs.compact_graph import CompactDiGraph
+
+
+def test_interning_and_successors():
+    """
+    Test that nodes are interned in order of appearance and successors keep insertion order.
+    """
+    graph = CompactDiGraph([("A", "C"), ("B", "C"), ("A", "B"), ("A", "C")])
+
+    assert graph.names == ["A", "C", "B"]
+    assert len(graph) == 3
+    assert graph.number_of_edges() == 3
+    assert list(graph.successors(graph.ids["A"])) == [graph.ids["C"], graph.ids["B"]]
+    assert graph.out_degree(graph.ids["C"]) == 0
+
+
+def test_duplicate_weighted_edges():
+    """
+    Test that a duplicate weighted edge keeps its first position and its last weight.
+    """
+    graph = CompactDiGraph(
+        [("A", "B", 1.0), ("A", "C", 2.0), ("A", "B", 3.0)], weighted=True
+    )
+
+    a = graph.ids["A"]
+    start, end = graph.offsets[a], graph.offsets[a + 1]
+    assert [graph.names[node] for node in graph.successors(a)] == ["B", "C"]
+    assert list(graph.weights[start:end]) == [3.0, 2.0]
+
+
+def test_topological_order():
+    """
+    Test topological sorting of acyclic and cyclic graphs.
+    """
+    graph = CompactDiGraph([("A", "B"), ("B", "C"), ("D", "B")])
+    order = [graph.names[node] for node in graph.topological_order()]
+    assert order.index("A") < order.index("B") < order.index("C")
+    assert order.index("D") < order.index("B")
+
+    assert CompactDiGraph([("A", "B"), ("B", "A")]).topological_order() is None
+
+
+def test_strongly_connected_components():
+    """
+    Test finding the strongly connected components.
+    """
+    graph = CompactDiGraph(
+        [("A", "B"), ("B", "C"), ("C", "A"), ("C", "D"), ("D", "E"), ("E", "D")]
+    )
+
+    components = [
+        {graph.names[node] for node in component}
+        for component in graph.strongly_connected_components()
+    ]
+
+    assert sorted(components, key=min) == [{"A", "B", "C"}, {"D", "E"}]
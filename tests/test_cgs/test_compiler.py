@@ -0,0 +1,83 @@
+"""
+Test: pycgs.cgs.compiler
+"""
+
+import pytest
+
+from pycgs.cgs.algorithms import CyclicGraphError, foundational_cgs, weighted_cgs
+from pycgs.cgs.compiler import CompileReport, compile_extractor
+from pycgs.cgs.normalization import TextNormalizer
+from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
+
+RELATIONSHIPS = [
+    ("Qing Hao", "Artemisia annua"),
+    ("qing-hao", "Artemisia annua"),
+    ("黄花蒿", "Artemisia annua"),
+    ("Artemisia annua", "nmm-0001"),
+    ("麻黄", "nmm-0003"),
+    ("Ma Huang", "麻黄"),
+]
+
+TEXT = "QING HAO and Qing Hao, qing-hao, 黄花蒿 and Ma Huang"
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"ignore_case": True},
+        {"normalizer": TextNormalizer(), "backend": "automaton"},
+        {"word_boundaries": True},
+    ],
+)
+def test_compile_extractor(tmp_path, settings):
+    """
+    Test that a compiled extractor matches an extractor built from the result of foundational_cgs().
+    """
+    report = compile_extractor(RELATIONSHIPS, tmp_path / "extractor", **settings)
+    extractor = PrimaryTermExtractor.load(report.path)
+    expected = PrimaryTermExtractor(foundational_cgs(RELATIONSHIPS), **settings)
+
+    assert isinstance(report, CompileReport)
+    assert (report.nodes, report.edges, report.primary_terms) == (8, 6, 2)
+    assert report.terms == len(expected.primary_term_dict)
+    assert set(report.stages) == {"graph", "resolve", "index", "save"}
+    assert report.peak_memory is None
+    assert extractor.backend == expected.backend
+    assert extractor.max_term_length == expected.max_term_length
+    assert dict(extractor.primary_term_dict) == dict(expected.primary_term_dict)
+    assert extractor.extract_primary_terms(TEXT) == expected.extract_primary_terms(TEXT)
+
+
+def test_compile_weighted_extractor_from_file(tmp_path):
+    """
+    Test compiling the weighted relationships of an edge file, with the peak memory traced.
+    """
+    relationships = [("A", "B", 1.0), ("A", "C", 2.0), ("C", "D", 1.0)]
+    edges_path = tmp_path / "edges.csv"
+    edges_path.write_text(
+        "".join(f"{src},{tgt},{weight}\n" for src, tgt, weight in relationships),
+        encoding="utf-8",
+    )
+
+    report = compile_extractor(
+        edges_path, tmp_path / "extractor", weighted=True, trace_memory=True
+    )
+    extractor = PrimaryTermExtractor.load(report.path)
+
+    assert dict(extractor.primary_term_dict) == weighted_cgs(relationships)
+    assert report.peak_memory > 0
+
+
+def test_compile_extractor_errors(tmp_path):
+    """
+    Test that invalid settings and cyclic relationships are rejected.
+    """
+    with pytest.raises(ValueError):
+        compile_extractor(RELATIONSHIPS, tmp_path, backend="unknown")
+    with pytest.raises(ValueError):
+        compile_extractor(
+            RELATIONSHIPS, tmp_path, ignore_case=True, normalizer=TextNormalizer()
+        )
+    with pytest.raises(CyclicGraphError):
+        compile_extractor([("A", "B"), ("B", "A")], tmp_path)
@@ -0,0 +1,108 @@
+"""
+Test: pycgs.cgs.edge_files
+"""
+
+import json
+
+import pytest
+
+from pycgs.cgs.algorithms import foundational_cgs
+from pycgs.cgs.edge_files import read_edges, write_primary_terms
+
+
+def test_read_edges(tmp_path):
+    """
+    Test reading edges from CSV, TSV and JSONL files.
+    """
+    csv_path = tmp_path / "edges.csv"
+    csv_path.write_text("source,target,weight\nA,B,0.5\n\nB,C,2\n", encoding="utf-8")
+    assert list(read_edges(csv_path, header=True)) == [("A", "B"), ("B", "C")]
+    assert list(read_edges(csv_path, weighted=True, header=True)) == [
+        ("A", "B", 0.5),
+        ("B", "C", 2.0),
+    ]
+
+    tsv_path = tmp_path / "edges.tsv"
+    tsv_path.write_text("A, 1\tB\n", encoding="utf-8")
+    assert list(read_edges(tsv_path)) == [("A, 1", "B")]
+
+    jsonl_path = tmp_path / "edges.jsonl"
+    lines = [["A", "B", 1], {"source": "B", "target": "C", "weight": 2}]
+    jsonl_path.write_text(
+        "\n".join(json.dumps(line) for line in lines) + "\n\n", encoding="utf-8"
+    )
+    assert list(read_edges(jsonl_path, weighted=True)) == [
+        ("A", "B", 1.0),
+        ("B", "C", 2.0),
+    ]
+
+    with pytest.raises(ValueError):
+        list(read_edges(csv_path, weighted=True))
+    with pytest.raises(ValueError):
+        list(read_edges(tmp_path / "edges.txt"))
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"source": "B"}',
+        '{"source": "B", "target": null}',
+        '[null, "C"]',
+        '"BC"',
+        "{B, C}",
+    ],
+)
+def test_read_invalid_jsonl(tmp_path, line):
+    """
+    Test that a JSONL line that is not valid JSON or lacks a source or a target raises a ValueError with its
+    line number.
+    """
+    jsonl_path = tmp_path / "edges.jsonl"
+    jsonl_path.write_text(f'["A", "B"]\n\n{line}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="line 3"):
+        list(read_edges(jsonl_path))
+
+
+def test_read_parquet(tmp_path):
+    """
+    Test reading edges from a Parquet file.
+    """
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = tmp_path / "edges.parquet"
+    table = pa.table({"source": ["A", "B"], "target": ["B", "C"], "weight": [1, 2]})
+    pq.write_table(table, path)
+    assert list(read_edges(path)) == [("A", "B"), ("B", "C")]
+    assert list(read_edges(path, weighted=True)) == [("A", "B", 1.0), ("B", "C", 2.0)]
+
+
+def test_write_primary_terms(tmp_path):
+    """
+    Test writing the result of a streamed, lazy resolution to CSV and JSONL files.
+    """
+    edges_path = tmp_path / "edges.csv"
+    edges_path.write_text("A,B\nB,C\nD,C\n", encoding="utf-8")
+    primary_terms = foundational_cgs(
+        read_edges(edges_path), backend="compact", lazy=True
+    )
+
+    csv_path = tmp_path / "primary_terms.csv"
+    assert write_primary_terms(primary_terms, csv_path) == 4
+    assert csv_path.read_text(encoding="utf-8").splitlines() == [
+        "A,C",
+        "B,C",
+        "C,C",
+        "D,C",
+    ]
+
+    jsonl_path = tmp_path / "primary_terms.jsonl"
+    assert write_primary_terms({"苹果": "Apple"}, jsonl_path) == 1
+    assert json.loads(jsonl_path.read_text(encoding="utf-8")) == {
+        "term": "苹果",
+        "primary_term": "Apple",
+    }
+
+    with pytest.raises(ValueError):
+        write_primary_terms(primary_terms, tmp_path / "primary_terms.parquet")
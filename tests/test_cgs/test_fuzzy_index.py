@@ -0,0 +1,90 @@
+"""
+Test: pycgs.cgs.fuzzy_index
+"""
+
+import random
+import pytest
+
+from pycgs.cgs.fuzzy_index import FuzzyIndex, _edit_distance
+
+
+def test_iter_candidates():
+    """
+    Test finding occurrences with substitutions, deletions and insertions.
+    """
+    index = FuzzyIndex(
+        ["artemisia annua", "ephedra sinica", "short"], max_distance=1, min_length=6
+    )
+    text = "the artemisia anua and ephedra sinicaa, and ephedraa sinica"
+
+    candidates = {
+        (text[start:end], index.terms[term_index], distance)
+        for start, end, term_index, distance in index.iter_candidates(text)
+    }
+
+    assert index.terms == ["artemisia annua", "ephedra sinica"]
+    assert ("artemisia anua", "artemisia annua", 1) in candidates
+    assert ("ephedra sinica", "ephedra sinica", 0) in candidates
+    assert ("ephedraa sinica", "ephedra sinica", 1) in candidates
+
+
+def test_iter_candidates_against_brute_force():
+    """
+    Test that the best occurrence of every term within the maximum distance is found, with its exact distance.
+    """
+    rng = random.Random(0)
+    for _ in range(500):
+        max_distance = rng.randint(1, 2)
+        terms = [
+            "".join(rng.choice("abc") for _ in range(rng.randint(3, 7)))
+            for _ in range(3)
+        ]
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        index = FuzzyIndex(terms, max_distance, max_distance + 1)
+
+        best = {}
+        for start, end, term_index, distance in index.iter_candidates(text):
+            assert _edit_distance(index.terms[term_index], text[start:end]) == distance
+            best[term_index] = min(best.get(term_index, distance), distance)
+
+        for term_index, term in enumerate(index.terms):
+            expected = min(
+                _edit_distance(term, text[start:end])
+                for start in range(len(text) + 1)
+                for end in range(start, len(text) + 1)
+            )
+            assert best.get(term_index) == (
+                expected if expected <= max_distance else None
+            )
+
+
+def test_iter_candidates_from_stream():
+    """
+    Test that a stream of characters with offsets gives the occurrences of the text, at those offsets,
+    while only the last characters are kept.
+    """
+    rng = random.Random(0)
+    for max_distance in (1, 2):
+        terms = [
+            "".join(rng.choice("abc") for _ in range(rng.randint(5, 9)))
+            for _ in range(5)
+        ]
+        text = "".join(rng.choice("abc") for _ in range(2000))
+        index = FuzzyIndex(terms, max_distance)
+
+        # Each character stands for two characters of the original text
+        stream = ((char, 2 * i, 2 * i + 2) for i, char in enumerate(text))
+        assert sorted(index.iter_candidates(stream)) == sorted(
+            (2 * start, 2 * end, term_index, distance)
+            for start, end, term_index, distance in index.iter_candidates(text)
+        )
+
+
+def test_invalid_arguments():
+    """
+    Test that invalid distances and lengths are rejected.
+    """
+    with pytest.raises(ValueError):
+        FuzzyIndex(["term"], max_distance=0)
+    with pytest.raises(ValueError):
+        FuzzyIndex(["term"], max_distance=2, min_length=2)
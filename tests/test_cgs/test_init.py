@@ -0,0 +1,78 @@
+"""
+Test: pycgs.cgs
+"""
+
+import importlib
+import json
+import subprocess
+import sys
+
+import pytest
+
+import pycgs.cgs
+
+
+HEAVY_MODULES = ("networkx", "marisa_trie", "asyncio", "multiprocessing")
+
+
+def loaded_heavy_modules(code: str) -> list[str]:
+    """
+    Runs code in a fresh interpreter and returns the heavy modules it has imported.
+    """
+    script = (
+        f"import sys\n{code}\n"
+        f"import json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("import pycgs.cgs", []),
+        (
+            "from pycgs.cgs import foundational_cgs\n"
+            "foundational_cgs([('a', 'b')], backend='compact')",
+            [],
+        ),
+        (
+            "from pycgs.cgs import PrimaryTermExtractor\n"
+            "PrimaryTermExtractor({'a': 'b'}).extract_primary_terms('a')",
+            ["marisa_trie"],
+        ),
+    ],
+)
+def test_lazy_imports(code, expected):
+    """
+    Test that importing the package and using one part of it does not import unused dependencies.
+    """
+    assert loaded_heavy_modules(code) == expected
+
+
+def test_public_names():
+    """
+    Test that every public name is resolved from its submodule, and that unknown names raise AttributeError.
+    """
+    for name in pycgs.cgs.__all__:
+        value = getattr(pycgs.cgs, name)
+        assert value.__module__.startswith("pycgs.cgs.")
+        assert name in dir(pycgs.cgs)
+
+    from pycgs.cgs import (  # pylint: disable=import-outside-toplevel
+        PrimaryTermExtractor,
+    )
+    from pycgs.cgs.primary_term_extractor import (  # pylint: disable=import-outside-toplevel
+        PrimaryTermExtractor as SubmodulePrimaryTermExtractor,
+    )
+
+    assert PrimaryTermExtractor is SubmodulePrimaryTermExtractor
+
+    # The ranked_cgs function is not shadowed by the submodule of the same name
+    importlib.import_module("pycgs.cgs.ranked_cgs")
+    assert callable(pycgs.cgs.ranked_cgs)
+
+    with pytest.raises(AttributeError):
+        getattr(pycgs.cgs, "missing")
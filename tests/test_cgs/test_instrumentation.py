@@ -0,0 +1,119 @@
+"""
+Test: pycgs.cgs.instrumentation
+"""
+
+import pytest
+
+from pycgs.cgs.algorithms import foundational_cgs, weighted_cgs
+from pycgs.cgs.instrumentation import CallMetrics, MetricsAggregator
+from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_extractor_metrics(backend):
+    """
+    Test the metrics reported by the extraction methods.
+    """
+    calls = []
+    extractor = PrimaryTermExtractor(
+        {"苹果": "Apple", "香蕉": "Banana"},
+        backend=backend,
+        cache_size=8,
+        metrics_callback=calls.append,
+    )
+    text = "我喜欢苹果和香蕉，苹果"
+
+    extractor.extract_primary_terms(text)
+    extractor.extract_primary_terms(text)
+    extractor.find_spans(text)
+    extractor.find_spans_batch([text, None, "苹果"])
+    extractor.extract_fuzzy(text, min_length=2)
+
+    assert [call.operation for call in calls] == [
+        "extract_primary_terms",
+        "extract_primary_terms",
+        "find_spans",
+        "find_spans_batch",
+        "extract_fuzzy",
+    ]
+    assert all(isinstance(call, CallMetrics) and call.elapsed >= 0 for call in calls)
+
+    # With the trie, the positions of the text are probed and the matched ones are jumped over
+    probes = 8 if backend == "trie" else 0
+    assert calls[0].counters == {
+        "texts": 1,
+        "characters": 11,
+        "matches": 3,
+        "cache_hits": 0,
+        "trie_probes": probes,
+    }
+    # A cache hit scans nothing, and reports the matches of the cached extraction
+    assert calls[1].counters == {
+        "texts": 1,
+        "characters": 0,
+        "matches": 3,
+        "cache_hits": 1,
+        "trie_probes": 0,
+    }
+    assert calls[1].counters["matches"] == calls[0].counters["matches"]
+    assert calls[2].counters["matches"] == 3
+    assert calls[3].counters["texts"] == 3
+    assert calls[3].counters["characters"] == 13
+    assert calls[3].counters["matches"] == 4
+    assert calls[4].counters["matches"] == 3
+
+    # The instrumentation can be turned off at any time
+    extractor.metrics_callback = None
+    extractor.find_spans(text)
+    assert len(calls) == 5
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_graph_metrics(backend):
+    """
+    Test the metrics reported by the CGS algorithms.
+    """
+    calls = []
+    foundational_cgs(
+        [("A", "B"), ("B", "C"), ("C", "D"), ("E", "D"), ("A", "B")],
+        backend=backend,
+        metrics_callback=calls.append,
+    )
+    weighted_cgs(
+        [("A", "B", 1), ("A", "C", 2), ("C", "D", 1)],
+        backend=backend,
+        metrics_callback=calls.append,
+    )
+
+    assert [call.operation for call in calls] == ["foundational_cgs", "weighted_cgs"]
+    assert calls[0].counters == {
+        "nodes": 5,
+        "edges": 4,
+        "primary_terms": 1,
+        "hops": 7,
+        "max_depth": 3,
+    }
+    assert calls[1].counters == {
+        "nodes": 4,
+        "edges": 3,
+        "primary_terms": 2,
+        "hops": 3,
+        "max_depth": 2,
+    }
+
+
+def test_metrics_aggregator():
+    """
+    Test that the aggregator sums the counters and keeps the maxima of each operation.
+    """
+    aggregator = MetricsAggregator()
+    aggregator(CallMetrics("weighted_cgs", 0.5, {"nodes": 3, "max_depth": 2}))
+    aggregator(CallMetrics("weighted_cgs", 0.25, {"nodes": 4, "max_depth": 1}))
+    aggregator(CallMetrics("find_spans", 0.125, {"matches": 1}))
+
+    assert aggregator.summary() == {
+        "weighted_cgs": {"calls": 2, "elapsed": 0.75, "nodes": 7, "max_depth": 2},
+        "find_spans": {"calls": 1, "elapsed": 0.125, "matches": 1},
+    }
+    aggregator.reset()
+    assert aggregator.summary() == {}
@@ -0,0 +1,36 @@
+"""
+Test: pycgs.cgs.match_policy
+"""
+
+import random
+from itertools import combinations
+
+from pycgs.cgs.match_policy import select_max_coverage
+
+
+def test_select_max_coverage():
+    """
+    Test that the selected matches do not overlap and cover as much as the best brute-force selection.
+    """
+    rng = random.Random(0)
+    for _ in range(300):
+        matches = set()
+        for term_id in range(rng.randint(0, 8)):
+            start = rng.randint(0, 15)
+            matches.add((start, start + rng.randint(1, 5), term_id))
+        matches = sorted(matches)
+
+        selection = select_max_coverage(matches)
+        assert selection == sorted(selection)
+        assert all(a[1] <= b[0] for a, b in zip(selection, selection[1:]))
+
+        best = max(
+            (sum(end - start for start, end, _ in subset), -len(subset))
+            for size in range(len(matches) + 1)
+            for subset in combinations(matches, size)
+            if all(a[1] <= b[0] for a, b in zip(subset, subset[1:]))
+        )
+        assert (
+            sum(end - start for start, end, _ in selection),
+            -len(selection),
+        ) == best
@@ -0,0 +1,23 @@
+"""
+Test: pycgs.cgs.match_spans
+"""
+
+from pycgs.cgs.match_spans import MatchSpans
+from pycgs.cgs.term_index import PrimaryTermIndex
+
+
+def test_append_and_resolve():
+    """
+    Test appending matches and resolving their ids to strings.
+    """
+    index = PrimaryTermIndex.from_dict({"青蒿": "nmm-0001", "草麻黄": "nmm-0003"})
+    spans = MatchSpans(index)
+    term_id = index.terms["草麻黄"]
+    primary_id = index.primary_terms["nmm-0003"]
+
+    spans.append(3, 6, term_id, primary_id)
+
+    assert len(spans) == 1
+    assert list(spans) == [(3, 6, term_id, primary_id)]
+    assert spans.term(spans.term_ids[0]) == "草麻黄"
+    assert spans.primary_term(spans.primary_ids[0]) == "nmm-0003"
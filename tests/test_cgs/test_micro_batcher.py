@@ -0,0 +1,137 @@
+"""
+Test: pycgs.cgs.micro_batcher
+"""
+
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from pycgs.cgs.micro_batcher import MicroBatcher
+from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """
+    A thread pool that records the size of each submitted batch.
+    """
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.batch_sizes = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.batch_sizes.append(len(args[-1]))
+        return super().submit(fn, *args, **kwargs)
+
+
+PRIMARY_TERM_DICT = {"青蒿": "nmm-0001", "草麻黄": "nmm-0003"}
+
+
+def test_concurrent_requests_are_batched():
+    """
+    Test that concurrent requests are grouped into batches of at most max_batch_size texts.
+    """
+    extractor = PrimaryTermExtractor(PRIMARY_TERM_DICT)
+    executor = CountingExecutor()
+    batcher = MicroBatcher(extractor, max_batch_size=4, executor=executor)
+    texts = ["青蒿", "草麻黄", "无"] * 3
+
+    async def main():
+        return await asyncio.gather(*(batcher.aextract(text) for text in texts))
+
+    results = asyncio.run(main())
+    executor.shutdown()
+
+    assert results == [extractor.extract_primary_terms(text) for text in texts]
+    assert executor.batch_sizes == [4, 4, 1]
+
+
+def test_large_texts_are_dispatched_early():
+    """
+    Test that a batch is dispatched once it reaches max_batch_characters.
+    """
+    executor = CountingExecutor()
+    batcher = MicroBatcher(
+        PrimaryTermExtractor(PRIMARY_TERM_DICT),
+        max_batch_characters=10,
+        executor=executor,
+    )
+
+    async def main():
+        return await asyncio.gather(
+            *(batcher.aextract(text) for text in ["青蒿" * 10, "a", "b"])
+        )
+
+    asyncio.run(main())
+    executor.shutdown()
+
+    assert executor.batch_sizes == [1, 2]
+
+
+def test_small_texts_do_not_wait_for_large_ones():
+    """
+    Test that a large text is extracted on its own, so that a small text submitted before it finishes first.
+    """
+    executor = CountingExecutor()
+    batcher = MicroBatcher(
+        PrimaryTermExtractor(PRIMARY_TERM_DICT),
+        max_batch_characters=1000,
+        executor=executor,
+    )
+
+    async def main():
+        small = batcher.submit("青蒿")
+        large = batcher.submit("青蒿 and 草麻黄 " * 100_000)
+        assert await small == {"青蒿": "nmm-0001"}
+        finished_before = large.done()
+        await large
+        return finished_before
+
+    assert not asyncio.run(main())
+    executor.shutdown()
+
+    assert executor.batch_sizes == [1, 1]
+
+
+def test_aextract_batch_and_errors():
+    """
+    Test iterating over the results of an async stream of texts, and that errors stay with their text.
+    """
+    extractor = PrimaryTermExtractor(PRIMARY_TERM_DICT)
+    texts = [f"{i}青蒿" if i % 2 else f"{i}草麻黄" for i in range(50)]
+
+    async def stream():
+        for text in texts:
+            await asyncio.sleep(0)
+            yield text
+
+    async def main():
+        results = [result async for result in extractor.aextract_batch(stream(), 8)]
+        in_order = [result async for result in extractor.aextract_batch(texts)]
+        single = await extractor.aextract("青蒿")
+        errors = await asyncio.gather(
+            extractor.aextract(None),
+            extractor.aextract("草麻黄"),
+            return_exceptions=True,
+        )
+        return results, in_order, single, errors
+
+    results, in_order, single, errors = asyncio.run(main())
+
+    expected = [extractor.extract_primary_terms(text) for text in texts]
+    assert results == expected
+    assert in_order == expected
+    assert single == {"青蒿": "nmm-0001"}
+    assert isinstance(errors[0], TypeError)
+    assert errors[1] == {"草麻黄": "nmm-0003"}
+
+
+def test_invalid_arguments():
+    """
+    Test that invalid batching limits are rejected.
+    """
+    extractor = PrimaryTermExtractor(PRIMARY_TERM_DICT)
+    with pytest.raises(ValueError):
+        MicroBatcher(extractor, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(extractor, max_delay=-1)
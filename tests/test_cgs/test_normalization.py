@@ -0,0 +1,62 @@
+"""
+Test: pycgs.cgs.normalization
+"""
+
+from pycgs.cgs.normalization import TextNormalizer
+
+
+def test_normalize():
+    """
+    Test folding case, width, Chinese variants and separators.
+    """
+    normalizer = TextNormalizer()
+
+    assert (
+        normalizer.normalize("Artemisia annua Part-aerial")
+        == "artemisia annua part aerial"
+    )
+    assert normalizer.normalize("ＡＲＴＥＭＩＳＩＡ  Ａｎｎｕａ") == "artemisia annua"
+    assert normalizer.normalize("Part – aerial") == "part aerial"
+    assert normalizer.normalize("草麻黃草質莖") == "草麻黄草质茎"
+    assert normalizer.normalize("Straße") == "strasse"
+
+
+def test_normalize_options():
+    """
+    Test disabling each step of the normalization.
+    """
+    normalizer = TextNormalizer(
+        casefold=False, nfkc=False, fold_separators=False, variants={}
+    )
+
+    assert normalizer.normalize("Ｐart-aerial 黃") == "Ｐart-aerial 黃"
+    assert TextNormalizer(variants={"A": "B"}, casefold=False).normalize("AA") == "BB"
+
+
+def test_fold_keeps_original_offsets():
+    """
+    Test that folded characters keep the offsets of the characters they come from, across chunks.
+    """
+    normalizer = TextNormalizer()
+
+    folded = list(normalizer.fold(["Aß -", " 黃"]))
+
+    assert folded == [
+        ("a", 0, 1),
+        ("s", 1, 2),
+        ("s", 1, 2),
+        (" ", 2, 3),
+        ("黄", 5, 6),
+    ]
+
+
+def test_config_round_trip():
+    """
+    Test recreating a normalizer from its settings.
+    """
+    normalizer = TextNormalizer(nfkc=False, variants={"黃": "黄"})
+
+    restored = TextNormalizer.from_config(normalizer.to_config())
+
+    assert restored.to_config() == normalizer.to_config()
+    assert restored.normalize("麻黃 Herba") == "麻黄 herba"
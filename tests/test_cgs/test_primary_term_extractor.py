@@ -1,3 +1,9 @@
+import io
+import pickle
+import pytest
+
+from pycgs.cgs.cgs_index import CGSIndex
+from pycgs.cgs.normalization import TextNormalizer
 from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
 
 
@@ -328,3 +334,537 @@ def test_mixed_case_sensitive_and_case_insensitive():
     }
 
     assert result == expected_result
+
+
+def test_automaton_backend_matches_trie_backend():
+    """
+    Test that the automaton backend returns the same results as the trie backend.
+    """
+    primary_term_dict = {
+        "Artemisia annua": "nmm-0001",
+        "Artemisia annua Part-aerial": "nmm-0001",
+        "Ephedra sinica Stem-herbaceous": "nmm-0003",
+        "Cao-ma-huang": "nmm-0003",
+        "草麻黄草质茎": "nmm-0003",
+        "草麻黄": "nmm-0003",
+    }
+    texts = [
+        "The plant Artemisia annua Part-aerial is a Natural Medicinal Material.",
+        "Artemisia annua and Ephedra sinica Stem-herbaceous, a.k.a. CAO-MA-HUANG.",
+        "草麻黄草质茎和草麻黄",
+        "",
+    ]
+
+    for ignore_case in (False, True):
+        trie_extractor = PrimaryTermExtractor(primary_term_dict, ignore_case)
+        automaton_extractor = PrimaryTermExtractor(
+            primary_term_dict, ignore_case, backend="automaton"
+        )
+        for text in texts:
+            assert automaton_extractor.extract_primary_terms(
+                text
+            ) == trie_extractor.extract_primary_terms(text)
+
+
+def test_unsupported_backend():
+    """
+    Test that an unsupported backend raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        PrimaryTermExtractor({"苹果": "水果"}, backend="regex")
+
+
+def test_extract_batch():
+    """
+    Test that batch extraction yields the same results as extract_primary_terms() in input order.
+    """
+    primary_term_dict = {"苹果": "水果", "香蕉": "水果", "汽车": "交通工具"}
+    texts = ["我今天买了苹果。", "", "还有一辆新汽车。", "香蕉和苹果"] * 10
+    expected = [
+        PrimaryTermExtractor(primary_term_dict).extract_primary_terms(text)
+        for text in texts
+    ]
+
+    for backend in ("trie", "automaton"):
+        extractor = PrimaryTermExtractor(primary_term_dict, backend=backend)
+        assert list(extractor.extract_batch(texts)) == expected
+        assert list(extractor.extract_batch(texts, workers=2, chunksize=3)) == expected
+
+
+def test_extract_batch_invalid_arguments():
+    """
+    Test that invalid batch arguments raise a ValueError.
+    """
+    extractor = PrimaryTermExtractor({"苹果": "水果"})
+
+    with pytest.raises(ValueError):
+        extractor.extract_batch(["苹果"], workers=0)
+    with pytest.raises(ValueError):
+        extractor.extract_batch(["苹果"], chunksize=0)
+
+
+def test_extract_stream():
+    """
+    Test that streaming extraction finds terms split across chunk boundaries.
+    """
+    primary_term_dict = {
+        "Artemisia annua": "nmm-0001",
+        "Artemisia annua Part-aerial": "nmm-0001",
+        "Cao-ma-huang": "nmm-0003",
+        "草麻黄草质茎": "nmm-0003",
+        "草麻黄": "nmm-0003",
+    }
+    text = "Artemisia annua Part-aerial, ARTEMISIA ANNUA and cao-ma-huang: 草麻黄草质茎和草麻黄。"
+
+    expected_matches = {
+        False: [
+            (0, 27, "Artemisia annua Part-aerial", "nmm-0001"),
+            (63, 69, "草麻黄草质茎", "nmm-0003"),
+            (70, 73, "草麻黄", "nmm-0003"),
+        ],
+        True: [
+            (0, 27, "artemisia annua part-aerial", "nmm-0001"),
+            (29, 44, "artemisia annua", "nmm-0001"),
+            (49, 61, "cao-ma-huang", "nmm-0003"),
+            (63, 69, "草麻黄草质茎", "nmm-0003"),
+            (70, 73, "草麻黄", "nmm-0003"),
+        ],
+    }
+
+    for ignore_case, expected in expected_matches.items():
+        for backend in ("trie", "automaton"):
+            extractor = PrimaryTermExtractor(primary_term_dict, ignore_case, backend)
+
+            for chunk_size in (1, 2, 5, 7, 100):
+                assert list(extractor.extract_stream(text, chunk_size)) == expected
+                assert (
+                    list(extractor.extract_stream(io.StringIO(text), chunk_size))
+                    == expected
+                )
+                chunks = [
+                    text[i : i + chunk_size] for i in range(0, len(text), chunk_size)
+                ]
+                assert list(extractor.extract_stream(iter(chunks))) == expected
+
+
+def test_extract_stream_invalid_chunk_size():
+    """
+    Test that a chunk size less than 1 raises a ValueError.
+    """
+    extractor = PrimaryTermExtractor({"苹果": "水果"})
+
+    with pytest.raises(ValueError):
+        extractor.extract_stream("苹果", chunk_size=0)
+
+
+def test_save_and_load(tmp_path):
+    """
+    Test that a saved extractor loads back with the same settings and results.
+    """
+    primary_term_dict = {
+        "Artemisia annua Part-aerial": "nmm-0001",
+        "Cao-ma-huang": "nmm-0003",
+        "草麻黄草质茎": "nmm-0003",
+        "草麻黄": "nmm-0003",
+    }
+    texts = ["ARTEMISIA ANNUA Part-aerial and cao-ma-huang", "草麻黄草质茎和草麻黄"]
+
+    extractor = PrimaryTermExtractor(
+        primary_term_dict, ignore_case=True, backend="automaton"
+    )
+    extractor.save(tmp_path)
+    expected = [extractor.extract_primary_terms(text) for text in texts]
+
+    for mmap in (True, False):
+        loaded = PrimaryTermExtractor.load(tmp_path, mmap=mmap)
+        assert loaded.ignore_case
+        assert loaded.backend == "automaton"
+        assert loaded.primary_term_dict == extractor.primary_term_dict
+        assert [loaded.extract_primary_terms(text) for text in texts] == expected
+
+        # The loaded extractor is shared with worker processes by its directory
+        assert pickle.loads(pickle.dumps(loaded)).primary_term_dict.path == str(
+            tmp_path
+        )
+        assert list(loaded.extract_batch(texts, workers=2)) == expected
+
+    loaded = PrimaryTermExtractor.load(tmp_path, backend="trie")
+    assert loaded.backend == "trie"
+    assert [loaded.extract_primary_terms(text) for text in texts] == expected
+
+
+def test_update_and_replace():
+    """
+    Test applying term changes and swapping in a new dictionary.
+    """
+    primary_term_dict = {"苹果": "水果", "香蕉": "水果"}
+    text = "我今天买了苹果、香蕉和一辆新汽车。"
+
+    for backend in ("trie", "automaton"):
+        extractor = PrimaryTermExtractor(primary_term_dict, backend=backend)
+
+        extractor.update({"汽车": "交通工具", "香蕉": None, "梨": None})
+        assert extractor.extract_primary_terms(text) == {
+            "苹果": "水果",
+            "汽车": "交通工具",
+        }
+        # The original dictionary is never modified in place
+        assert primary_term_dict == {"苹果": "水果", "香蕉": "水果"}
+
+        extractor.replace({"新汽车": "交通工具"})
+        assert extractor.extract_primary_terms(text) == {"新汽车": "交通工具"}
+        assert extractor.max_term_length == 3
+
+
+def test_update_keeps_running_extractions_consistent():
+    """
+    Test that an extraction in progress keeps working on the snapshot it started with.
+    """
+    extractor = PrimaryTermExtractor({"苹果": "水果"}, ignore_case=True)
+    matches = extractor.extract_stream("苹果 Car 苹果", chunk_size=1)
+
+    assert next(matches) == (0, 2, "苹果", "水果")
+    extractor.update({"CAR": "vehicle", "苹果": None})
+    assert list(matches) == [(7, 9, "苹果", "水果")]
+    assert extractor.extract_primary_terms("苹果 Car") == {"car": "vehicle"}
+
+
+def test_update_from_cgs_index_change_set():
+    """
+    Test applying the change-sets of a CGSIndex to a live extractor.
+    """
+    index = CGSIndex([("Qing-hao", "nmm-0001"), ("青蒿", "nmm-0001")])
+    extractor = PrimaryTermExtractor(index.to_dict())
+
+    extractor.update(index.add_edge("nmm-0001", "nmm-0002"))
+    assert extractor.extract_primary_terms("青蒿") == {"青蒿": "nmm-0002"}
+
+    extractor.update(index.remove_edge("青蒿", "nmm-0001"))
+    assert extractor.extract_primary_terms("青蒿") == {}
+
+
+def test_find_spans_and_iter_matches():
+    """
+    Test that every occurrence is reported with its offsets and ids.
+    """
+    primary_term_dict = {
+        "Qing-hao": "nmm-0001",
+        "青蒿": "nmm-0001",
+        "草麻黄草质茎": "nmm-0003",
+        "草麻黄": "nmm-0003",
+    }
+    text = "青蒿, qing-hao, 草麻黄草质茎, 青蒿"
+
+    for ignore_case in (False, True):
+        for backend in ("trie", "automaton"):
+            extractor = PrimaryTermExtractor(primary_term_dict, ignore_case, backend)
+
+            spans = extractor.find_spans(text)
+            matches = [
+                (start, end, spans.term(term_id), spans.primary_term(primary_id))
+                for start, end, term_id, primary_id in spans
+            ]
+
+            expected = [(0, 2, "青蒿", "nmm-0001")]
+            if ignore_case:
+                expected.append((4, 12, "qing-hao", "nmm-0001"))
+            expected += [
+                (14, 20, "草麻黄草质茎", "nmm-0003"),
+                (22, 24, "青蒿", "nmm-0001"),
+            ]
+            assert matches == expected
+            assert list(extractor.iter_matches(text)) == list(spans)
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_normalizer(backend, tmp_path):
+    """
+    Test matching through a normalizer, with offsets in the original text.
+    """
+    primary_term_dict = {
+        "Artemisia annua Part-aerial": "nmm-0001",
+        "草麻黄草质茎": "nmm-0003",
+    }
+    extractor = PrimaryTermExtractor(
+        primary_term_dict, backend=backend, normalizer=TextNormalizer()
+    )
+    text = "Ｓｅｅ ARTEMISIA  annua part – aerial, 草麻黃草質莖."
+    expected = [
+        (4, 34, "artemisia annua part aerial", "nmm-0001"),
+        (36, 42, "草麻黄草质茎", "nmm-0003"),
+    ]
+
+    assert extractor.extract_primary_terms(text) == {
+        "artemisia annua part aerial": "nmm-0001",
+        "草麻黄草质茎": "nmm-0003",
+    }
+    assert [(start, end) for start, end, _, _ in extractor.iter_matches(text)] == [
+        (4, 34),
+        (36, 42),
+    ]
+    assert list(extractor.extract_stream(text, chunk_size=3)) == expected
+
+    extractor.update({"Ｓｅｅ": "nmm-0002"})
+    assert extractor.extract_primary_terms("see")["see"] == "nmm-0002"
+
+    extractor.save(tmp_path)
+    loaded = PrimaryTermExtractor.load(tmp_path)
+    assert list(loaded.extract_stream(text)) == [(0, 3, "see", "nmm-0002")] + expected
+
+
+def test_normalizer_with_ignore_case():
+    """
+    Test that ignore_case cannot be combined with a normalizer.
+    """
+    with pytest.raises(ValueError):
+        PrimaryTermExtractor({"a": "b"}, ignore_case=True, normalizer=TextNormalizer())
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_word_boundaries(backend):
+    """
+    Test that Latin terms only match at word boundaries, while CJK terms match anywhere.
+    """
+    primary_term_dict = {
+        "Qing-hao": "nmm-0001",
+        "Qing": "nmm-0002",
+        "hao": "nmm-0003",
+        "青蒿": "nmm-0001",
+    }
+    extractor = PrimaryTermExtractor(
+        primary_term_dict, backend=backend, word_boundaries=True
+    )
+    text = "Qing-haoxyz, xQing, hao; 用青蒿和Qing-hao治"
+    expected = [
+        (0, 4, "Qing", "nmm-0002"),
+        (20, 23, "hao", "nmm-0003"),
+        (26, 28, "青蒿", "nmm-0001"),
+        (29, 37, "Qing-hao", "nmm-0001"),
+    ]
+
+    assert [(start, end) for start, end, _, _ in extractor.iter_matches(text)] == [
+        (start, end) for start, end, _, _ in expected
+    ]
+    assert list(extractor.extract_stream(text, chunk_size=2)) == expected
+    assert extractor.extract_primary_terms(text) == {
+        term: primary_term for _, _, term, primary_term in expected
+    }
+
+    normalized = PrimaryTermExtractor(
+        primary_term_dict,
+        backend=backend,
+        normalizer=TextNormalizer(),
+        word_boundaries=True,
+    )
+    assert list(normalized.extract_stream("QING HAOS qing hao")) == [
+        (0, 4, "qing", "nmm-0002"),
+        (10, 18, "qing hao", "nmm-0001"),
+    ]
+
+
+def test_result_cache(tmp_path):
+    """
+    Test caching the results of repeated texts and dropping them when the dictionary changes.
+    """
+    primary_term_dict = {"青蒿": "nmm-0001", "Qing-hao": "nmm-0001"}
+    extractor = PrimaryTermExtractor(primary_term_dict, ignore_case=True, cache_size=2)
+
+    assert PrimaryTermExtractor(primary_term_dict).cache_info() is None
+    assert extractor.extract_primary_terms("QING-HAO") == {"qing-hao": "nmm-0001"}
+    assert extractor.extract_primary_terms("QING-HAO") == {"qing-hao": "nmm-0001"}
+    assert extractor.cache_info()[:2] == (1, 1)
+
+    extractor.update({"青蒿": "nmm-0002"})
+    assert extractor.cache_info().currsize == 0
+    assert extractor.extract_primary_terms("用青蒿") == {"青蒿": "nmm-0002"}
+
+    copy = pickle.loads(pickle.dumps(extractor))
+    assert copy.extract_primary_terms("用青蒿") == {"青蒿": "nmm-0002"}
+    assert copy.extract_primary_terms("用青蒿") == {"青蒿": "nmm-0002"}
+    assert copy.cache_info()[:4] == (1, 1, 2, 1)
+
+    extractor.save(tmp_path)
+    loaded = pickle.loads(
+        pickle.dumps(PrimaryTermExtractor.load(tmp_path, cache_size=5))
+    )
+    assert loaded.cache_info().maxsize == 5
+    loaded.extract_primary_terms("用青蒿")
+    assert loaded.extract_primary_terms("用青蒿") == {"青蒿": "nmm-0002"}
+    assert loaded.cache_info().hits == 1
+
+
+def test_find_spans_batch():
+    """
+    Test finding the matches of many texts with row offsets.
+    """
+    extractor = PrimaryTermExtractor({"青蒿": "nmm-0001", "草麻黄": "nmm-0003"})
+
+    row_offsets, spans = extractor.find_spans_batch(
+        ["用青蒿和草麻黄", None, "", "青蒿"]
+    )
+
+    assert list(row_offsets) == [0, 2, 2, 2, 3]
+    assert [(start, end, spans.term(term_id)) for start, end, term_id, _ in spans] == [
+        (1, 3, "青蒿"),
+        (4, 7, "草麻黄"),
+        (0, 2, "青蒿"),
+    ]
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_extract_fuzzy(backend):
+    """
+    Test extracting exact and approximate matches with their edit distance.
+    """
+    primary_term_dict = {
+        "Artemisia annua": "nmm-0001",
+        "草麻黄草质茎": "nmm-0003",
+        "Ephedra": "nmm-0003",
+    }
+    extractor = PrimaryTermExtractor(primary_term_dict, backend=backend)
+    text = "We used Artemisia anua and 草麻黄草质茎, plus Ephedr"
+
+    assert extractor.extract_fuzzy(text) == [
+        (8, 22, "Artemisia annua", "nmm-0001", 1),
+        (27, 33, "草麻黄草质茎", "nmm-0003", 0),
+        (40, 46, "Ephedra", "nmm-0003", 1),
+    ]
+    assert extractor.extract_fuzzy(text, min_length=8) == [
+        (8, 22, "Artemisia annua", "nmm-0001", 1),
+        (27, 33, "草麻黄草质茎", "nmm-0003", 0),
+    ]
+
+    normalized = PrimaryTermExtractor(
+        primary_term_dict, backend=backend, normalizer=TextNormalizer()
+    )
+    assert normalized.extract_fuzzy("ARTEMISIA  ANUA") == [
+        (0, 15, "artemisia annua", "nmm-0001", 1)
+    ]
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_match_policies(backend):
+    """
+    Test reporting all the matches, including nested ones, and the matches of maximal coverage.
+    """
+    primary_term_dict = {
+        "草麻黄": "nmm-0003",
+        "草麻黄草质茎": "nmm-0003",
+        "麻黄": "nmm-0003",
+        "草质": "nmm-0004",
+        "ab": "AB",
+        "a": "A",
+        "bcd": "BCD",
+    }
+    extractor = PrimaryTermExtractor(primary_term_dict, backend=backend, cache_size=4)
+    text = "草麻黄草质茎, abcd"
+
+    def spans(policy):
+        return [
+            (start, end, extractor.find_spans(text).term(term_id))
+            for start, end, term_id, _ in extractor.iter_matches(text, policy)
+        ]
+
+    assert spans("longest") == [(0, 6, "草麻黄草质茎"), (8, 10, "ab")]
+    assert spans("all") == [
+        (0, 6, "草麻黄草质茎"),
+        (0, 3, "草麻黄"),
+        (1, 3, "麻黄"),
+        (3, 5, "草质"),
+        (8, 10, "ab"),
+        (8, 9, "a"),
+        (9, 12, "bcd"),
+    ]
+    assert spans("coverage") == [(0, 6, "草麻黄草质茎"), (8, 9, "a"), (9, 12, "bcd")]
+
+    assert extractor.extract_primary_terms(text, policy="all") == {
+        "草麻黄草质茎": "nmm-0003",
+        "草麻黄": "nmm-0003",
+        "麻黄": "nmm-0003",
+        "草质": "nmm-0004",
+        "ab": "AB",
+        "a": "A",
+        "bcd": "BCD",
+    }
+    # The results of other policies do not pollute the cache
+    assert extractor.extract_primary_terms(text) == {
+        "草麻黄草质茎": "nmm-0003",
+        "ab": "AB",
+    }
+    assert len(extractor.find_spans(text, policy="all")) == 7
+    row_offsets, _ = extractor.find_spans_batch([text, None], policy="coverage")
+    assert list(row_offsets) == [0, 3, 3]
+
+    with pytest.raises(ValueError):
+        extractor.find_spans(text, policy="shortest")
+
+
+def test_match_policies_with_normalizer_and_word_boundaries():
+    """
+    Test that all the matches are found in the normalized text, at word boundaries, with original offsets.
+    """
+    extractor = PrimaryTermExtractor(
+        {"Qing Hao": "nmm-0001", "Hao": "nmm-0002", "Qing": "nmm-0003"},
+        normalizer=TextNormalizer(),
+        word_boundaries=True,
+    )
+    text = "QING  HAO, Haoxyz"
+    assert [
+        (start, end) for start, end, _, _ in extractor.iter_matches(text, "all")
+    ] == [(0, 9), (0, 4), (6, 9)]
+
+
+@pytest.mark.parametrize("word_boundaries", [False, True])
+def test_match_policies_with_normalizer_on_long_text(word_boundaries):
+    """
+    Test that the normalized matches of all the policies agree with the longest matches, on a text much
+    longer than the terms.
+    """
+    extractor = PrimaryTermExtractor(
+        {"Qing Hao": "nmm-0001", "Cao-ma-huang": "nmm-0003", "ﬁber": "fiber"},
+        normalizer=TextNormalizer(),
+        word_boundaries=word_boundaries,
+    )
+    text = "QING   hao; cao ma huang, Fiber xQing hao ﬁbers. " * 50
+
+    def spans(policy):
+        return [
+            (start, end, term_id)
+            for start, end, term_id, _ in extractor.iter_matches(text, policy)
+        ]
+
+    longest = spans("longest")
+    assert len(longest) == (150 if word_boundaries else 250)
+    assert spans("all") == longest
+    assert spans("coverage") == longest
+
+
+@pytest.mark.parametrize("backend", ["trie", "automaton"])
+def test_ignore_case_offsets_with_expanding_lowercase(backend):
+    """
+    Test that the offsets refer to the original text when a character lowercases to several characters.
+    """
+    extractor = PrimaryTermExtractor(
+        {"qing-hao": "nmm-0001", "İstanbul": "city"}, ignore_case=True, backend=backend
+    )
+    text = "İstanbul Qing-Hao"
+
+    assert list(extractor.iter_matches(text)) == [
+        (0, 8, *next(extractor.iter_matches("istanbul"))[2:]),
+        (9, 17, *next(extractor.iter_matches("qing-hao"))[2:]),
+    ]
+    spans = extractor.find_spans(text)
+    assert [text[start:end] for start, end, _, _ in spans] == ["İstanbul", "Qing-Hao"]
+    _, batch_spans = extractor.find_spans_batch([text])
+    assert list(batch_spans) == list(spans)
+    assert list(extractor.extract_stream(io.StringIO(text), chunk_size=4)) == [
+        (0, 8, "istanbul", "city"),
+        (9, 17, "qing-hao", "nmm-0001"),
+    ]
+    assert extractor.extract_primary_terms(text) == {
+        "istanbul": "city",
+        "qing-hao": "nmm-0001",
+    }
+
+    fuzzy = extractor.extract_fuzzy("İİ Qing-Hxo", min_length=5)
+    assert fuzzy == [(3, 11, "qing-hao", "nmm-0001", 1)]
@@ -0,0 +1,92 @@
+"""
+Test: pycgs.cgs.ranked_cgs
+"""
+
+import random
+
+import pytest
+
+from pycgs.cgs.algorithms import CyclicGraphError
+from pycgs.cgs.ranked_cgs import RankedPrimaryTerm, ranked_cgs
+
+
+def test_ranked_cgs():
+    """
+    Test ranking the Primary Terms of each term by accumulated path weight.
+    """
+    relationships = [
+        ("A", "B", 1),
+        ("A", "C", 3),
+        ("B", "D", 5),
+        ("C", "E", 1),
+        ("B", "E", 1),
+        ("F", "F2", 1),
+    ]
+    ranked = ranked_cgs(relationships, k=2)
+
+    # weighted_cgs() would greedily follow A -> C -> E
+    assert ranked["A"] == [
+        RankedPrimaryTerm("D", 6.0, ("A", "B", "D")),
+        RankedPrimaryTerm("E", 4.0, ("A", "C", "E")),
+    ]
+    assert ranked["B"] == [
+        RankedPrimaryTerm("D", 5.0, ("B", "D")),
+        RankedPrimaryTerm("E", 1.0, ("B", "E")),
+    ]
+    assert ranked["D"] == [RankedPrimaryTerm("D", 0.0, ("D",))]
+    assert list(ranked) == ["A", "B", "C", "D", "E", "F", "F2"]
+    assert "F" in ranked and "G" not in ranked
+    assert [r.primary_term for r in ranked_cgs(relationships, k=1)["A"]] == ["D"]
+
+
+def test_ranked_cgs_against_path_enumeration():
+    """
+    Test the rankings against the enumeration of every path of random acyclic graphs.
+    """
+    rng = random.Random(0)
+    for _ in range(100):
+        nodes = [f"t{i}" for i in range(10)]
+        relationships = [
+            (nodes[i], nodes[j], rng.randint(1, 4))
+            for i in range(len(nodes))
+            for j in range(i + 1, len(nodes))
+            if rng.random() < 0.25
+        ]
+        weights = {(src, tgt): weight for src, tgt, weight in relationships}
+        successors = {}
+        for src, tgt, _ in relationships:
+            successors.setdefault(src, []).append(tgt)
+
+        def heaviest(node):
+            # The weight of the heaviest path from the node to each reachable Primary Term
+            if node not in successors:
+                return {node: 0}
+            best = {}
+            for successor in successors[node]:
+                for primary, weight in heaviest(successor).items():
+                    weight += weights[node, successor]
+                    best[primary] = max(best.get(primary, weight), weight)
+            return best
+
+        k = rng.randint(1, 3)
+        ranked = ranked_cgs(relationships, k=k)
+        for node in ranked:
+            expected = sorted(heaviest(node).items(), key=lambda x: (-x[1], x[0]))[:k]
+            ranking = ranked[node]
+            assert [(r.primary_term, r.weight) for r in ranking] == expected
+            for r in ranking:
+                assert r.path[0] == node and r.path[-1] == r.primary_term
+                assert (
+                    sum(weights[edge] for edge in zip(r.path, r.path[1:])) == r.weight
+                )
+
+
+def test_ranked_cgs_errors():
+    """
+    Test that cycles and invalid k are rejected.
+    """
+    with pytest.raises(CyclicGraphError) as exc_info:
+        ranked_cgs([("A", "B", 1), ("B", "A", 1)])
+    assert exc_info.value.components == [{"A", "B"}]
+    with pytest.raises(ValueError):
+        ranked_cgs([("A", "B", 1)], k=0)
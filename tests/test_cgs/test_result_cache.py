@@ -0,0 +1,91 @@
+"""
+Test: pycgs.cgs.result_cache
+"""
+
+import pickle
+import pytest
+
+from pycgs.cgs.result_cache import ResultCache
+
+
+def test_lru_eviction():
+    """
+    Test that the least recently used entry is evicted first.
+    """
+    cache = ResultCache(2)
+    version = object()
+    cache.clear(version)
+
+    cache.put("a", {"A": "1"}, version, 1)
+    cache.put("b", {"B": "1"}, version)
+    assert cache.get("a", version) == ({"A": "1"}, 1)
+    cache.put("c", {"C": "1"}, version)
+
+    assert cache.get("b", version) is None
+    assert cache.get("a", version) == ({"A": "1"}, 1)
+    assert cache.get("c", version) == ({"C": "1"}, 0)
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (3, 1, 2)
+
+
+def test_max_bytes():
+    """
+    Test that the approximate memory size of the entries stays under max_bytes.
+    """
+    cache = ResultCache(1000, max_bytes=2000)
+    cache.clear("v1")
+
+    for i in range(100):
+        cache.put(f"text {i}", {f"term {i}": "primary"}, "v1")
+    cache.put("x" * 5000, {}, "v1")
+
+    info = cache.info()
+    assert 0 < info.currsize < 100
+    assert info.nbytes <= 2000
+    assert cache.get("x" * 5000, "v1") is None
+    assert cache.get("text 99", "v1") == ({"term 99": "primary"}, 0)
+
+
+def test_versions():
+    """
+    Test that entries of another version are neither returned nor stored.
+    """
+    cache = ResultCache(10)
+    cache.clear("v1")
+    cache.put("a", {"A": "1"}, "v1")
+
+    cache.clear("v2")
+    assert cache.get("a", "v2") is None
+    cache.put("a", {"A": "1"}, "v1")
+    assert cache.info().currsize == 0
+
+
+def test_returned_results_are_copies():
+    """
+    Test that mutating a returned result does not change the cached one.
+    """
+    cache = ResultCache(10)
+    cache.clear("v1")
+    result = {"A": "1"}
+    cache.put("a", result, "v1")
+    result["B"] = "2"
+    cache.get("a", "v1")[0]["C"] = "3"
+
+    assert cache.get("a", "v1") == ({"A": "1"}, 0)
+
+
+def test_pickle_and_invalid_limits():
+    """
+    Test that a pickled cache keeps its limits but not its entries, and that invalid limits are rejected.
+    """
+    cache = ResultCache(10, max_bytes=1000)
+    cache.clear("v1")
+    cache.put("a", {"A": "1"}, "v1")
+
+    copy = pickle.loads(pickle.dumps(cache))
+    assert (copy.maxsize, copy.max_bytes, copy.info().currsize) == (10, 1000, 0)
+
+    with pytest.raises(ValueError):
+        ResultCache(0)
+    with pytest.raises(ValueError):
+        ResultCache(10, max_bytes=0)
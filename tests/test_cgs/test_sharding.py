@@ -0,0 +1,84 @@
+"""
+Test: pycgs.cgs.sharding
+"""
+
+import random
+
+import pytest
+
+from pycgs.cgs.algorithms import CyclicGraphError, foundational_cgs, weighted_cgs
+from pycgs.cgs.sharding import sharded_cgs
+
+
+def _random_forest(rng: random.Random, weighted: bool) -> list:
+    """
+    Returns the edges of many small random DAGs, with duplicate and tied edges.
+    """
+    edges = []
+    for component in range(30):
+        nodes = [f"{component}-{i}" for i in range(rng.randint(2, 8))]
+        for _ in range(rng.randint(1, 12)):
+            i, j = sorted(rng.sample(range(len(nodes)), 2))
+            if weighted:
+                edges.append((nodes[i], nodes[j], float(rng.randint(1, 3))))
+            else:
+                edges.append((nodes[i], nodes[j]))
+    rng.shuffle(edges)
+    return edges
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_cgs(weighted, workers):
+    """
+    Test that sharded_cgs() returns the same results as the serial algorithms, in the same order.
+    """
+    rng = random.Random(0)
+    for _ in range(3):
+        edges = _random_forest(rng, weighted)
+        if weighted:
+            expected = weighted_cgs(edges, backend="compact")
+        else:
+            expected = foundational_cgs(edges, backend="compact")
+
+        result = sharded_cgs(edges, weighted=weighted, workers=workers)
+        assert result == expected
+        assert list(result) == list(expected)
+
+    assert sharded_cgs([], workers=workers) == {}
+    assert sharded_cgs([("A", "B"), ("B", "C")], workers=workers) == {
+        "A": "C",
+        "B": "C",
+        "C": "C",
+    }
+
+
+def test_sharded_cgs_cycle():
+    """
+    Test that a cycle in one component is reported from a worker with its components.
+    """
+    edges = [("A", "B"), ("B", "A"), ("C", "D"), ("E", "F")]
+    with pytest.raises(CyclicGraphError) as e:
+        sharded_cgs(edges, workers=2)
+    assert e.value.components == [{"A", "B"}]
+
+
+def test_sharded_cgs_invalid_arguments():
+    """
+    Test that invalid arguments are rejected.
+    """
+    with pytest.raises(ValueError):
+        sharded_cgs([("A", "B")], workers=0)
+    with pytest.raises(ValueError):
+        sharded_cgs([("A", "B")], shards_per_worker=0)
+    with pytest.raises(ValueError):
+        sharded_cgs([("A", "B")], backend="unknown")
+
+
+def test_sharded_cgs_from_file(tmp_path):
+    """
+    Test resolving the edges of a file given by its path.
+    """
+    path = tmp_path / "edges.jsonl"
+    path.write_text('["A", "B", 1]\n["B", "C", 2]\n', encoding="utf-8")
+    assert sharded_cgs(path, weighted=True, workers=2) == {"A": "C", "B": "C", "C": "C"}
@@ -0,0 +1,143 @@
+"""
+Test: pycgs.cgs.shared_extractor
+"""
+
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from pycgs.cgs.algorithms import CyclicGraphError
+from pycgs.cgs.primary_term_extractor import PrimaryTermExtractor
+from pycgs.cgs.shared_extractor import SharedExtractor
+from pycgs.cgs.term_index import PrimaryTermIndex
+
+PRIMARY_TERM_DICT = {
+    "Artemisia annua Part-aerial": "nmm-0001",
+    "Qing-hao": "nmm-0001",
+    "青蒿": "nmm-0001",
+    "Cao-ma-huang": "nmm-0003",
+    "草麻黄": "nmm-0003",
+}
+TEXT = "青蒿 (Qing-hao) and 草麻黄 (cao-ma-huang)"
+
+
+def extract_in_worker(shared: SharedExtractor, text: str) -> dict[str, str]:
+    """
+    Attaches to a shared index in a worker process and extracts from a text.
+    """
+    return shared.attach().extract_primary_terms(text)
+
+
+@pytest.mark.parametrize("ignore_case", [False, True])
+def test_from_dict(tmp_path, ignore_case):
+    """
+    Test that an attached extractor matches an extractor built from the dictionary, without a dictionary.
+    """
+    expected = PrimaryTermExtractor(
+        PRIMARY_TERM_DICT, ignore_case=ignore_case
+    ).extract_primary_terms(TEXT)
+
+    with SharedExtractor.from_dict(
+        PRIMARY_TERM_DICT, ignore_case=ignore_case, directory=tmp_path
+    ) as shared:
+        assert shared.owner
+        assert os.path.dirname(shared.path) == str(tmp_path)
+        assert shared.nbytes > 0
+
+        extractor = shared.attach(cache_size=8)
+        assert extractor.backend == "trie"
+        assert isinstance(extractor.primary_term_dict, PrimaryTermIndex)
+        assert extractor.primary_term_dict.mmap
+        assert extractor.extract_primary_terms(TEXT) == expected
+
+    # Unlinking does not affect the processes already attached
+    assert not os.path.exists(shared.path)
+    assert extractor.extract_primary_terms(TEXT) == expected
+
+
+def test_from_extractor(tmp_path):
+    """
+    Test that sharing an extractor keeps its settings, but attaches with the trie backend.
+    """
+    extractor = PrimaryTermExtractor(
+        PRIMARY_TERM_DICT, backend="automaton", word_boundaries=True
+    )
+    with SharedExtractor.from_extractor(extractor, directory=tmp_path) as shared:
+        attached = shared.attach()
+        assert attached.backend == "trie"
+        assert attached.word_boundaries
+        assert attached.extract_primary_terms(TEXT) == extractor.extract_primary_terms(
+            TEXT
+        )
+
+
+def test_compile(tmp_path):
+    """
+    Test that relationships are resolved straight into a shared index, which is removed on failure.
+    """
+    relationships = [
+        ("Qing-hao", "Artemisia annua Part-aerial"),
+        ("青蒿", "Qing-hao"),
+        ("草麻黄", "Cao-ma-huang"),
+    ]
+    with SharedExtractor.compile(relationships, directory=tmp_path) as shared:
+        assert shared.attach().extract_primary_terms(TEXT) == {
+            "青蒿": "Artemisia annua Part-aerial",
+            "Qing-hao": "Artemisia annua Part-aerial",
+            "草麻黄": "Cao-ma-huang",
+        }
+
+    with pytest.raises(CyclicGraphError):
+        SharedExtractor.compile([("a", "b"), ("b", "a")], directory=tmp_path)
+    assert not os.listdir(tmp_path)
+
+
+def test_attach_in_workers(tmp_path):
+    """
+    Test that spawned workers attach to the index through a pickled handle, which does not own it.
+    """
+    with SharedExtractor.from_dict(PRIMARY_TERM_DICT, directory=tmp_path) as shared:
+        copy = pickle.loads(pickle.dumps(shared))
+        assert copy.path == shared.path
+        assert not copy.owner
+
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            results = pool.starmap(extract_in_worker, [(shared, TEXT)] * 2)
+        assert results == [shared.attach().extract_primary_terms(TEXT)] * 2
+
+        # A non-owner handle leaves the index in place
+        with SharedExtractor(shared.path) as handle:
+            handle.attach()
+        assert os.path.exists(shared.path)
+
+
+def test_owner_cleanup(tmp_path):
+    """
+    Test that an owner handle unlinks the index when collected or at exit, but not from a forked child.
+    """
+    shared = SharedExtractor.from_dict(PRIMARY_TERM_DICT, directory=tmp_path)
+    path = shared.path
+    del shared
+    assert not os.path.exists(path)
+
+    script = (
+        "import os, sys\n"
+        "from pycgs.cgs import SharedExtractor\n"
+        f"shared = SharedExtractor.from_dict({{'a': 'b'}}, directory={str(tmp_path)!r})\n"
+        "if os.fork() == 0:\n"
+        "    sys.exit(0)\n"
+        "os.wait()\n"
+        "assert os.path.exists(shared.path)\n"
+        "print(shared.path)\n"
+    )
+    if not hasattr(os, "fork"):
+        script = script.replace("os.fork() == 0", "False")
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    ).stdout
+    assert not os.path.exists(output.strip())
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,55 @@
+"""
+Test: pycgs.cgs.term_index
+"""
+
+import pickle
+
+from pycgs.cgs.term_index import PrimaryTermIndex
+
+
+PRIMARY_TERM_DICT = {
+    "Artemisia annua Part-aerial": "nmm-0001",
+    "Qing-hao": "nmm-0001",
+    "青蒿": "nmm-0001",
+    "Cao-ma-huang": "nmm-0003",
+    "草麻黄": "nmm-0003",
+}
+
+
+def test_from_dict():
+    """
+    Test that an index built from a dictionary behaves like the dictionary.
+    """
+    index = PrimaryTermIndex.from_dict(PRIMARY_TERM_DICT)
+
+    assert index == PRIMARY_TERM_DICT
+    assert len(index) == len(PRIMARY_TERM_DICT)
+    assert len(index.primary_terms) == 2
+    assert "青蒿" in index
+    assert "黄花蒿" not in index
+    assert index.get("黄花蒿") is None
+
+
+def test_save_and_load(tmp_path):
+    """
+    Test that a saved index loads back, both memory-mapped and read into memory.
+    """
+    PrimaryTermIndex.from_dict(PRIMARY_TERM_DICT).save(tmp_path)
+
+    for mmap in (True, False):
+        index = PrimaryTermIndex.load(tmp_path, mmap=mmap)
+        assert index == PRIMARY_TERM_DICT
+        assert index.path == str(tmp_path)
+        assert index.mmap == mmap
+
+        # A loaded index is pickled by reference to its directory
+        assert pickle.loads(pickle.dumps(index)) == PRIMARY_TERM_DICT
+
+
+def test_save_and_load_empty(tmp_path):
+    """
+    Test saving and loading an empty index.
+    """
+    PrimaryTermIndex.from_dict({}).save(tmp_path)
+
+    assert PrimaryTermIndex.load(tmp_path) == {}